@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+from fastapi import Header, HTTPException
 from starlette.requests import HTTPConnection
 
+from app.jobs.runner import JobRunner
 from app.pipeline.voice_intelligence import VoiceIntelligencePipeline
 
 
@@ -10,3 +12,28 @@ def get_pipeline(request: HTTPConnection) -> VoiceIntelligencePipeline:
     if pipeline is None:
         raise RuntimeError("Pipeline not initialized")
     return pipeline
+
+
+def get_jobs(request: HTTPConnection) -> JobRunner:
+    jobs = getattr(request.app.state, "jobs", None)
+    if jobs is None:
+        raise HTTPException(status_code=503, detail="Job queue is disabled")
+    return jobs
+
+
+def cache_allowed(cache_control: str | None = Header(default=None)) -> bool:
+    """``Cache-Control: no-cache`` (or ``no-store``) bypasses the transcription and LLM caches."""
+    if not cache_control:
+        return True
+    directives = {d.strip().lower() for d in cache_control.split(",")}
+    return not directives & {"no-cache", "no-store"}
+
+
+def wants_event_stream(accept: str | None = Header(default=None)) -> bool:
+    """``Accept: text/event-stream`` switches a route to server-sent events."""
+    return bool(accept) and "text/event-stream" in accept.lower()
+
+
+def wants_ndjson(accept: str | None = Header(default=None)) -> bool:
+    """``Accept: application/x-ndjson`` streams one JSON document per line as results complete."""
+    return bool(accept) and "application/x-ndjson" in accept.lower()
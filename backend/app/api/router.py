@@ -3,6 +3,7 @@ from __future__ import annotations
 from fastapi import APIRouter
 
 from app.api.routes.analyze import router as analyze_router
+from app.api.routes.jobs import router as jobs_router
 from app.api.routes.transcribe import router as transcribe_router
 from app.api.routes.stream import router as stream_router
 
@@ -11,3 +12,4 @@ api_router = APIRouter()
 api_router.include_router(transcribe_router, tags=["speech"])
 api_router.include_router(stream_router, tags=["speech"])
 api_router.include_router(analyze_router, tags=["intelligence"])
+api_router.include_router(jobs_router, tags=["jobs"])
@@ -1,30 +1,150 @@
 from __future__ import annotations
 
+import json
 import logging
+from typing import AsyncIterator
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
 
-from app.api.deps import get_pipeline
+from app.api.deps import cache_allowed, get_pipeline, wants_event_stream, wants_ndjson
+from app.observability.tracing import Trace
 from app.pipeline.voice_intelligence import VoiceIntelligencePipeline
-from app.schemas.intelligence import AnalyzeRequest, AnalyzeResponse
+from app.schemas.intelligence import (
+    AnalyzeBatchItem,
+    AnalyzeBatchRequest,
+    AnalyzeBatchResponse,
+    AnalyzeRequest,
+    AnalyzeResponse,
+    IntelligenceResult,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/analyze")
 
+_SSE_OPENAPI = {
+    "responses": {
+        "200": {
+            "content": {
+                "text/event-stream": {
+                    "schema": {"type": "string"},
+                    "description": "Sent when the request has `Accept: text/event-stream`: "
+                    "`intelligence_partial` events, then one `final` (or `error`) event.",
+                }
+            }
+        }
+    }
+}
 
-@router.post("", response_model=AnalyzeResponse)
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("", response_model=AnalyzeResponse, openapi_extra=_SSE_OPENAPI)
 async def analyze(
     payload: AnalyzeRequest,
+    response: Response,
     pipeline: VoiceIntelligencePipeline = Depends(get_pipeline),
-) -> AnalyzeResponse:
+    use_cache: bool = Depends(cache_allowed),
+    event_stream: bool = Depends(wants_event_stream),
+) -> AnalyzeResponse | StreamingResponse:
+    if event_stream:
+        return StreamingResponse(
+            _analyze_events(payload, pipeline, use_cache=use_cache),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    trace = Trace()
     try:
-        intelligence = await pipeline.analyze_transcript(transcript=payload.transcript)
+        with trace.activate():
+            intelligence = await pipeline.analyze_transcript(transcript=payload.transcript, use_cache=use_cache)
     except Exception as exc:
         logger.warning(f"POST /analyze failed: {exc}")
         raise HTTPException(status_code=500, detail="Analysis failed") from exc
+    response.headers["Server-Timing"] = trace.server_timing()
     return AnalyzeResponse(
         raw_transcript=payload.transcript,
         clean_transcript=pipeline.post.clean(payload.transcript),
         intelligence=intelligence,
     )
+
+
+async def _analyze_events(
+    payload: AnalyzeRequest, pipeline: VoiceIntelligencePipeline, *, use_cache: bool
+) -> AsyncIterator[str]:
+    try:
+        async for event in pipeline.analyze_transcript_stream(transcript=payload.transcript, use_cache=use_cache):
+            if isinstance(event, IntelligenceResult):
+                response = AnalyzeResponse(
+                    raw_transcript=payload.transcript,
+                    clean_transcript=pipeline.post.clean(payload.transcript),
+                    intelligence=event,
+                )
+                yield _sse("final", response.model_dump(mode="json"))
+            else:
+                yield _sse("intelligence_partial", event.model_dump(mode="json"))
+    except Exception as exc:
+        logger.warning(f"POST /analyze (stream) failed: {exc}")
+        yield _sse("error", {"detail": "Analysis failed"})
+
+
+_NDJSON_OPENAPI = {
+    "responses": {
+        "200": {
+            "content": {
+                "application/x-ndjson": {
+                    "schema": {"type": "string"},
+                    "description": "Sent when the request has `Accept: application/x-ndjson`: "
+                    "one `AnalyzeBatchItem` per line, in completion order.",
+                }
+            }
+        }
+    }
+}
+
+
+@router.post("/batch", response_model=AnalyzeBatchResponse, openapi_extra=_NDJSON_OPENAPI)
+async def analyze_batch(
+    payload: AnalyzeBatchRequest,
+    pipeline: VoiceIntelligencePipeline = Depends(get_pipeline),
+    use_cache: bool = Depends(cache_allowed),
+    ndjson: bool = Depends(wants_ndjson),
+) -> AnalyzeBatchResponse | StreamingResponse:
+    if len(payload.transcripts) > pipeline.analyze_batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds {pipeline.analyze_batch_max_items} transcripts",
+        )
+
+    items = _analyze_batch_items(payload, pipeline, use_cache=use_cache)
+    if ndjson:
+        return StreamingResponse(
+            (item.model_dump_json() + "\n" async for item in items),
+            media_type="application/x-ndjson",
+        )
+
+    results = [item async for item in items]
+    results.sort(key=lambda item: item.index)
+    return AnalyzeBatchResponse(results=results)
+
+
+async def _analyze_batch_items(
+    payload: AnalyzeBatchRequest, pipeline: VoiceIntelligencePipeline, *, use_cache: bool
+) -> AsyncIterator[AnalyzeBatchItem]:
+    async for idx, result in pipeline.analyze_batch(transcripts=payload.transcripts, use_cache=use_cache):
+        if isinstance(result, Exception):
+            logger.warning(f"POST /analyze/batch item {idx} failed: {result}")
+            yield AnalyzeBatchItem(index=idx, error="Analysis failed")
+            continue
+        transcript = payload.transcripts[idx]
+        yield AnalyzeBatchItem(
+            index=idx,
+            result=AnalyzeResponse(
+                raw_transcript=transcript,
+                clean_transcript=pipeline.post.clean(transcript),
+                intelligence=result,
+            ),
+        )
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+
+from app.api.deps import cache_allowed, get_jobs
+from app.api.uploads import UPLOAD_OPENAPI, StreamingUpload, UploadError
+from app.jobs.runner import JobRunner
+from app.jobs.store import JobRecord
+from app.pipeline.executor import StageOverloadedError
+from app.schemas.jobs import JobProgress, JobResponse
+from app.schemas.transcription import TranscribeResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/jobs")
+
+
+def _to_response(record: JobRecord) -> JobResponse:
+    return JobResponse(
+        id=record.id,
+        status=record.status,
+        filename=record.filename,
+        created_at=record.created_at,
+        updated_at=record.updated_at,
+        progress=JobProgress(segments_done=record.segments_done, segments_total=record.segments_total),
+        result=TranscribeResponse.model_validate_json(record.result_json) if record.result_json else None,
+        error=record.error,
+    )
+
+
+@router.post("/transcribe", response_model=JobResponse, status_code=202, openapi_extra=UPLOAD_OPENAPI)
+async def submit_transcribe_job(
+    request: Request,
+    jobs: JobRunner = Depends(get_jobs),
+    use_cache: bool = Depends(cache_allowed),
+) -> JobResponse:
+    try:
+        jobs.ensure_capacity()
+    except StageOverloadedError as exc:
+        logger.warning(f"POST /jobs/transcribe shed: {exc}")
+        raise HTTPException(status_code=503, detail="Job queue is full, retry later", headers={"Retry-After": "5"}) from exc
+
+    upload = StreamingUpload(request, field_name="file")
+    try:
+        await upload.open()
+        record = await jobs.submit(chunks=upload.chunks(), filename=upload.filename or "audio", use_cache=use_cache)
+    except UploadError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except StageOverloadedError as exc:
+        raise HTTPException(status_code=503, detail="Job queue is full, retry later", headers={"Retry-After": "5"}) from exc
+
+    return _to_response(record)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, jobs: JobRunner = Depends(get_jobs)) -> JobResponse:
+    record = await asyncio.to_thread(jobs.store.get, job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _to_response(record)
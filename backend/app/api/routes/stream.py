@@ -4,23 +4,71 @@ import asyncio
 import contextlib
 import json
 import logging
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 
 from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
 
 from app.api.deps import get_pipeline
+from app.observability.metrics import (
+    WS_BUFFERED_PCM_BYTES,
+    WS_INPUT_BYTES,
+    WS_SESSIONS,
+    metrics_enabled,
+    time_stage,
+)
+from app.observability.tracing import Trace
+from app.pipeline.executor import StageOverloadedError
+from app.pipeline.scheduler import DeadlineExceededError, Priority
 from app.pipeline.voice_intelligence import VoiceIntelligencePipeline
+from app.schemas.intelligence import IntelligenceResult
+from app.speech.audio import AudioDecodingError
+from app.speech.stream_input import available_input_formats, open_input_decoder
+from app.speech.vad import StreamingVAD
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/stream")
 
 
-@dataclass
+@dataclass(eq=False)
 class StreamState:
-    pcm16_buffer: bytearray
-    last_emitted_text: str
-    lock: asyncio.Lock
+    vad: StreamingVAD
+    # (utterance index, pcm, time.monotonic() when the utterance closed)
+    utterances: asyncio.Queue[tuple[int, bytes, float]]
+    transcript_parts: dict[int, str] = field(default_factory=dict)
+    # Partials the scheduler dropped under load; transcribed as final work on flush.
+    dropped: dict[int, bytes] = field(default_factory=dict)
+    next_index: int = 0
+    flushing: bool = False
+    queued_bytes: int = 0
+
+    def enqueue(self, utterances: list[bytes]) -> None:
+        now = time.monotonic()
+        for pcm in utterances:
+            self.utterances.put_nowait((self.next_index, pcm, now))
+            self.next_index += 1
+            self.queued_bytes += len(pcm)
+
+    def buffered_bytes(self) -> int:
+        return self.vad.buffered_bytes + self.queued_bytes + sum(map(len, self.dropped.values()))
+
+    def ordered_parts(self) -> list[str]:
+        return [self.transcript_parts[idx] for idx in sorted(self.transcript_parts)]
+
+
+# Open sessions; the gauges read them at scrape time, so the audio path does no metrics work.
+_sessions: set[StreamState] = set()
+WS_SESSIONS.set_function(lambda: len(_sessions))
+WS_BUFFERED_PCM_BYTES.set_function(lambda: sum(state.buffered_bytes() for state in _sessions))
+
+
+_BINARY_PROTOCOL = {
+    "pcm16": "Send raw PCM16LE mono frames as binary WebSocket messages.",
+    "opus": "Send one raw Opus packet (any encoder rate, mono) per binary WebSocket message.",
+    "ogg_opus": "Send an Ogg Opus stream, split across binary WebSocket messages at any byte boundary.",
+    "webm_opus": "Send a WebM Opus stream (e.g. MediaRecorder chunks) as binary WebSocket messages.",
+}
 
 
 async def _emit(websocket: WebSocket, payload: dict) -> None:
@@ -38,67 +86,115 @@ async def stream_transcribe(
     client_label = f"{client.host}:{client.port}" if client else "unknown"
     logger.info(f"WS /stream/transcribe connected ({client_label})")
 
-    state = StreamState(pcm16_buffer=bytearray(), last_emitted_text="", lock=asyncio.Lock())
+    supported_formats = available_input_formats()
+    input_format = websocket.query_params.get("format", "pcm16")
+    if input_format not in supported_formats:
+        logger.info(f"WS /stream/transcribe rejected input format {input_format!r} ({client_label})")
+        await _emit(
+            websocket,
+            {
+                "event": "error",
+                "message": f"Unsupported input format {input_format!r}",
+                "supported_formats": supported_formats,
+            },
+        )
+        await websocket.close(code=1003)
+        return
+
+    state = StreamState(vad=pipeline.open_stream(), utterances=asyncio.Queue())
+    decoder = open_input_decoder(
+        input_format,
+        on_pcm=lambda pcm: state.enqueue(state.vad.feed(pcm)),
+        sample_rate_hz=pipeline.sample_rate_hz,
+    )
+    _sessions.add(state)
+    timing = websocket.query_params.get("timing") in ("1", "true")
 
     await _emit(
         websocket,
         {
             "event": "ready",
             "input": {
-                "format": "pcm16",
+                "format": input_format,
                 "sample_rate_hz": pipeline.sample_rate_hz,
                 "channels": 1,
+                "supported_formats": supported_formats,
             },
             "protocol": {
-                "binary": "Send raw PCM16LE mono frames as binary WebSocket messages.",
+                "binary": _BINARY_PROTOCOL[input_format],
                 "text": "Send {\"event\":\"flush\"} to force finalize and emit intelligence.",
             },
         },
     )
 
-    async def transcribe_loop() -> None:
-        while True:
-            try:
-                await asyncio.sleep(1.0)
-                async with state.lock:
-                    if len(state.pcm16_buffer) < pipeline.sample_rate_hz * 2:
-                        continue
-                    pcm = bytes(state.pcm16_buffer)
-                    state.pcm16_buffer.clear()
+    async def transcribe_utterance(idx: int, pcm: bytes, closed_at: float) -> None:
+        if state.flushing:
+            priority, deadline = Priority.FINAL, None
+        else:
+            priority, deadline = Priority.PARTIAL, closed_at + pipeline.stream_partial_deadline_s
+        # The utterance's trace starts when VAD closed it, so it includes the wait for this loop.
+        queued_s = time.monotonic() - closed_at
+        trace = Trace(start=time.perf_counter() - queued_s)
+        trace.add("queue", queued_s, start=trace.start)
+        try:
+            with trace.activate():
+                tr = await pipeline.transcribe_segments(segments_pcm=[pcm], priority=priority, deadline=deadline)
+        except (DeadlineExceededError, StageOverloadedError) as e:
+            logger.info(f"WS partial {idx} deferred to flush ({client_label}): {e}")
+            state.dropped[idx] = pcm
+            return
+        except Exception as e:
+            logger.warning(f"WS transcribe failed ({client_label}): {e}")
+            return
 
-                try:
-                    tr = await pipeline.transcribe_pcm16(pcm16=pcm)
-                except Exception as e:
-                    logger.warning(f"WS transcribe failed ({client_label}): {e}")
-                    continue
+        if not tr.raw_transcript:
+            return
 
-                if not tr.clean_transcript:
-                    continue
+        state.transcript_parts[idx] = tr.raw_transcript
+        raw = " ".join(state.ordered_parts())
 
-                delta = tr.clean_transcript
-                if state.last_emitted_text and delta.startswith(state.last_emitted_text):
-                    delta = delta[len(state.last_emitted_text) :].lstrip()
+        event = {
+            "event": "partial_transcript",
+            "raw_transcript": raw,
+            "clean_transcript": pipeline.post.clean(raw),
+            "delta": tr.clean_transcript,
+        }
+        if timing:
+            event["timing"] = trace.as_dict()
+        try:
+            await _emit(websocket, event)
+        except Exception as e:
+            logger.warning(f"WS emit partial failed ({client_label}): {e}")
 
-                state.last_emitted_text = tr.clean_transcript
+    async def transcribe_dropped() -> None:
+        async def one(idx: int, pcm: bytes) -> None:
+            try:
+                tr = await pipeline.transcribe_segments(segments_pcm=[pcm], priority=Priority.FINAL)
+            except Exception as e:
+                logger.warning(f"WS transcribe failed ({client_label}): {e}")
+                return
+            if tr.raw_transcript:
+                state.transcript_parts[idx] = tr.raw_transcript
 
-                try:
-                    await _emit(
-                        websocket,
-                        {
-                            "event": "partial_transcript",
-                            "raw_transcript": tr.raw_transcript,
-                            "clean_transcript": tr.clean_transcript,
-                            "delta": delta,
-                        },
-                    )
-                except Exception as e:
-                    logger.warning(f"WS emit partial failed ({client_label}): {e}")
-                    return
+        dropped, state.dropped = state.dropped, {}
+        await asyncio.gather(*(one(idx, pcm) for idx, pcm in dropped.items()))
+
+    async def transcribe_loop() -> None:
+        while True:
+            try:
+                idx, pcm, closed_at = await state.utterances.get()
+            except asyncio.CancelledError:
+                return
+            state.queued_bytes -= len(pcm)
+
+            try:
+                await transcribe_utterance(idx, pcm, closed_at)
             except asyncio.CancelledError:
                 return
             except Exception as e:
                 logger.warning(f"WS background loop error ({client_label}): {e}")
-                continue
+            finally:
+                state.utterances.task_done()
 
     task = asyncio.create_task(transcribe_loop())
 
@@ -115,8 +211,14 @@ async def stream_transcribe(
             if "bytes" in message and message["bytes"] is not None:
                 chunk: bytes = message["bytes"]
                 if chunk:
-                    async with state.lock:
-                        state.pcm16_buffer.extend(chunk)
+                    if metrics_enabled():
+                        WS_INPUT_BYTES.labels(input_format).inc(len(chunk))
+                    try:
+                        await decoder.feed(chunk)
+                    except AudioDecodingError as e:
+                        logger.warning(f"WS input decode failed ({client_label}): {e}")
+                        await _emit(websocket, {"event": "error", "message": str(e)})
+                        break
 
             if "text" in message and message["text"] is not None:
                 text = message["text"]
@@ -127,36 +229,53 @@ async def stream_transcribe(
 
                 if evt.get("event") == "flush":
                     logger.info(f"WS flush received ({client_label})")
-                    async with state.lock:
-                        pcm = bytes(state.pcm16_buffer)
-                        state.pcm16_buffer.clear()
-
-                    tr = None
-                    if pcm:
+                    trace = Trace()
+                    with trace.activate():
+                        state.flushing = True
                         try:
-                            tr = await pipeline.transcribe_pcm16(pcm16=pcm)
-                        except Exception as e:
-                            logger.warning(f"WS flush transcribe failed ({client_label}): {e}")
-                            tr = None
-                    clean = tr.clean_transcript if tr else state.last_emitted_text
-                    intelligence = None
-                    if clean:
-                        try:
-                            intelligence = await pipeline.reasoner.analyze(transcript=clean)
-                        except Exception as e:
-                            logger.warning(f"WS LLM analyze failed ({client_label}): {e}")
-                            intelligence = None
+                            with time_stage("decode"):
+                                await decoder.drain()
+                        except AudioDecodingError as e:
+                            # Finalize whatever was decoded before the failure.
+                            logger.warning(f"WS input decode failed ({client_label}): {e}")
+                        state.enqueue(state.vad.flush())
+                        with time_stage("drain"):
+                            await state.utterances.join()
+                        await transcribe_dropped()
+                        state.flushing = False
+
+                        parts = state.ordered_parts()
+                        state.transcript_parts.clear()
+                        raw = " ".join(parts)
+                        clean = pipeline.post.clean(raw) if raw else ""
+                        intelligence = None
+                        if clean:
+                            try:
+                                with time_stage("llm"):
+                                    async for item in pipeline.reasoner.analyze_stream(
+                                        transcript=clean, segments=parts, priority=Priority.FINAL
+                                    ):
+                                        if isinstance(item, IntelligenceResult):
+                                            intelligence = item
+                                        else:
+                                            await _emit(
+                                                websocket,
+                                                {"event": "intelligence_partial", **item.model_dump(mode="json")},
+                                            )
+                            except Exception as e:
+                                logger.warning(f"WS LLM analyze failed ({client_label}): {e}")
+                                intelligence = None
 
+                    event = {
+                        "event": "final",
+                        "raw_transcript": raw,
+                        "clean_transcript": clean,
+                        "intelligence": intelligence.model_dump() if intelligence else None,
+                    }
+                    if timing:
+                        event["timing"] = trace.as_dict()
                     try:
-                        await _emit(
-                            websocket,
-                            {
-                                "event": "final",
-                                "raw_transcript": tr.raw_transcript if tr else "",
-                                "clean_transcript": clean,
-                                "intelligence": intelligence.model_dump() if intelligence else None,
-                            },
-                        )
+                        await _emit(websocket, event)
                     except Exception as e:
                         logger.warning(f"WS emit final failed ({client_label}): {e}")
                         break
@@ -164,6 +283,8 @@ async def stream_transcribe(
     except WebSocketDisconnect:
         logger.info(f"WS /stream/transcribe disconnected ({client_label})")
     finally:
+        _sessions.discard(state)
+        await decoder.aclose()
         task.cancel()
         with contextlib.suppress(asyncio.CancelledError):
             await task
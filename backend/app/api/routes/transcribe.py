@@ -2,9 +2,12 @@ from __future__ import annotations
 
 import logging
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 
-from app.api.deps import get_pipeline
+from app.api.deps import cache_allowed, get_pipeline
+from app.api.uploads import UPLOAD_OPENAPI, StreamingUpload, UploadError
+from app.observability.tracing import Trace
+from app.pipeline.executor import StageOverloadedError
 from app.pipeline.voice_intelligence import VoiceIntelligencePipeline
 from app.schemas.transcription import TranscribeResponse
 from app.speech.audio import AudioDecodingError
@@ -14,22 +17,36 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/transcribe")
 
 
-@router.post("", response_model=TranscribeResponse)
+@router.post("", response_model=TranscribeResponse, openapi_extra=UPLOAD_OPENAPI)
 async def transcribe(
-    file: UploadFile = File(...),
+    request: Request,
+    response: Response,
     pipeline: VoiceIntelligencePipeline = Depends(get_pipeline),
+    use_cache: bool = Depends(cache_allowed),
 ) -> TranscribeResponse:
-    filename = file.filename or "audio"
-    audio_bytes = await file.read()
+    upload = StreamingUpload(request, field_name="file")
     try:
-        transcription, intelligence = await pipeline.transcribe_and_analyze_file(
-            audio_bytes=audio_bytes,
-            filename=filename,
-        )
-    except AudioDecodingError as exc:
+        await upload.open()
+    except UploadError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    filename = upload.filename or "audio"
+    trace = Trace()
+    try:
+        with trace.activate():
+            transcription, intelligence = await pipeline.transcribe_and_analyze_stream(
+                chunks=upload.chunks(),
+                filename=filename,
+                use_cache=use_cache,
+            )
+    except (AudioDecodingError, UploadError) as exc:
         raise HTTPException(status_code=400, detail=str(exc) or "Invalid or unsupported audio") from exc
+    except StageOverloadedError as exc:
+        logger.warning(f"POST /transcribe shed for {filename}: {exc}")
+        raise HTTPException(status_code=503, detail="Server busy, retry later", headers={"Retry-After": "1"}) from exc
     except Exception as exc:
         logger.warning(f"POST /transcribe failed for {filename}: {exc}")
         raise HTTPException(status_code=500, detail="Transcription failed") from exc
 
+    response.headers["Server-Timing"] = trace.server_timing()
     return TranscribeResponse(transcription=transcription, intelligence=intelligence)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import AsyncIterator
+
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import Request
+
+
+class UploadError(Exception):
+    pass
+
+
+UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
+
+
+class StreamingUpload:
+    """Reads one file field from a multipart request body as it arrives.
+
+    Unlike ``UploadFile`` nothing is spooled: ``open()`` parses until the
+    target part's headers are seen, then ``chunks()`` yields its bytes while the
+    rest of the body is still in flight. Other parts are ignored.
+    """
+
+    def __init__(self, request: Request, *, field_name: str = "file") -> None:
+        self._request = request
+        self._field_name = field_name
+        self._body = request.stream().__aiter__()
+        self._parser: MultipartParser | None = None
+
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._in_target = False
+
+        self._found = False
+        self._done = False
+        self._pending: deque[bytes] = deque()
+        self.filename: str | None = None
+
+    async def open(self) -> None:
+        content_type, params = parse_options_header(self._request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data":
+            raise UploadError("Expected a multipart/form-data upload")
+        boundary = params.get(b"boundary")
+        if not boundary:
+            raise UploadError("Missing boundary in multipart upload")
+
+        self._parser = MultipartParser(
+            boundary,
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+            },
+        )
+
+        while not self._found:
+            if not await self._pump():
+                raise UploadError(f"Missing '{self._field_name}' file field")
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        if self._parser is None:
+            raise RuntimeError("StreamingUpload.open() must be awaited first")
+
+        while True:
+            while self._pending:
+                yield self._pending.popleft()
+            if self._done:
+                return
+            if not await self._pump():
+                raise UploadError("Upload ended before the file field was complete")
+
+    async def _pump(self) -> bool:
+        assert self._parser is not None
+        try:
+            chunk = await self._body.__anext__()
+        except StopAsyncIteration:
+            self._parser.finalize()
+            return False
+        try:
+            self._parser.write(chunk)
+        except MultipartParseError as exc:
+            raise UploadError(f"Malformed multipart upload: {exc}") from exc
+        return True
+
+    def _on_part_begin(self) -> None:
+        self._disposition = b""
+        self._in_target = False
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        name = options.get(b"name", b"").decode("utf-8", errors="replace")
+        if self._found or name != self._field_name:
+            return
+        self._in_target = True
+        self._found = True
+        filename = options.get(b"filename")
+        self.filename = filename.decode("utf-8", errors="replace") if filename else None
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_target and end > start:
+            self._pending.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        if self._in_target:
+            self._in_target = False
+            self._done = True
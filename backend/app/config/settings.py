@@ -3,7 +3,7 @@ from __future__ import annotations
 from functools import lru_cache
 from typing import Literal
 
-from pydantic import AnyHttpUrl, SecretStr
+from pydantic import AnyHttpUrl, SecretStr, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -16,23 +16,96 @@ class Settings(BaseSettings):
 
     cors_allow_origins: list[str] = ["*"]
 
+    metrics_enabled: bool = True
+
     groq_api_key: SecretStr
     groq_base_url: AnyHttpUrl = "https://api.groq.com/openai/v1"
     groq_stt_model: str = "whisper-large-v3"
     groq_llm_model: str = "llama-3.3-70b-versatile"
+    groq_max_attempts: int = 3
+    groq_requests_per_minute: float = 300.0
+    groq_request_burst: int = 20
 
     audio_sample_rate_hz: int = 16_000
     audio_decoder_mode: Literal["auto", "strict", "universal"] = "auto"
+    ffmpeg_warm_processes: int = 2
     vad_aggressiveness: int = 2
     vad_frame_ms: int = 30
     vad_padding_ms: int = 300
 
+    stream_min_silence_ms: int = 300
+    stream_max_utterance_s: float = 15.0
+
+    stt_max_concurrency: int = 4
+    stt_segment_failure_policy: Literal["skip", "retry", "fail"] = "fail"
+    stt_segment_retries: int = 2
+    stt_pack_max_s: float = 30.0
+    stt_pack_gap_ms: int = 500
+    stt_upload_codec: Literal["wav", "flac", "ogg_opus"] = "wav"
+    stt_hedge_enabled: bool = False
+    stt_hedge_percentile: float = 95.0
+    stt_hedge_min_delay_s: float = 0.5
+    stt_hedge_max_ratio: float = 0.1
+    stt_hedge_min_samples: int = 20
+
+    cpu_executor_kind: Literal["thread", "process"] = "thread"
+    cpu_executor_workers: int = 4
+    cpu_executor_max_pending: int = 16
+
+    scheduler_min_concurrency: int = 2
+    scheduler_max_concurrency: int = 16
+    scheduler_max_queued: int = 256
+    scheduler_stt_latency_target_s: float = 2.0
+    scheduler_stt_latency_per_audio_s: float = 0.1
+    scheduler_llm_latency_target_s: float = 8.0
+    stream_partial_deadline_s: float = 5.0
+
+    transcription_cache_enabled: bool = True
+    transcription_cache_max_entries: int = 256
+    transcription_cache_segment_max_entries: int = 4096
+    transcription_cache_ttl_s: float = 86_400.0
+    transcription_cache_dir: str | None = None
+    transcription_cache_max_disk_mb: int = 512
+
     enable_llm_punctuation: bool = False
 
     http_timeout_s: float = 60.0
+    http_connect_timeout_s: float = 5.0
+    http_read_timeout_s: float | None = None
+    http_write_timeout_s: float | None = None
+    http_pool_timeout_s: float = 10.0
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry_s: float = 30.0
+    http2_enabled: bool = False
+    http_warm_connections: int = 2
     llm_temperature: float = 0.2
     llm_max_tokens: int = 800
 
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 1024
+    llm_cache_ttl_s: float = 3_600.0
+
+    llm_context_budget_tokens: int = 6_000
+    llm_chunk_tokens: int = 3_000
+    llm_map_concurrency: int = 4
+
+    analyze_batch_max_items: int = 1_000
+    analyze_batch_concurrency: int = 8
+
+    jobs_enabled: bool = True
+    jobs_dir: str = ".data/jobs"
+    jobs_workers: int = 2
+    jobs_max_queued: int = 100
+    jobs_ttl_s: float = 86_400.0
+
+    @model_validator(mode="after")
+    def _check_llm_chunking(self) -> Settings:
+        # Map chunks are analyzed in a single call, so they must fit the budget.
+        if self.llm_chunk_tokens >= self.llm_context_budget_tokens:
+            raise ValueError("llm_chunk_tokens must be smaller than llm_context_budget_tokens")
+        return self
+
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
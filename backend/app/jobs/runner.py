@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import socket
+import uuid
+from pathlib import Path
+from typing import AsyncIterator
+
+from app.jobs.store import JobRecord, JobStore
+from app.observability.metrics import endpoint_label
+from app.pipeline.executor import StageOverloadedError
+from app.pipeline.scheduler import Priority
+from app.pipeline.voice_intelligence import VoiceIntelligencePipeline
+from app.schemas.transcription import TranscribeResponse
+from app.speech.audio import AudioDecodingError
+
+logger = logging.getLogger(__name__)
+
+_REQUEUE_DELAY_S = 1.0
+
+# Upload bytes written or read per worker-thread hop while spooling or replaying a job's audio.
+_SPOOL_BATCH_BYTES = 256 * 1024
+
+_SWEEP_INTERVAL_S = 600.0
+
+# A runner that has not heartbeat for _STALE_AFTER_S is presumed dead and its jobs are adopted.
+_HEARTBEAT_INTERVAL_S = 10.0
+_STALE_AFTER_S = 60.0
+
+
+class JobRunner:
+    """Runs queued transcription jobs on ``workers`` background tasks.
+
+    Uploads are spooled to the store before the job is queued. Any number of
+    runners (one per server process) can share a store: each claims a job before
+    running it, and adopts the unfinished jobs of runners that stopped cleanly
+    or whose heartbeat went stale. Store calls run in worker threads. Finished
+    jobs are deleted ``ttl_s`` after they finish (``0`` keeps them).
+    """
+
+    def __init__(
+        self,
+        *,
+        store: JobStore,
+        pipeline: VoiceIntelligencePipeline,
+        workers: int = 2,
+        max_queued: int = 100,
+        ttl_s: float = 86_400.0,
+    ) -> None:
+        self._store = store
+        self._pipeline = pipeline
+        self._workers = max(1, workers)
+        self._max_queued = max_queued
+        self._ttl_s = ttl_s
+        self._owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._tasks: list[asyncio.Task[None]] = []
+
+    @property
+    def store(self) -> JobStore:
+        return self._store
+
+    def start(self) -> None:
+        self._store.heartbeat(self._owner)
+        self._enqueue_adopted(self._store.adopt_orphans(owner=self._owner, stale_after_s=_STALE_AFTER_S))
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self._workers)]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+        if self._ttl_s > 0:
+            self._tasks.append(asyncio.create_task(self._sweeper()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Interrupted and queued jobs go back to the pool for the next runner to adopt.
+        try:
+            await asyncio.to_thread(self._store.release, self._owner)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(f"Releasing jobs of {self._owner} failed: {exc}")
+
+    def ensure_capacity(self) -> None:
+        if self._queue.qsize() >= self._max_queued:
+            raise StageOverloadedError(f"{self._queue.qsize()} jobs already queued")
+
+    async def submit(self, *, chunks: AsyncIterator[bytes], filename: str, use_cache: bool = True) -> JobRecord:
+        self.ensure_capacity()
+        job_id = self._store.new_id()
+        path = self._store.upload_path(job_id)
+        try:
+            fh = await asyncio.to_thread(path.open, "wb")
+            try:
+                batch = bytearray()
+                async for chunk in chunks:
+                    batch.extend(chunk)
+                    if len(batch) >= _SPOOL_BATCH_BYTES:
+                        await asyncio.to_thread(fh.write, bytes(batch))
+                        batch.clear()
+                await asyncio.to_thread(fh.write, bytes(batch))
+            finally:
+                fh.close()
+            record = await asyncio.to_thread(
+                self._store.create, job_id=job_id, filename=filename, use_cache=use_cache, owner=self._owner
+            )
+        except BaseException:
+            path.unlink(missing_ok=True)
+            raise
+
+        self._queue.put_nowait(job_id)
+        return record
+
+    async def _worker(self) -> None:
+        # Pipeline metrics of background jobs are attributed to the endpoint that queued them.
+        endpoint_label.set("/jobs/transcribe")
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(f"Job {job_id} crashed: {exc}")
+                # Mark it failed so its upload is deleted instead of retried on every restart.
+                with contextlib.suppress(Exception):
+                    await asyncio.to_thread(self._store.fail, job_id, "Transcription failed")
+            finally:
+                self._queue.task_done()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(_HEARTBEAT_INTERVAL_S)
+            try:
+                await asyncio.to_thread(self._store.heartbeat, self._owner)
+                job_ids = await asyncio.to_thread(
+                    self._store.adopt_orphans, owner=self._owner, stale_after_s=_STALE_AFTER_S
+                )
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(f"Job heartbeat failed: {exc}")
+            else:
+                self._enqueue_adopted(job_ids)
+
+    def _enqueue_adopted(self, job_ids: list[str]) -> None:
+        if job_ids:
+            logger.info(f"Adopted {len(job_ids)} unfinished jobs")
+        for job_id in job_ids:
+            self._queue.put_nowait(job_id)
+
+    async def _sweeper(self) -> None:
+        while True:
+            try:
+                purged = await asyncio.to_thread(self._store.purge_finished, older_than_s=self._ttl_s)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(f"Job sweep failed: {exc}")
+            else:
+                if purged:
+                    logger.info(f"Purged {purged} finished jobs older than {self._ttl_s:.0f}s")
+            await asyncio.sleep(min(_SWEEP_INTERVAL_S, self._ttl_s))
+
+    async def _run(self, job_id: str) -> None:
+        store = self._store
+        record = await asyncio.to_thread(store.get, job_id)
+        if record is None or not await asyncio.to_thread(store.claim, job_id, owner=self._owner):
+            # Finished, or claimed by another runner.
+            return
+
+        path = store.upload_path(job_id)
+        if not await asyncio.to_thread(path.exists):
+            await asyncio.to_thread(store.fail, job_id, "Upload is missing")
+            return
+
+        # Progress callbacks run on the loop; one task writes the latest value at a time.
+        latest: list[tuple[int, int]] = []
+        writer: asyncio.Task[None] | None = None
+
+        async def write_progress() -> None:
+            while latest:
+                done, total = latest.pop()
+                await asyncio.to_thread(store.set_progress, job_id, done=done, total=total)
+
+        def on_progress(done: int, total: int) -> None:
+            nonlocal writer
+            latest[:] = [(done, total)]
+            if writer is None or writer.done():
+                writer = asyncio.create_task(write_progress())
+
+        try:
+            transcription, intelligence = await self._pipeline.transcribe_and_analyze_stream(
+                chunks=_read_chunks(path),
+                filename=record.filename,
+                use_cache=record.use_cache,
+                on_progress=on_progress,
+                priority=Priority.BATCH,
+            )
+        except StageOverloadedError:
+            # Background work yields to interactive requests instead of failing.
+            await asyncio.to_thread(store.set_status, job_id, "queued")
+            await asyncio.sleep(_REQUEUE_DELAY_S)
+            self._queue.put_nowait(job_id)
+            return
+        except AudioDecodingError as exc:
+            await asyncio.to_thread(store.fail, job_id, str(exc) or "Invalid or unsupported audio")
+            return
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning(f"Job {job_id} failed for {record.filename}: {exc}")
+            await asyncio.to_thread(store.fail, job_id, "Transcription failed")
+            return
+        finally:
+            if writer is not None:
+                await asyncio.gather(writer, return_exceptions=True)
+
+        response = TranscribeResponse(transcription=transcription, intelligence=intelligence)
+        await asyncio.to_thread(store.succeed, job_id, response.model_dump_json())
+        logger.info(f"Job {job_id} succeeded for {record.filename}")
+
+
+async def _read_chunks(path: Path) -> AsyncIterator[bytes]:
+    fh = await asyncio.to_thread(path.open, "rb")
+    try:
+        while chunk := await asyncio.to_thread(fh.read, _SPOOL_BATCH_BYTES):
+            yield chunk
+    finally:
+        fh.close()
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator
+
+from app.schemas.jobs import JobStatus
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    use_cache INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    segments_done INTEGER NOT NULL DEFAULT 0,
+    segments_total INTEGER,
+    result TEXT,
+    error TEXT,
+    owner TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS workers (
+    owner TEXT PRIMARY KEY,
+    heartbeat_at REAL NOT NULL
+);
+"""
+
+
+@dataclass(frozen=True)
+class JobRecord:
+    id: str
+    status: JobStatus
+    filename: str
+    use_cache: bool
+    created_at: float
+    updated_at: float
+    segments_done: int
+    segments_total: int | None
+    result_json: str | None
+    error: str | None
+
+
+class JobStore:
+    """SQLite-backed job table plus a directory holding the uploaded audio of unfinished jobs.
+
+    Methods block on SQLite and the filesystem and are safe to call from worker
+    threads: statements run under a lock, and the database is in WAL mode so
+    pollers never wait on a writer.
+
+    Several processes may share one store. Each unfinished job has an ``owner``
+    (the runner that queued or adopted it), runners record a heartbeat, and a job
+    moves to ``running`` only through :meth:`claim`, so it runs once.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self._root = Path(root)
+        self._uploads = self._root / "uploads"
+        self._uploads.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self._root / "jobs.sqlite3", check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        columns = {row["name"] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        if "owner" not in columns:
+            self._db.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+
+    def upload_path(self, job_id: str) -> Path:
+        return self._uploads / job_id
+
+    def new_id(self) -> str:
+        return uuid.uuid4().hex
+
+    def create(self, *, job_id: str, filename: str, use_cache: bool, owner: str) -> JobRecord:
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (id, status, filename, use_cache, created_at, updated_at, owner)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, "queued", filename, int(use_cache), now, now, owner),
+        )
+        record = self.get(job_id)
+        assert record is not None
+        return record
+
+    def get(self, job_id: str) -> JobRecord | None:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _to_record(row) if row is not None else None
+
+    def unfinished(self) -> list[str]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def heartbeat(self, owner: str) -> None:
+        self._execute(
+            "INSERT INTO workers (owner, heartbeat_at) VALUES (?, ?)"
+            " ON CONFLICT (owner) DO UPDATE SET heartbeat_at = excluded.heartbeat_at",
+            (owner, time.time()),
+        )
+
+    def claim(self, job_id: str, *, owner: str) -> bool:
+        """Move a queued job to ``running`` for ``owner``; ``False`` if it is no longer queued."""
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = 'running', owner = ?, updated_at = ? WHERE id = ? AND status = 'queued'",
+                (owner, time.time(), job_id),
+            )
+        return cursor.rowcount == 1
+
+    def adopt_orphans(self, *, owner: str, stale_after_s: float) -> list[str]:
+        """Re-queue for ``owner`` the unfinished jobs whose owner has no heartbeat within ``stale_after_s``."""
+        now = time.time()
+        cutoff = now - stale_after_s
+        with self._lock, self._transaction():
+            rows = self._db.execute(
+                "SELECT id FROM jobs WHERE status IN ('queued', 'running') AND (owner IS NULL OR owner NOT IN"
+                " (SELECT owner FROM workers WHERE heartbeat_at >= ?)) ORDER BY created_at",
+                (cutoff,),
+            ).fetchall()
+            ids = [row["id"] for row in rows]
+            self._db.executemany(
+                "UPDATE jobs SET status = 'queued', owner = ?, updated_at = ? WHERE id = ?",
+                [(owner, now, job_id) for job_id in ids],
+            )
+            self._db.execute("DELETE FROM workers WHERE heartbeat_at < ?", (cutoff,))
+        return ids
+
+    def release(self, owner: str) -> None:
+        """Hand ``owner``'s unfinished jobs to whichever runner adopts them next, and drop its heartbeat."""
+        with self._lock, self._transaction():
+            self._db.execute(
+                "UPDATE jobs SET status = 'queued', owner = NULL, updated_at = ?"
+                " WHERE owner = ? AND status IN ('queued', 'running')",
+                (time.time(), owner),
+            )
+            self._db.execute("DELETE FROM workers WHERE owner = ?", (owner,))
+
+    def set_status(self, job_id: str, status: JobStatus) -> None:
+        self._execute("UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?", (status, time.time(), job_id))
+
+    def set_progress(self, job_id: str, *, done: int, total: int) -> None:
+        self._execute(
+            "UPDATE jobs SET segments_done = ?, segments_total = ?, updated_at = ? WHERE id = ?",
+            (done, total, time.time(), job_id),
+        )
+
+    def succeed(self, job_id: str, result_json: str) -> None:
+        self._execute(
+            "UPDATE jobs SET status = 'succeeded', result = ?, updated_at = ? WHERE id = ?",
+            (result_json, time.time(), job_id),
+        )
+        self.upload_path(job_id).unlink(missing_ok=True)
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._execute(
+            "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+            (error, time.time(), job_id),
+        )
+        self.upload_path(job_id).unlink(missing_ok=True)
+
+    def purge_finished(self, *, older_than_s: float) -> int:
+        """Delete finished jobs last updated more than ``older_than_s`` ago, and uploads no job is waiting for."""
+        cutoff = time.time() - older_than_s
+        with self._lock:
+            purged = self._db.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?", (cutoff,)
+            ).rowcount
+        unfinished = set(self.unfinished())
+        for path in self._uploads.iterdir():
+            try:
+                if path.name not in unfinished and path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                continue
+        return purged
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _execute(self, sql: str, params: tuple[Any, ...]) -> None:
+        with self._lock:
+            self._db.execute(sql, params)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        # IMMEDIATE takes the write lock up front, so two processes cannot adopt the same job.
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+
+def _to_record(row: sqlite3.Row) -> JobRecord:
+    return JobRecord(
+        id=row["id"],
+        status=row["status"],
+        filename=row["filename"],
+        use_cache=bool(row["use_cache"]),
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+        segments_done=row["segments_done"],
+        segments_total=row["segments_total"],
+        result_json=row["result"],
+        error=row["error"],
+    )
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class JSONFieldEvent:
+    """A top-level field (``index is None``) or one element of a top-level array that finished parsing."""
+
+    key: str
+    value: Any
+    index: int | None = None
+
+
+class IncrementalJSONObjectParser:
+    """Scans a JSON object as it is generated and reports values as soon as they are complete.
+
+    Only the top level is tracked: a field is reported once its value is closed,
+    and elements of array-valued fields are also reported one by one, so a
+    client can render ``summary`` and each action item before the model has
+    finished the rest of the object. Fragments that fail to parse are dropped;
+    the caller validates the full document at the end.
+    """
+
+    def __init__(self) -> None:
+        self._buf = ""
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._token_start = 0
+        self._key: str | None = None
+        self._value_start: int | None = None
+        self._list_value = False
+        self._item_start: int | None = None
+        self._item_index = 0
+
+    @property
+    def text(self) -> str:
+        return self._buf
+
+    def feed(self, text: str) -> list[JSONFieldEvent]:
+        events: list[JSONFieldEvent] = []
+        start = len(self._buf)
+        self._buf += text
+        buf = self._buf
+
+        for i in range(start, len(buf)):
+            c = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._key is None:
+                        key = self._loads(buf[self._token_start : i + 1])
+                        self._key = key if isinstance(key, str) else buf[self._token_start + 1 : i]
+                continue
+
+            if c.isspace():
+                continue
+            if self._depth == 1 and self._key is not None and self._value_start is None and c != ":":
+                self._value_start = i
+            if self._depth == 2 and self._list_value and self._item_start is None and c not in ",]":
+                self._item_start = i
+
+            if c == '"':
+                self._in_string = True
+                self._token_start = i
+            elif c in "{[":
+                self._depth += 1
+                if self._depth == 2 and c == "[" and self._value_start == i:
+                    self._list_value = True
+            elif c in "}]":
+                if self._depth == 2 and self._list_value:
+                    self._close_item(buf, i, events)
+                self._depth -= 1
+                if self._depth == 1 and self._value_start is not None:
+                    self._close_field(buf[self._value_start : i + 1], events)
+                elif self._depth == 0 and self._value_start is not None:
+                    self._close_field(buf[self._value_start : i], events)
+            elif c == ",":
+                if self._depth == 1 and self._value_start is not None:
+                    self._close_field(buf[self._value_start : i], events)
+                elif self._depth == 2 and self._list_value:
+                    self._close_item(buf, i, events)
+
+        return events
+
+    def _close_item(self, buf: str, end: int, events: list[JSONFieldEvent]) -> None:
+        if self._item_start is None or self._key is None:
+            return
+        value = self._loads(buf[self._item_start : end])
+        self._item_start = None
+        if value is not _INVALID:
+            events.append(JSONFieldEvent(key=self._key, value=value, index=self._item_index))
+            self._item_index += 1
+
+    def _close_field(self, fragment: str, events: list[JSONFieldEvent]) -> None:
+        value = self._loads(fragment)
+        if self._key is not None and value is not _INVALID:
+            events.append(JSONFieldEvent(key=self._key, value=value))
+        self._key = None
+        self._value_start = None
+        self._list_value = False
+        self._item_start = None
+        self._item_index = 0
+
+    @staticmethod
+    def _loads(fragment: str) -> Any:
+        try:
+            return json.loads(fragment)
+        except json.JSONDecodeError:
+            return _INVALID
+
+
+_INVALID = object()
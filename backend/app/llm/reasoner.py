@@ -1,10 +1,18 @@
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+import contextlib
+import hashlib
+import json
+import re
+from typing import Any, AsyncContextManager, AsyncIterator, Sequence
 
 from pydantic import ValidationError
 
-from app.schemas.intelligence import IntelligenceResult
+from app.llm.json_stream import IncrementalJSONObjectParser
+from app.pipeline.scheduler import Priority, WorkScheduler
+from app.schemas.intelligence import ActionItem, Entity, IntelligencePartial, IntelligenceResult
+from app.services.cache import TieredCache
 from app.services.groq import GroqClient
 
 
@@ -14,22 +22,283 @@ _SYSTEM_PROMPT = (
     "Be concise but precise. If unsure, use null or empty lists."
 )
 
+_USER_PROMPT = (
+    "Analyze the transcript and extract structured intelligence. "
+    "Return JSON with keys: summary (string), intent (string), action_items (array), entities (array), sentiment (string|null), topics (array). "
+    "Action item object keys: description, owner, due_date, priority. "
+    "Entity object keys: type, value, confidence (0..1 or null). "
+    "Transcript:\n"
+)
+
+_REDUCE_PROMPT = (
+    "The following JSON array holds analyses of consecutive parts of one long transcript, in order. "
+    "Merge them into a single analysis of the whole conversation. "
+    "Return JSON with keys: summary (string), intent (string|null), sentiment (string|null), topics (array of strings). "
+    "Partial analyses:\n"
+)
+
+PROMPT_VERSION = hashlib.sha256(f"{_SYSTEM_PROMPT}\x00{_USER_PROMPT}\x00{_REDUCE_PROMPT}".encode()).hexdigest()[:16]
+
+_whitespace_re = re.compile(r"\s+")
+_sentence_re = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English; good enough to decide when to chunk.
+    return len(text) // 4 + 1
+
+
+def chunk_transcript(pieces: Sequence[str], *, max_tokens: int) -> list[str]:
+    """Greedily pack ``pieces`` (segments or sentences) into chunks of at most ``max_tokens``.
+
+    A single piece larger than the budget is split on word boundaries.
+    """
+    chunks: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+
+    def close() -> None:
+        nonlocal current, current_tokens
+        if current:
+            chunks.append(" ".join(current))
+        current, current_tokens = [], 0
+
+    for piece in pieces:
+        piece = piece.strip()
+        if not piece:
+            continue
+        tokens = estimate_tokens(piece)
+        if tokens > max_tokens:
+            close()
+            words = piece.split()
+            step = max(1, len(words) * max_tokens // tokens)
+            chunks.extend(" ".join(words[i : i + step]) for i in range(0, len(words), step))
+            continue
+        if current_tokens + tokens > max_tokens:
+            close()
+        current.append(piece)
+        current_tokens += tokens
+
+    close()
+    return chunks
+
+
+def merge_entities(results: Sequence[IntelligenceResult]) -> list[Entity]:
+    merged: dict[tuple[str, str], Entity] = {}
+    for result in results:
+        for entity in result.entities:
+            key = (entity.type.strip().lower(), _whitespace_re.sub(" ", entity.value).strip().casefold())
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = entity
+            elif (entity.confidence or 0.0) > (existing.confidence or 0.0):
+                merged[key] = existing.model_copy(update={"confidence": entity.confidence})
+    return list(merged.values())
+
+
+def merge_action_items(results: Sequence[IntelligenceResult]) -> list[ActionItem]:
+    merged: dict[str, ActionItem] = {}
+    for result in results:
+        for item in result.action_items:
+            key = _whitespace_re.sub(" ", item.description).strip().rstrip(".").casefold()
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = item
+                continue
+            updates = {
+                field: getattr(item, field)
+                for field in ("owner", "due_date", "priority")
+                if getattr(existing, field) is None and getattr(item, field) is not None
+            }
+            if updates:
+                merged[key] = existing.model_copy(update=updates)
+    return list(merged.values())
+
 
 class IntelligenceReasoner:
-    def __init__(self, *, groq: GroqClient) -> None:
+    def __init__(
+        self,
+        *,
+        groq: GroqClient,
+        cache: TieredCache | None = None,
+        context_budget_tokens: int = 6_000,
+        chunk_tokens: int = 3_000,
+        map_concurrency: int = 4,
+        scheduler: WorkScheduler | None = None,
+    ) -> None:
         self._groq = groq
+        self._cache = cache
+        self._scheduler = scheduler
+        self._context_budget_tokens = context_budget_tokens
+        self._chunk_tokens = chunk_tokens
+        self._map_concurrency = max(1, map_concurrency)
 
-    async def analyze(self, *, transcript: str) -> IntelligenceResult:
-        user_prompt = (
-            "Analyze the transcript and extract structured intelligence. "
-            "Return JSON with keys: summary (string), intent (string), action_items (array), entities (array), sentiment (string|null), topics (array). "
-            "Action item object keys: description, owner, due_date, priority. "
-            "Entity object keys: type, value, confidence (0..1 or null). "
-            "Transcript:\n" + transcript
+    @property
+    def cache(self) -> TieredCache | None:
+        return self._cache
+
+    @property
+    def scheduler(self) -> WorkScheduler | None:
+        return self._scheduler
+
+    def cache_key(self, transcript: str) -> str:
+        normalized = _whitespace_re.sub(" ", transcript).strip()
+        material = (
+            f"{PROMPT_VERSION}|{self._groq.llm_model}|{self._groq.llm_temperature}|{self._chunk_tokens}|{normalized}"
         )
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    async def analyze(
+        self,
+        *,
+        transcript: str,
+        segments: Sequence[str] | None = None,
+        use_cache: bool = True,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> IntelligenceResult:
+        """Analyze ``transcript``; long transcripts are map-reduced over chunks.
+
+        ``segments`` are the transcript's natural boundaries (STT segments or
+        utterances) and are used to cut chunks; without them the transcript is
+        split on sentence ends.
+        """
+        key = self.cache_key(transcript) if self._cache is not None and use_cache else None
+        if key is not None:
+            cached = await self._cache.get(key)
+            if cached is not None:
+                return IntelligenceResult.model_validate(cached)
+
+        if estimate_tokens(transcript) > self._context_budget_tokens:
+            pieces = segments if segments else _sentence_re.split(transcript)
+            chunks = chunk_transcript(pieces, max_tokens=self._chunk_tokens)
+            result = await self._map_reduce(chunks, use_cache=use_cache, priority=priority)
+        else:
+            result = await self._analyze_single(transcript, priority=priority)
+
+        if key is not None:
+            await self._cache.set(key, result.model_dump(mode="json"))
+        return result
 
-        raw: dict[str, Any] = await self._groq.chat_json(system_prompt=_SYSTEM_PROMPT, user_prompt=user_prompt)
+    async def analyze_stream(
+        self,
+        *,
+        transcript: str,
+        segments: Sequence[str] | None = None,
+        use_cache: bool = True,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> AsyncIterator[IntelligencePartial | IntelligenceResult]:
+        """Like :meth:`analyze`, but yields fields as the model generates them.
+
+        Yields ``IntelligencePartial`` events followed by exactly one validated
+        ``IntelligenceResult``. Cache hits and map-reduced transcripts yield the
+        result alone.
+        """
+        key = self.cache_key(transcript) if self._cache is not None and use_cache else None
+        if key is not None:
+            cached = await self._cache.get(key)
+            if cached is not None:
+                yield IntelligenceResult.model_validate(cached)
+                return
+
+        if estimate_tokens(transcript) > self._context_budget_tokens:
+            yield await self.analyze(transcript=transcript, segments=segments, use_cache=use_cache, priority=priority)
+            return
+
+        # The slot is held only while the model generates: deltas are read by a
+        # task and queued, so a slow consumer never keeps an LLM slot busy.
+        deltas: asyncio.Queue[str | None] = asyncio.Queue()
+
+        async def generate() -> None:
+            try:
+                async with self._slot(priority):
+                    async for delta in self._groq.chat_json_stream(
+                        system_prompt=_SYSTEM_PROMPT, user_prompt=_USER_PROMPT + transcript
+                    ):
+                        deltas.put_nowait(delta)
+            finally:
+                deltas.put_nowait(None)
+
+        parser = IncrementalJSONObjectParser()
+        producer = asyncio.create_task(generate())
+        try:
+            while (delta := await deltas.get()) is not None:
+                for event in parser.feed(delta):
+                    yield IntelligencePartial(field=event.key, value=event.value, index=event.index)
+            await producer
+        finally:
+            if not producer.done():
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+
+        try:
+            result = IntelligenceResult.model_validate_json(parser.text)
+        except ValidationError as exc:
+            raise RuntimeError(f"LLM returned invalid schema: {exc}") from exc
+
+        if key is not None:
+            await self._cache.set(key, result.model_dump(mode="json"))
+        yield result
+
+    async def _analyze_single(self, transcript: str, *, priority: Priority) -> IntelligenceResult:
+        raw = await self._chat(system_prompt=_SYSTEM_PROMPT, user_prompt=_USER_PROMPT + transcript, priority=priority)
         try:
             return IntelligenceResult.model_validate(raw)
         except ValidationError as exc:
             raise RuntimeError(f"LLM returned invalid schema: {exc}") from exc
+
+    async def _map_reduce(self, chunks: list[str], *, use_cache: bool, priority: Priority) -> IntelligenceResult:
+        semaphore = asyncio.Semaphore(self._map_concurrency)
+
+        async def analyze_chunk(chunk: str) -> IntelligenceResult:
+            # Never re-enter ``analyze``: a chunk is analyzed in one call even if
+            # it estimates above the budget, so map-reduce cannot recurse.
+            key = self.cache_key(chunk) if self._cache is not None and use_cache else None
+            if key is not None:
+                cached = await self._cache.get(key)
+                if cached is not None:
+                    return IntelligenceResult.model_validate(cached)
+            async with semaphore:
+                result = await self._analyze_single(chunk, priority=priority)
+            if key is not None:
+                await self._cache.set(key, result.model_dump(mode="json"))
+            return result
+
+        partials = list(await asyncio.gather(*(analyze_chunk(chunk) for chunk in chunks)))
+        if len(partials) == 1:
+            return partials[0]
+
+        digest = [
+            {"summary": p.summary, "intent": p.intent, "sentiment": p.sentiment, "topics": p.topics} for p in partials
+        ]
+        raw = await self._chat(
+            system_prompt=_SYSTEM_PROMPT,
+            user_prompt=_REDUCE_PROMPT + json.dumps(digest, ensure_ascii=False),
+            priority=priority,
+        )
+
+        topics = raw.get("topics")
+        if not isinstance(topics, list):
+            topics = list(dict.fromkeys(t for p in partials for t in p.topics))
+
+        try:
+            return IntelligenceResult.model_validate(
+                {
+                    "summary": raw.get("summary") or " ".join(p.summary for p in partials),
+                    "intent": raw.get("intent"),
+                    "sentiment": raw.get("sentiment"),
+                    "topics": topics,
+                    "action_items": merge_action_items(partials),
+                    "entities": merge_entities(partials),
+                }
+            )
+        except ValidationError as exc:
+            raise RuntimeError(f"LLM returned invalid schema: {exc}") from exc
+
+    async def _chat(self, *, system_prompt: str, user_prompt: str, priority: Priority) -> dict[str, Any]:
+        async with self._slot(priority):
+            return await self._groq.chat_json(system_prompt=system_prompt, user_prompt=user_prompt)
+
+    def _slot(self, priority: Priority) -> AsyncContextManager[None]:
+        if self._scheduler is None:
+            return contextlib.nullcontext()
+        return self._scheduler.slot(priority)
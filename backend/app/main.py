@@ -1,61 +1,92 @@
 from __future__ import annotations
 
+import asyncio
 import contextlib
 import logging
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import ORJSONResponse
+from prometheus_client import REGISTRY
 
 from app.api.router import api_router
+from app.api.routes.metrics import router as metrics_router
 from app.config.logging import configure_logging
 from app.config.settings import get_settings
-from app.llm.reasoner import IntelligenceReasoner
-from app.pipeline.voice_intelligence import VoiceIntelligencePipeline
-from app.services.groq import GroqClient
-from app.services.http import build_async_http_client
-from app.speech.decoders import build_decoder
-from app.speech.postprocess import TranscriptPostProcessor
-from app.speech.vad import VADConfig, VoiceActivityDetector
+from app.jobs.runner import JobRunner
+from app.jobs.store import JobStore
+from app.observability.collectors import PipelineCollector
+from app.observability.metrics import EndpointLabelMiddleware, set_metrics_enabled
+from app.pipeline.container import build_pipeline
+from app.services.http import build_async_http_client, build_http_transport
 
 logger = logging.getLogger(__name__)
 
 def create_app() -> FastAPI:
     settings = get_settings()
     configure_logging(settings)
+    set_metrics_enabled(settings.metrics_enabled)
 
     @contextlib.asynccontextmanager
     async def lifespan(app: FastAPI):
-        http = build_async_http_client(settings)
-        groq = GroqClient(settings=settings, http=http)
-        decoder = build_decoder(mode=settings.audio_decoder_mode, sample_rate_hz=settings.audio_sample_rate_hz)
+        http_transport = build_http_transport(settings)
+        http = build_async_http_client(settings, transport=http_transport)
+        pipeline = build_pipeline(settings=settings, http=http)
+        logger.info(
+            f"HTTP pool max_connections={settings.http_max_connections} "
+            f"keepalive={settings.http_max_keepalive_connections}/{settings.http_keepalive_expiry_s}s "
+            f"http2={http_transport.http2}"
+        )
+        if settings.http_warm_connections > 0:
+            try:
+                warmed = await asyncio.wait_for(
+                    pipeline.groq.warm_up(connections=settings.http_warm_connections, http2=http_transport.http2),
+                    timeout=settings.http_connect_timeout_s * 2,
+                )
+                wanted = 1 if http_transport.http2 else settings.http_warm_connections
+                logger.info(f"Warmed {warmed}/{wanted} upstream connections")
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(f"Upstream connection warm-up failed: {exc}")
         logger.info(
             f"Audio decoder mode={settings.audio_decoder_mode} sample_rate_hz={settings.audio_sample_rate_hz}"
         )
-        vad = VoiceActivityDetector(
-            config=VADConfig(
-                aggressiveness=settings.vad_aggressiveness,
-                sample_rate_hz=settings.audio_sample_rate_hz,
-                frame_ms=settings.vad_frame_ms,
-                padding_ms=settings.vad_padding_ms,
-            )
+        logger.info(
+            f"CPU executor kind={settings.cpu_executor_kind} workers={settings.cpu_executor_workers} "
+            f"max_pending={settings.cpu_executor_max_pending}"
         )
-        post = TranscriptPostProcessor()
-        reasoner = IntelligenceReasoner(groq=groq)
+
+        jobs = None
+        if settings.jobs_enabled:
+            jobs = JobRunner(
+                store=JobStore(settings.jobs_dir),
+                pipeline=pipeline,
+                workers=settings.jobs_workers,
+                max_queued=settings.jobs_max_queued,
+                ttl_s=settings.jobs_ttl_s,
+            )
+            jobs.start()
+            logger.info(f"Job queue dir={settings.jobs_dir} workers={settings.jobs_workers}")
+
+        collector = None
+        if settings.metrics_enabled:
+            collector = PipelineCollector(pipeline=pipeline, transport=http_transport)
+            REGISTRY.register(collector)
 
         app.state.http = http
-        app.state.pipeline = VoiceIntelligencePipeline(
-            groq=groq,
-            decoder=decoder,
-            vad=vad,
-            post=post,
-            reasoner=reasoner,
-            sample_rate_hz=settings.audio_sample_rate_hz,
-        )
+        app.state.http_transport = http_transport
+        app.state.pipeline = pipeline
+        app.state.jobs = jobs
 
         try:
             yield
         finally:
+            if collector is not None:
+                REGISTRY.unregister(collector)
+            if jobs is not None:
+                await jobs.stop()
+                jobs.store.close()
+            pipeline.cpu.shutdown()
+            await pipeline.decoder.aclose()
             await http.aclose()
 
     application = FastAPI(
@@ -73,5 +104,8 @@ def create_app() -> FastAPI:
     )
 
     application.include_router(api_router)
+    if settings.metrics_enabled:
+        application.include_router(metrics_router)
+        application.add_middleware(EndpointLabelMiddleware)
 
     return application
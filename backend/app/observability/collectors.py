@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterator
+
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+
+if TYPE_CHECKING:
+    from app.pipeline.voice_intelligence import VoiceIntelligencePipeline
+    from app.services.http import InstrumentedTransport
+
+
+class PipelineCollector(Collector):
+    """Exports the counters the pipeline components already keep, read at scrape time."""
+
+    def __init__(self, *, pipeline: VoiceIntelligencePipeline, transport: InstrumentedTransport | None) -> None:
+        self._pipeline = pipeline
+        self._transport = transport
+
+    def collect(self) -> Iterator[Metric]:
+        yield from self._schedulers()
+        yield from self._upstream()
+        yield from self._caches()
+
+        cpu = GaugeMetricFamily("voiceforge_cpu_stage_pending", "CPU stage jobs queued or running")
+        cpu.add_metric([], self._pipeline.cpu.pending)
+        yield cpu
+
+        if self._transport is not None:
+            stats = self._transport.stats()
+            in_flight = GaugeMetricFamily("voiceforge_http_pool_in_flight", "Upstream requests holding a connection")
+            in_flight.add_metric([], stats["in_flight"] or 0)
+            yield in_flight
+            saturated = CounterMetricFamily(
+                "voiceforge_http_pool_saturated", "Upstream requests that had to queue for a pooled connection"
+            )
+            saturated.add_metric([], stats["saturated"] or 0)
+            yield saturated
+            timeouts = CounterMetricFamily("voiceforge_http_pool_timeouts", "Pool acquire timeouts")
+            timeouts.add_metric([], stats["pool_timeouts"] or 0)
+            yield timeouts
+
+    def _schedulers(self) -> Iterator[Metric]:
+        limit = GaugeMetricFamily("voiceforge_scheduler_limit", "Adaptive concurrency limit", labels=["scheduler"])
+        in_flight = GaugeMetricFamily("voiceforge_scheduler_in_flight", "Calls holding a slot", labels=["scheduler"])
+        queued = GaugeMetricFamily(
+            "voiceforge_scheduler_queued", "Calls waiting for a slot", labels=["scheduler", "priority"]
+        )
+        outcomes = CounterMetricFamily(
+            "voiceforge_scheduler_calls",
+            "Scheduled calls by outcome (completed, rejected, dropped)",
+            labels=["scheduler", "priority", "outcome"],
+        )
+        for scheduler in (self._pipeline.stt_scheduler, self._pipeline.reasoner.scheduler):
+            if scheduler is None:
+                continue
+            stats = scheduler.stats()
+            limit.add_metric([scheduler.name], stats["limit"])
+            in_flight.add_metric([scheduler.name], stats["in_flight"])
+            for priority, n in stats["queued"].items():
+                queued.add_metric([scheduler.name, priority], n)
+            for outcome in ("completed", "rejected", "dropped"):
+                for priority, n in stats[outcome].items():
+                    outcomes.add_metric([scheduler.name, priority, outcome], n)
+        yield from (limit, in_flight, queued, outcomes)
+
+    def _upstream(self) -> Iterator[Metric]:
+        queue_depth = GaugeMetricFamily(
+            "voiceforge_upstream_queue_depth", "Requests waiting on the model's rate limiter", labels=["model"]
+        )
+        wait = CounterMetricFamily(
+            "voiceforge_upstream_rate_limit_wait_seconds", "Time spent waiting on the rate limiter", labels=["model"]
+        )
+        throttled = CounterMetricFamily(
+            "voiceforge_upstream_throttled", "429s and exhausted rate-limit headers observed", labels=["model"]
+        )
+        retries = CounterMetricFamily("voiceforge_upstream_retries", "Retried upstream attempts", labels=["model"])
+        for model, stats in self._pipeline.groq.scheduler.stats().items():
+            queue_depth.add_metric([model], stats["queue_depth"])
+            wait.add_metric([model], stats["wait_s_total"])
+            throttled.add_metric([model], stats["throttled"])
+            retries.add_metric([model], stats["retries"])
+        yield from (queue_depth, wait, throttled, retries)
+
+        hedge = self._pipeline.groq.stt_hedge
+        if hedge is not None:
+            hedges = CounterMetricFamily("voiceforge_stt_hedges", "Hedged STT requests by outcome", labels=["outcome"])
+            hedges.add_metric(["fired"], hedge.hedges_fired)
+            hedges.add_metric(["won"], hedge.hedges_won)
+            hedges.add_metric(["suppressed"], hedge.hedges_suppressed)
+            yield hedges
+
+    def _caches(self) -> Iterator[Metric]:
+        lookups = CounterMetricFamily(
+            "voiceforge_cache_lookups", "Cache lookups by result", labels=["cache", "result"]
+        )
+        tiers = dict(self._pipeline.transcription_cache.stats) if self._pipeline.transcription_cache else {}
+        if self._pipeline.reasoner.cache is not None:
+            tiers["llm"] = self._pipeline.reasoner.cache.stats
+        for name, stats in tiers.items():
+            lookups.add_metric([name, "hit"], stats.hits)
+            lookups.add_metric([name, "miss"], stats.misses)
+        yield lookups
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import contextlib
+import time
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from prometheus_client import Counter, Gauge, Histogram
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.observability.tracing import record_span
+
+# Route path of the request being served ("/transcribe", "/stream/transcribe", ...),
+# used as the ``endpoint`` label by everything the request calls.
+endpoint_label: ContextVar[str] = ContextVar("endpoint_label", default="internal")
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "voiceforge_http_request_seconds",
+    "HTTP request latency, until the response body has been sent",
+    ["endpoint", "method", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    "voiceforge_stage_seconds",
+    "Time spent in one pipeline stage (vad, encode, stt, transcribe, llm; decode and drain on WS flush), "
+    "including queueing",
+    ["stage", "endpoint"],
+    buckets=_LATENCY_BUCKETS,
+)
+DECODE_SECONDS = Histogram(
+    "voiceforge_decode_seconds",
+    "Time to decode a whole upload to PCM16, by decode path (riff, libsndfile, ffmpeg_pipe, ffmpeg_file)",
+    ["path", "endpoint"],
+    buckets=_LATENCY_BUCKETS,
+)
+UPSTREAM_SECONDS = Histogram(
+    "voiceforge_upstream_request_seconds",
+    "Latency of one Groq HTTP attempt, excluding rate-limiter waits",
+    ["model"],
+    buckets=_LATENCY_BUCKETS,
+)
+UPSTREAM_RESPONSES = Counter(
+    "voiceforge_upstream_responses",
+    "Groq HTTP attempts by status code ('error' for transport failures)",
+    ["model", "status"],
+)
+SEGMENTS_PER_REQUEST = Histogram(
+    "voiceforge_segments_per_request",
+    "VAD segments sent to STT per transcription",
+    ["endpoint"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+AUDIO_SECONDS = Counter(
+    "voiceforge_audio_seconds",
+    "Seconds of decoded audio processed",
+    ["endpoint"],
+)
+WS_INPUT_BYTES = Counter(
+    "voiceforge_ws_input_bytes",
+    "Binary WebSocket audio received, before decoding",
+    ["format"],
+)
+WS_SESSIONS = Gauge("voiceforge_ws_sessions", "Open WebSocket transcription sessions")
+WS_BUFFERED_PCM_BYTES = Gauge(
+    "voiceforge_ws_buffered_pcm_bytes",
+    "PCM held by WebSocket sessions: in the VAD, queued for STT, or deferred to flush",
+)
+
+_enabled = True
+
+
+def set_metrics_enabled(enabled: bool) -> None:
+    """Turn Prometheus recording on or off process-wide (``METRICS_ENABLED``)."""
+    global _enabled
+    _enabled = enabled
+
+
+def metrics_enabled() -> bool:
+    return _enabled
+
+
+@contextlib.contextmanager
+def time_stage(stage: str, **attrs: Any) -> Iterator[None]:
+    """Observe the body in ``STAGE_SECONDS`` and record it as a span of the current trace."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if _enabled:
+            STAGE_SECONDS.labels(stage, endpoint_label.get()).observe(elapsed)
+        record_span(stage, elapsed, start=start, **attrs)
+
+
+class EndpointLabelMiddleware:
+    """Sets ``endpoint_label`` for each HTTP/WebSocket request and records HTTP latency.
+
+    Paths with parameters (``/jobs/{job_id}``) and unknown paths are labelled
+    ``other`` so label cardinality stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._paths: frozenset[str] | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        if self._paths is None:
+            self._paths = frozenset(
+                path for route in scope["app"].routes if "{" not in (path := getattr(route, "path", "{"))
+            )
+        endpoint = scope["path"] if scope["path"] in self._paths else "other"
+        token = endpoint_label.set(endpoint)
+        try:
+            if scope["type"] == "websocket":
+                await self.app(scope, receive, send)
+                return
+
+            status = "500"
+            start = time.perf_counter()
+
+            async def send_with_status(message: Message) -> None:
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = str(message["status"])
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                HTTP_REQUEST_SECONDS.labels(endpoint, scope["method"], status).observe(time.perf_counter() - start)
+        finally:
+            endpoint_label.reset(token)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import contextlib
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+# The trace of the request or utterance being served; tasks spawned while it is
+# set inherit it, so concurrent STT calls all record into the same trace.
+current_trace: ContextVar[Trace | None] = ContextVar("current_trace", default=None)
+
+
+@dataclass(frozen=True)
+class Span:
+    name: str
+    start_s: float
+    duration_s: float
+    attrs: dict[str, Any] = field(default_factory=dict)
+
+
+class Trace:
+    """Pipeline stages of one request or WebSocket utterance, as flat timed spans."""
+
+    def __init__(self, *, start: float | None = None) -> None:
+        self._start = time.perf_counter() if start is None else start
+        self.spans: list[Span] = []
+
+    @property
+    def start(self) -> float:
+        return self._start
+
+    @contextlib.contextmanager
+    def activate(self) -> Iterator[Trace]:
+        token = current_trace.set(self)
+        try:
+            yield self
+        finally:
+            current_trace.reset(token)
+
+    def add(self, name: str, duration_s: float, *, start: float | None = None, **attrs: Any) -> None:
+        """Record a finished span; ``start`` is a ``time.perf_counter()`` value (default: now - duration)."""
+        if start is None:
+            start = time.perf_counter() - duration_s
+        self.spans.append(Span(name, start - self._start, duration_s, attrs))
+
+    def server_timing(self) -> str:
+        """``Server-Timing`` header value: one entry per span name, durations summed across calls."""
+        totals: dict[str, list[float]] = {}
+        for span in self.spans:
+            entry = totals.setdefault(span.name, [0.0, 0, 0])
+            entry[0] += span.duration_s
+            entry[1] += 1
+            entry[2] += span.attrs.get("bytes", 0)
+
+        metrics = []
+        for name, (duration_s, count, n_bytes) in totals.items():
+            desc = f"{count} calls" if count > 1 else ""
+            if n_bytes:
+                desc = f"{desc}, {n_bytes} B" if desc else f"{n_bytes} B"
+            metrics.append(f'{name};dur={duration_s * 1000:.1f}' + (f';desc="{desc}"' if desc else ""))
+        metrics.append(f"total;dur={(time.perf_counter() - self._start) * 1000:.1f}")
+        return ", ".join(metrics)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "total_ms": round((time.perf_counter() - self._start) * 1000, 2),
+            "spans": [
+                {
+                    "name": span.name,
+                    "start_ms": round(span.start_s * 1000, 2),
+                    "duration_ms": round(span.duration_s * 1000, 2),
+                    **span.attrs,
+                }
+                for span in self.spans
+            ],
+        }
+
+
+def record_span(name: str, duration_s: float, *, start: float | None = None, **attrs: Any) -> None:
+    trace = current_trace.get()
+    if trace is not None:
+        trace.add(name, duration_s, start=start, **attrs)
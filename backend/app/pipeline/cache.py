@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+from app.config.settings import Settings
+from app.schemas.transcription import TranscriptionResult
+from app.services.cache import CacheStats, DiskCache, LRUCache, TieredCache
+from app.speech.audio import PCM16Buffer
+from app.speech.vad import VADConfig
+
+
+def pcm_digest(pcm16: PCM16Buffer) -> str:
+    return hashlib.sha256(pcm16).hexdigest()
+
+
+class TranscriptionCache:
+    """Content-addressed transcription cache.
+
+    Whole transcriptions are keyed by the decoded PCM plus the STT model, VAD and
+    packing config; the per-segment texts of each STT upload are keyed by the
+    upload's PCM plus the STT model, so a re-upload that shares only some
+    uploads still reuses them.
+    """
+
+    def __init__(
+        self,
+        *,
+        transcripts: TieredCache,
+        segments: TieredCache,
+        stt_model: str,
+        vad_config: VADConfig,
+        pack_max_s: float = 0.0,
+        pack_gap_ms: int = 0,
+        upload_codec: str = "wav",
+    ) -> None:
+        self._transcripts = transcripts
+        self._segments = segments
+        vad = vad_config
+        self._transcript_ns = (
+            f"{stt_model}|{vad.sample_rate_hz}|{vad.aggressiveness}|{vad.frame_ms}|{vad.padding_ms}"
+            f"|{pack_max_s}|{pack_gap_ms}"
+        )
+        self._segment_ns = f"{stt_model}|{vad.sample_rate_hz}"
+        # Lossless codecs give the STT model the same input as WAV, so only lossy ones get their own entries.
+        if upload_codec == "ogg_opus":
+            self._transcript_ns += f"|{upload_codec}"
+            self._segment_ns += f"|{upload_codec}"
+
+    @classmethod
+    def from_settings(cls, settings: Settings, *, vad_config: VADConfig) -> TranscriptionCache:
+        def tier(name: str, max_entries: int) -> TieredCache:
+            disk = None
+            if settings.transcription_cache_dir:
+                disk = DiskCache(
+                    root=Path(settings.transcription_cache_dir) / name,
+                    max_bytes=settings.transcription_cache_max_disk_mb * 1024 * 1024,
+                    ttl_s=settings.transcription_cache_ttl_s,
+                )
+            return TieredCache(
+                memory=LRUCache(max_entries=max_entries, ttl_s=settings.transcription_cache_ttl_s),
+                disk=disk,
+            )
+
+        return cls(
+            transcripts=tier("transcripts", settings.transcription_cache_max_entries),
+            segments=tier("segments", settings.transcription_cache_segment_max_entries),
+            stt_model=settings.groq_stt_model,
+            vad_config=vad_config,
+            pack_max_s=settings.stt_pack_max_s,
+            pack_gap_ms=settings.stt_pack_gap_ms,
+            upload_codec=settings.stt_upload_codec,
+        )
+
+    @property
+    def stats(self) -> dict[str, CacheStats]:
+        return {"transcripts": self._transcripts.stats, "segments": self._segments.stats}
+
+    def transcript_key(self, digest: str) -> str:
+        return hashlib.sha256(f"{self._transcript_ns}|{digest}".encode()).hexdigest()
+
+    def segment_key(self, pcm16: PCM16Buffer) -> str:
+        return hashlib.sha256(f"{self._segment_ns}|{pcm_digest(pcm16)}".encode()).hexdigest()
+
+    async def get_transcript(self, key: str) -> TranscriptionResult | None:
+        value = await self._transcripts.get(key)
+        return TranscriptionResult.model_validate(value) if value is not None else None
+
+    async def put_transcript(self, key: str, result: TranscriptionResult) -> None:
+        await self._transcripts.set(key, result.model_dump(mode="json"))
+
+    async def get_segment_texts(self, key: str, *, count: int) -> list[str | None] | None:
+        """Per-segment texts of one upload, or ``None`` unless the entry holds exactly ``count``."""
+        value = await self._segments.get(key)
+        if value is None:
+            return None
+        # Entries written before packing hold a single segment's ``text``.
+        texts = value["texts"] if "texts" in value else [value["text"]]
+        return texts if len(texts) == count else None
+
+    async def put_segment_texts(self, key: str, texts: list[str | None]) -> None:
+        await self._segments.set(key, {"texts": texts})
@@ -2,34 +2,81 @@ from __future__ import annotations
 
 from functools import lru_cache
 
-from app.config.settings import get_settings
+import httpx
+
+from app.config.settings import Settings, get_settings
 from app.llm.reasoner import IntelligenceReasoner
+from app.pipeline.cache import TranscriptionCache
+from app.pipeline.executor import CPUStage
+from app.pipeline.scheduler import WorkScheduler
 from app.pipeline.voice_intelligence import VoiceIntelligencePipeline
+from app.services.cache import LRUCache, TieredCache
 from app.services.groq import GroqClient
 from app.services.http import build_async_http_client
+from app.speech.audio import upload_codec_available
 from app.speech.decoders import build_decoder
 from app.speech.postprocess import TranscriptPostProcessor
 from app.speech.vad import VADConfig, VoiceActivityDetector
 
 
-@lru_cache(maxsize=1)
-def get_pipeline() -> VoiceIntelligencePipeline:
-    settings = get_settings()
-    http = build_async_http_client(settings)
+def build_pipeline(*, settings: Settings, http: httpx.AsyncClient) -> VoiceIntelligencePipeline:
+    if not upload_codec_available(settings.stt_upload_codec):
+        raise RuntimeError(f"STT_UPLOAD_CODEC={settings.stt_upload_codec} is not supported by this libsndfile build")
+
     groq = GroqClient(settings=settings, http=http)
-    decoder = build_decoder(mode=settings.audio_decoder_mode, sample_rate_hz=settings.audio_sample_rate_hz)
+    decoder = build_decoder(
+        mode=settings.audio_decoder_mode,
+        sample_rate_hz=settings.audio_sample_rate_hz,
+        warm_processes=settings.ffmpeg_warm_processes,
+    )
 
-    vad = VoiceActivityDetector(
-        config=VADConfig(
-            aggressiveness=settings.vad_aggressiveness,
-            sample_rate_hz=settings.audio_sample_rate_hz,
-            frame_ms=settings.vad_frame_ms,
-            padding_ms=settings.vad_padding_ms,
-        )
+    vad_config = VADConfig(
+        aggressiveness=settings.vad_aggressiveness,
+        sample_rate_hz=settings.audio_sample_rate_hz,
+        frame_ms=settings.vad_frame_ms,
+        padding_ms=settings.vad_padding_ms,
+    )
+    vad = VoiceActivityDetector(config=vad_config)
+    transcription_cache = (
+        TranscriptionCache.from_settings(settings, vad_config=vad_config)
+        if settings.transcription_cache_enabled
+        else None
     )
 
     post = TranscriptPostProcessor()
-    reasoner = IntelligenceReasoner(groq=groq)
+    llm_cache = (
+        TieredCache(memory=LRUCache(max_entries=settings.llm_cache_max_entries, ttl_s=settings.llm_cache_ttl_s))
+        if settings.llm_cache_enabled
+        else None
+    )
+    stt_scheduler = WorkScheduler(
+        name="stt",
+        min_concurrency=settings.scheduler_min_concurrency,
+        max_concurrency=settings.scheduler_max_concurrency,
+        latency_target_s=settings.scheduler_stt_latency_target_s,
+        latency_per_unit_s=settings.scheduler_stt_latency_per_audio_s,
+        max_queued=settings.scheduler_max_queued,
+    )
+    llm_scheduler = WorkScheduler(
+        name="llm",
+        min_concurrency=settings.scheduler_min_concurrency,
+        max_concurrency=settings.scheduler_max_concurrency,
+        latency_target_s=settings.scheduler_llm_latency_target_s,
+        max_queued=settings.scheduler_max_queued,
+    )
+    reasoner = IntelligenceReasoner(
+        groq=groq,
+        cache=llm_cache,
+        context_budget_tokens=settings.llm_context_budget_tokens,
+        chunk_tokens=settings.llm_chunk_tokens,
+        map_concurrency=settings.llm_map_concurrency,
+        scheduler=llm_scheduler,
+    )
+    cpu = CPUStage(
+        kind=settings.cpu_executor_kind,
+        max_workers=settings.cpu_executor_workers,
+        max_pending=settings.cpu_executor_max_pending,
+    )
 
     return VoiceIntelligencePipeline(
         groq=groq,
@@ -38,4 +85,24 @@ def get_pipeline() -> VoiceIntelligencePipeline:
         post=post,
         reasoner=reasoner,
         sample_rate_hz=settings.audio_sample_rate_hz,
+        cpu=cpu,
+        stream_min_silence_ms=settings.stream_min_silence_ms,
+        stream_max_utterance_s=settings.stream_max_utterance_s,
+        stt_max_concurrency=settings.stt_max_concurrency,
+        stt_failure_policy=settings.stt_segment_failure_policy,
+        stt_segment_retries=settings.stt_segment_retries,
+        stt_pack_max_s=settings.stt_pack_max_s,
+        stt_pack_gap_ms=settings.stt_pack_gap_ms,
+        stt_upload_codec=settings.stt_upload_codec,
+        transcription_cache=transcription_cache,
+        analyze_batch_max_items=settings.analyze_batch_max_items,
+        analyze_batch_concurrency=settings.analyze_batch_concurrency,
+        stt_scheduler=stt_scheduler,
+        stream_partial_deadline_s=settings.stream_partial_deadline_s,
     )
+
+
+@lru_cache(maxsize=1)
+def get_pipeline() -> VoiceIntelligencePipeline:
+    settings = get_settings()
+    return build_pipeline(settings=settings, http=build_async_http_client(settings))
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Iterator, Literal, TypeVar
+
+T = TypeVar("T")
+
+ExecutorKind = Literal["thread", "process"]
+
+
+class StageOverloadedError(Exception):
+    pass
+
+
+def _detach(value: Any) -> Any:
+    if isinstance(value, memoryview):
+        return value.tobytes()
+    if isinstance(value, list):
+        return [_detach(v) for v in value]
+    return value
+
+
+def _call_detached(fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    return _detach(fn(*args, **kwargs))
+
+
+class CPUStage:
+    """Runs CPU-bound pipeline work (decode, VAD, WAV encoding) off the event loop.
+
+    ``max_pending`` bounds the number of jobs queued or running. Calls made with
+    ``shed=True`` are rejected with ``StageOverloadedError`` once the bound is
+    reached; work that belongs to an already admitted request passes
+    ``shed=False`` and waits its turn instead.
+
+    With ``kind="process"`` the callable and its arguments must be picklable.
+    ``memoryview`` arguments and results are copied to ``bytes`` at the process
+    boundary; thread pools pass them through untouched.
+    """
+
+    def __init__(self, *, kind: ExecutorKind = "thread", max_workers: int = 4, max_pending: int = 16) -> None:
+        self._kind = kind
+        self._executor: Executor
+        if kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="voiceforge-cpu")
+        self._max_pending = max(1, max_pending)
+        self._pending = 0
+
+    @property
+    def kind(self) -> ExecutorKind:
+        return self._kind
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def ensure_capacity(self) -> None:
+        if self._pending >= self._max_pending:
+            raise StageOverloadedError(f"CPU stage is saturated ({self._pending} jobs pending)")
+
+    @contextlib.contextmanager
+    def reserve(self) -> Iterator[None]:
+        """Hold one slot for the lifetime of a streamed request, shedding like ``run(shed=True)``.
+
+        Streamed uploads decode and segment their audio incrementally rather than
+        through one ``run`` call, so they are admitted here instead.
+        """
+        self.ensure_capacity()
+        self._pending += 1
+        try:
+            yield
+        finally:
+            self._pending -= 1
+
+    async def run(self, fn: Callable[..., T], /, *args: Any, shed: bool = True, **kwargs: Any) -> T:
+        if shed:
+            self.ensure_capacity()
+
+        if self._kind == "process":
+            args = tuple(_detach(a) for a in args)
+            kwargs = {k: _detach(v) for k, v in kwargs.items()}
+            call = functools.partial(_call_detached, fn, *args, **kwargs)
+        else:
+            call = functools.partial(fn, *args, **kwargs)
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, call)
+        finally:
+            self._pending -= 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
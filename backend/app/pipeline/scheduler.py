@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import logging
+import time
+from enum import IntEnum
+from typing import AsyncIterator, Awaitable, Callable, TypeVar
+
+from app.pipeline.executor import StageOverloadedError
+from app.services.rate_limit import is_retryable, track_throttled_time
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    """Lower runs first."""
+
+    FINAL = 0
+    INTERACTIVE = 1
+    PARTIAL = 2
+    BATCH = 3
+
+
+class DeadlineExceededError(Exception):
+    """Queued work whose deadline passed before it got a slot; it was dropped, not run."""
+
+
+class WorkScheduler:
+    """Process-wide admission control for one kind of upstream work (STT or LLM).
+
+    Callers wait in a priority queue for one of ``limit`` slots; within a class
+    order is FIFO. Each class holds at most ``max_queued`` waiters: beyond that,
+    ``PARTIAL`` evicts its oldest waiter (a newer partial supersedes it) and the
+    other classes raise ``StageOverloadedError``. Waiters with a deadline are
+    dropped with ``DeadlineExceededError`` once it passes.
+
+    ``limit`` adapts between ``min_concurrency`` and ``max_concurrency``
+    (AIMD): it grows by ``1/limit`` per call that finishes within its latency
+    budget and shrinks by ``backoff`` when calls run slower or fail with a sign
+    of upstream congestion (timeouts, 429s, 5xx), at most once per target
+    interval. Other failures and cancelled calls leave it unchanged.
+
+    A call's budget is ``latency_target_s`` plus ``latency_per_unit_s`` for each
+    unit of work it declares (audio seconds for STT), so large calls are not
+    mistaken for congestion. Its latency excludes time spent in rate limiters
+    and retry backoff, which measures throttling rather than upstream speed.
+    """
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        min_concurrency: int = 2,
+        max_concurrency: int = 16,
+        latency_target_s: float = 2.0,
+        latency_per_unit_s: float = 0.0,
+        max_queued: int = 256,
+        backoff: float = 0.8,
+    ) -> None:
+        self._name = name
+        self._min = max(1, min_concurrency)
+        self._max = max(self._min, max_concurrency)
+        self._target = latency_target_s
+        self._per_unit = latency_per_unit_s
+        self._max_queued = max_queued
+        self._backoff = backoff
+
+        self._limit = float(self._max)
+        self._in_flight = 0
+        self._seq = itertools.count()
+        self._heap: list[tuple[int, int, asyncio.Future[None], float | None]] = []
+        self._queued = {priority: 0 for priority in Priority}
+        self._last_decrease = 0.0
+
+        self.completed = {priority: 0 for priority in Priority}
+        self.rejected = {priority: 0 for priority in Priority}
+        self.dropped = {priority: 0 for priority in Priority}
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "queued": {p.name.lower(): n for p, n in self._queued.items()},
+            "completed": {p.name.lower(): n for p, n in self.completed.items()},
+            "rejected": {p.name.lower(): n for p, n in self.rejected.items()},
+            "dropped": {p.name.lower(): n for p, n in self.dropped.items()},
+        }
+
+    async def run(
+        self,
+        priority: Priority,
+        fn: Callable[[], Awaitable[T]],
+        *,
+        deadline: float | None = None,
+        units: float = 0.0,
+    ) -> T:
+        async with self.slot(priority, deadline=deadline, units=units):
+            return await fn()
+
+    @contextlib.asynccontextmanager
+    async def slot(
+        self, priority: Priority, *, deadline: float | None = None, units: float = 0.0
+    ) -> AsyncIterator[None]:
+        """Hold one slot for the body; ``deadline`` is a ``time.monotonic()`` timestamp."""
+        await self._acquire(priority, deadline)
+        budget_s = self._target + units * self._per_unit
+        start = time.monotonic()
+        with track_throttled_time() as throttled_s:
+            try:
+                yield
+            except asyncio.CancelledError:
+                self._release(priority, None, budget_s, ok=False)
+                raise
+            except BaseException as exc:
+                congested = isinstance(exc, TimeoutError) or is_retryable(exc)
+                elapsed = time.monotonic() - start - throttled_s[0]
+                self._release(priority, elapsed if congested else None, budget_s, ok=False)
+                raise
+        self._release(priority, time.monotonic() - start - throttled_s[0], budget_s, ok=True)
+
+    async def _acquire(self, priority: Priority, deadline: float | None) -> None:
+        if deadline is not None and time.monotonic() >= deadline:
+            self.dropped[priority] += 1
+            raise DeadlineExceededError(f"{self._name} {priority.name.lower()} work expired before queuing")
+
+        if not self._heap and self._in_flight < self.limit:
+            self._in_flight += 1
+            return
+
+        if self._queued[priority] >= self._max_queued:
+            if priority is not Priority.PARTIAL or not self._evict_oldest(priority):
+                self.rejected[priority] += 1
+                raise StageOverloadedError(f"{self._name} {priority.name.lower()} queue is full")
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (int(priority), next(self._seq), future, deadline))
+        self._queued[priority] += 1
+        try:
+            await future
+        except BaseException:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # The slot was handed over just as we were cancelled; pass it on.
+                self._in_flight -= 1
+                self._dispatch()
+            raise
+
+    def _release(self, priority: Priority, elapsed_s: float | None, budget_s: float, *, ok: bool) -> None:
+        self._in_flight -= 1
+        if ok:
+            self.completed[priority] += 1
+        if elapsed_s is not None:
+            self._adapt(elapsed_s, budget_s, ok=ok)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        while self._heap and self._in_flight < self.limit:
+            prio, _, future, deadline = heapq.heappop(self._heap)
+            priority = Priority(prio)
+            self._queued[priority] -= 1
+            if future.done():
+                continue
+            if deadline is not None and now >= deadline:
+                self.dropped[priority] += 1
+                future.set_exception(DeadlineExceededError(f"{self._name} {priority.name.lower()} work expired in queue"))
+                continue
+            self._in_flight += 1
+            future.set_result(None)
+
+    def _evict_oldest(self, priority: Priority) -> bool:
+        oldest = min(
+            (entry for entry in self._heap if entry[0] == priority and not entry[2].done()),
+            key=lambda entry: entry[1],
+            default=None,
+        )
+        if oldest is None:
+            return False
+        self._heap.remove(oldest)
+        heapq.heapify(self._heap)
+        self._queued[priority] -= 1
+        self.dropped[priority] += 1
+        oldest[2].set_exception(DeadlineExceededError(f"{self._name} {priority.name.lower()} work superseded"))
+        return True
+
+    def _adapt(self, elapsed_s: float, budget_s: float, *, ok: bool) -> None:
+        if ok and elapsed_s <= budget_s:
+            self._limit = min(float(self._max), self._limit + 1.0 / self._limit)
+            return
+
+        now = time.monotonic()
+        if now - self._last_decrease < self._target:
+            return
+        self._last_decrease = now
+        previous = self.limit
+        self._limit = max(float(self._min), self._limit * self._backoff)
+        if self.limit != previous:
+            logger.info(
+                f"{self._name} concurrency limit {previous} -> {self.limit} "
+                f"({'slow' if ok else 'failed'} call, {elapsed_s:.2f}s)"
+            )
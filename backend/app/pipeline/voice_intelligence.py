@@ -1,15 +1,47 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import logging
+import time
 from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Literal, Sequence
 
 from app.llm.reasoner import IntelligenceReasoner
-from app.schemas.intelligence import IntelligenceResult
+from app.observability.metrics import (
+    AUDIO_SECONDS,
+    DECODE_SECONDS,
+    SEGMENTS_PER_REQUEST,
+    STAGE_SECONDS,
+    endpoint_label,
+    metrics_enabled,
+    time_stage,
+)
+from app.observability.tracing import record_span
+from app.pipeline.cache import TranscriptionCache, pcm_digest
+from app.pipeline.executor import CPUStage, StageOverloadedError
+from app.pipeline.scheduler import DeadlineExceededError, Priority, WorkScheduler
+from app.schemas.intelligence import IntelligencePartial, IntelligenceResult
 from app.schemas.transcription import TranscriptSegment, TranscriptionResult
 from app.services.groq import GroqClient
-from app.speech.audio import pcm16_to_wav_bytes
+from app.speech.audio import UPLOAD_CODEC_FORMATS, PCM16Buffer, UploadCodec, as_byte_view, encode_pcm16
 from app.speech.decoders import AudioDecoder
+from app.speech.packing import SegmentPack, SegmentPacker, split_pack_text
 from app.speech.postprocess import TranscriptPostProcessor
-from app.speech.vad import VoiceActivityDetector
+from app.speech.vad import StreamingVAD, VoiceActivityDetector
+
+logger = logging.getLogger(__name__)
+
+SegmentFailurePolicy = Literal["skip", "retry", "fail"]
+
+# PCM handed to the worker thread per hash/VAD step of a streamed transcription (~8 s at 16 kHz).
+_STREAM_BATCH_BYTES = 256 * 1024
+
+# A ``verbose_json`` body that failed to parse or lacked the expected fields.
+_MALFORMED_STT_ERRORS = (KeyError, TypeError, ValueError)
+
+# Called with (segments transcribed, segments total) as STT work completes.
+ProgressCallback = Callable[[int, int], None]
 
 
 @dataclass
@@ -20,35 +52,452 @@ class VoiceIntelligencePipeline:
     post: TranscriptPostProcessor
     reasoner: IntelligenceReasoner
     sample_rate_hz: int
+    cpu: CPUStage
+    stream_min_silence_ms: int = 300
+    stream_max_utterance_s: float = 15.0
+    stt_max_concurrency: int = 4
+    stt_failure_policy: SegmentFailurePolicy = "fail"
+    stt_segment_retries: int = 2
+    stt_pack_max_s: float = 30.0
+    stt_pack_gap_ms: int = 500
+    stt_upload_codec: UploadCodec = "wav"
+    transcription_cache: TranscriptionCache | None = None
+    analyze_batch_max_items: int = 1_000
+    analyze_batch_concurrency: int = 8
+    stt_scheduler: WorkScheduler | None = None
+    stream_partial_deadline_s: float = 5.0
 
-    async def transcribe_and_analyze_file(self, *, audio_bytes: bytes, filename: str) -> tuple[TranscriptionResult, IntelligenceResult]:
-        pcm16 = self.decoder.decode(audio_bytes=audio_bytes, filename=filename)
-        transcription = await self.transcribe_pcm16(pcm16=pcm16, filename=filename)
-        intelligence = await self.reasoner.analyze(transcript=transcription.clean_transcript)
+    async def transcribe_and_analyze_file(
+        self,
+        *,
+        audio_bytes: bytes,
+        filename: str,
+        use_cache: bool = True,
+        on_progress: ProgressCallback | None = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> tuple[TranscriptionResult, IntelligenceResult]:
+        start = time.perf_counter()
+        decoded = await self.cpu.run(self.decoder.decode, audio_bytes=audio_bytes, filename=filename)
+        elapsed = time.perf_counter() - start
+        if metrics_enabled():
+            DECODE_SECONDS.labels(decoded.path, endpoint_label.get()).observe(elapsed)
+        record_span("decode", elapsed, start=start, bytes=len(audio_bytes), path=decoded.path)
+        transcription = await self.transcribe_pcm16(
+            pcm16=decoded.pcm16, filename=filename, use_cache=use_cache, on_progress=on_progress, priority=priority
+        )
+        intelligence = await self.analyze_transcription(transcription, use_cache=use_cache, priority=priority)
         return transcription, intelligence
 
-    async def transcribe_pcm16(self, *, pcm16: bytes, filename: str = "audio.wav") -> TranscriptionResult:
-        segments_pcm = self.vad.segment(pcm16)
-        if not segments_pcm:
-            segments_pcm = [pcm16]
+    async def transcribe_and_analyze_stream(
+        self,
+        *,
+        chunks: AsyncIterator[bytes],
+        filename: str,
+        use_cache: bool = True,
+        on_progress: ProgressCallback | None = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> tuple[TranscriptionResult, IntelligenceResult]:
+        with self.cpu.reserve():
+            pcm_chunks = self.decoder.decode_stream(chunks=chunks, filename=filename)
+            transcription = await self.transcribe_stream(
+                pcm_chunks=pcm_chunks,
+                filename=filename,
+                use_cache=use_cache,
+                on_progress=on_progress,
+                priority=priority,
+            )
+        intelligence = await self.analyze_transcription(transcription, use_cache=use_cache, priority=priority)
+        return transcription, intelligence
+
+    async def transcribe_stream(
+        self,
+        *,
+        pcm_chunks: AsyncIterator[PCM16Buffer],
+        filename: str = "audio.wav",
+        use_cache: bool = True,
+        on_progress: ProgressCallback | None = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> TranscriptionResult:
+        """Transcribe PCM as it is decoded: each pack of VAD segments goes to STT as soon as it is full.
+
+        Produces the same segments and cache entries as ``transcribe_pcm16`` over the
+        concatenated audio. Hashing and VAD run in a worker thread, one batch of
+        ``_STREAM_BATCH_BYTES`` at a time. The whole-transcription cache is consulted
+        once the last chunk has been hashed; a hit cancels the STT work still in flight.
+        ``on_progress`` totals count the segments found so far, so they grow until
+        the audio is exhausted.
+        """
+        semaphore = asyncio.Semaphore(max(1, self.stt_max_concurrency))
+        session = self.vad.stream()
+        packer = self._packer()
+        digest = hashlib.sha256()
+        tasks: list[asyncio.Task[list[TranscriptSegment | None]]] = []
+        n_segments = done = 0
+        # Audio is held only until the first segment closes, for the no-speech fallback.
+        unvoiced: bytearray | None = bytearray()
+
+        async def run(idx: int, pack: SegmentPack) -> list[TranscriptSegment | None]:
+            nonlocal done
+            async with semaphore:
+                segments = await self._transcribe_pack(
+                    idx=idx, pack=pack, filename=filename, use_cache=use_cache, priority=priority
+                )
+            done += len(pack.segments)
+            if on_progress is not None:
+                on_progress(done, n_segments)
+            return segments
+
+        def dispatch(packs: list[SegmentPack]) -> None:
+            for pack in packs:
+                tasks.append(asyncio.create_task(run(len(tasks), pack)))
+
+        def add(segments: list[tuple[int, bytes]]) -> None:
+            nonlocal n_segments
+            for offset, seg in segments:
+                n_segments += 1
+                dispatch(packer.add(seg, offset=offset))
+
+        def scan(batch: bytes) -> list[tuple[int, bytes]]:
+            # Runs in a worker thread; only one batch is in flight at a time.
+            digest.update(batch)
+            if unvoiced is not None:
+                unvoiced.extend(batch)
+            return session.feed_with_offsets(batch)
+
+        batch = bytearray()
+        audio_bytes = 0
+        # Time spent waiting for decoded PCM (which includes receiving the upload) vs. in the VAD.
+        decode_s = vad_s = 0.0
+        started = mark = time.perf_counter()
+
+        async def scan_batch() -> None:
+            nonlocal unvoiced, vad_s, mark
+            now = time.perf_counter()
+            add(await asyncio.to_thread(scan, bytes(batch)))
+            batch.clear()
+            if n_segments:
+                unvoiced = None
+            mark = time.perf_counter()
+            vad_s += mark - now
+
+        try:
+            async for pcm in pcm_chunks:
+                decode_s += time.perf_counter() - mark
+                mark = time.perf_counter()
+                audio_bytes += len(pcm)
+                batch.extend(pcm)
+                if len(batch) >= _STREAM_BATCH_BYTES:
+                    await scan_batch()
+            if batch:
+                await scan_batch()
+            add(session.flush_with_offsets())
+
+            if self.transcription_cache is not None and use_cache:
+                cache_key = self.transcription_cache.transcript_key(digest.hexdigest())
+                cached = await self.transcription_cache.get_transcript(cache_key)
+                if cached is not None:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                    return cached
+
+            if not n_segments and unvoiced:
+                add([(0, bytes(unvoiced))])
+            dispatch(packer.flush())
+            segments = [segment for pack in await asyncio.gather(*tasks) for segment in pack]
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        elapsed = time.perf_counter() - started
+        decode_path = self.decoder.stream_path(filename)
+        if metrics_enabled():
+            endpoint = endpoint_label.get()
+            DECODE_SECONDS.labels(decode_path, endpoint).observe(decode_s)
+            STAGE_SECONDS.labels("vad", endpoint).observe(vad_s)
+            STAGE_SECONDS.labels("transcribe", endpoint).observe(elapsed)
+            AUDIO_SECONDS.labels(endpoint).inc(audio_bytes / (2 * self.sample_rate_hz))
+            SEGMENTS_PER_REQUEST.labels(endpoint).observe(n_segments)
+        record_span("decode", decode_s, start=started, path=decode_path)
+        record_span("vad", vad_s, start=started)
+        record_span("transcribe", elapsed, start=started)
+        result = self._build_transcription(segments)
+        if self.transcription_cache is not None and use_cache and None not in segments:
+            await self.transcription_cache.put_transcript(cache_key, result)
+        return result
+
+    async def transcribe_pcm16(
+        self,
+        *,
+        pcm16: PCM16Buffer,
+        filename: str = "audio.wav",
+        use_cache: bool = True,
+        on_progress: ProgressCallback | None = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> TranscriptionResult:
+        view = as_byte_view(pcm16)
+        if metrics_enabled():
+            AUDIO_SECONDS.labels(endpoint_label.get()).inc(len(view) / (2 * self.sample_rate_hz))
+
+        cache_key = None
+        if self.transcription_cache is not None and use_cache:
+            cache_key = self.transcription_cache.transcript_key(await self.cpu.run(pcm_digest, view, shed=False))
+            cached = await self.transcription_cache.get_transcript(cache_key)
+            if cached is not None:
+                return cached
 
-        segment_models: list[TranscriptSegment] = []
-        segment_texts: list[str] = []
+        with time_stage("vad"):
+            ranges = await self.cpu.run(self.vad.segment_ranges, view)
+        ranges = ranges or [(0, len(view))]
+        if metrics_enabled():
+            SEGMENTS_PER_REQUEST.labels(endpoint_label.get()).observe(len(ranges))
+        packer = self._packer()
+        packs = [pack for start, end in ranges for pack in packer.add(view[start:end], offset=start)]
+        packs += packer.flush()
+        with time_stage("transcribe"):
+            segments = await self._transcribe_packs(
+                packs=packs,
+                filename=filename,
+                use_cache=use_cache,
+                on_progress=on_progress,
+                priority=priority,
+            )
+        result = self._build_transcription(segments)
 
-        for idx, seg in enumerate(segments_pcm):
-            wav = pcm16_to_wav_bytes(seg, sample_rate_hz=self.sample_rate_hz)
-            result = await self.groq.transcribe_audio(wav_bytes=wav, filename=f"segment-{idx}-{filename}")
+        if cache_key is not None and None not in segments:
+            await self.transcription_cache.put_transcript(cache_key, result)
+        return result
 
-            text = (result.get("text") or "").strip()
-            if text:
-                segment_texts.append(text)
-                segment_models.append(TranscriptSegment(text=text))
+    async def transcribe_segments(
+        self,
+        *,
+        segments_pcm: Sequence[PCM16Buffer],
+        filename: str = "audio.wav",
+        priority: Priority = Priority.INTERACTIVE,
+        deadline: float | None = None,
+    ) -> TranscriptionResult:
+        """Transcribe already-cut segments whose position in the source audio is not known (no timestamps)."""
+        packer = self._packer()
+        packs = [pack for seg in segments_pcm for pack in packer.add(seg)] + packer.flush()
+        segments = await self._transcribe_packs(packs=packs, filename=filename, priority=priority, deadline=deadline)
+        return self._build_transcription(segments)
 
-        raw_transcript = " ".join(segment_texts).strip()
+    def _packer(self) -> SegmentPacker:
+        return SegmentPacker(
+            sample_rate_hz=self.sample_rate_hz, max_pack_s=self.stt_pack_max_s, gap_ms=self.stt_pack_gap_ms
+        )
+
+    async def _transcribe_packs(
+        self,
+        *,
+        packs: Sequence[SegmentPack],
+        filename: str,
+        use_cache: bool = True,
+        on_progress: ProgressCallback | None = None,
+        priority: Priority = Priority.INTERACTIVE,
+        deadline: float | None = None,
+    ) -> list[TranscriptSegment | None]:
+        semaphore = asyncio.Semaphore(max(1, self.stt_max_concurrency))
+        total = sum(len(pack.segments) for pack in packs)
+        done = 0
+        if on_progress is not None:
+            on_progress(done, total)
+
+        async def run(idx: int, pack: SegmentPack) -> list[TranscriptSegment | None]:
+            nonlocal done
+            async with semaphore:
+                segments = await self._transcribe_pack(
+                    idx=idx, pack=pack, filename=filename, use_cache=use_cache, priority=priority, deadline=deadline
+                )
+            done += len(pack.segments)
+            if on_progress is not None:
+                on_progress(done, total)
+            return segments
+
+        tasks = [asyncio.create_task(run(idx, pack)) for idx, pack in enumerate(packs)]
+        try:
+            return [segment for pack in await asyncio.gather(*tasks) for segment in pack]
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    def _build_transcription(self, segments: Sequence[TranscriptSegment | None]) -> TranscriptionResult:
+        segment_models = [segment for segment in segments if segment is not None and segment.text]
+
+        raw_transcript = " ".join(segment.text for segment in segment_models).strip()
         clean_transcript = self.post.clean(raw_transcript)
 
         return TranscriptionResult(raw_transcript=raw_transcript, clean_transcript=clean_transcript, segments=segment_models)
 
-    async def analyze_transcript(self, *, transcript: str) -> IntelligenceResult:
+    async def _transcribe_pack(
+        self,
+        *,
+        idx: int,
+        pack: SegmentPack,
+        filename: str,
+        use_cache: bool = True,
+        priority: Priority = Priority.INTERACTIVE,
+        deadline: float | None = None,
+    ) -> list[TranscriptSegment | None]:
+        """Transcribe one STT upload into transcript segments (one ``None`` per packed VAD segment if skipped).
+
+        Packed segments that ``split_pack_text`` merged come back as one segment.
+        """
+        texts = None
+        segment_key = None
+        if self.transcription_cache is not None and use_cache:
+            segment_key = self.transcription_cache.segment_key(pack.pcm)
+            texts = await self.transcription_cache.get_segment_texts(segment_key, count=len(pack.segments))
+
+        if texts is None:
+            texts = await self._transcribe_pack_texts(
+                idx=idx, pack=pack, filename=filename, priority=priority, deadline=deadline
+            )
+            if texts is None:
+                return [None] * len(pack.segments)
+            if segment_key is not None:
+                await self.transcription_cache.put_segment_texts(segment_key, texts)
+
+        segments: list[TranscriptSegment | None] = []
+        for segment, text in zip(pack.segments, texts):
+            if text is None and segments:
+                # One STT segment spanned both: report them as a single segment.
+                segments[-1] = segments[-1].model_copy(update={"end_s": segment.end_s})
+            else:
+                segments.append(TranscriptSegment(start_s=segment.start_s, end_s=segment.end_s, text=text or ""))
+        return segments
+
+    async def _transcribe_pack_texts(
+        self,
+        *,
+        idx: int,
+        pack: SegmentPack,
+        filename: str,
+        priority: Priority,
+        deadline: float | None,
+    ) -> list[str | None] | None:
+        with time_stage("encode", codec=self.stt_upload_codec):
+            audio = await self.cpu.run(
+                encode_pcm16, pack.pcm, sample_rate_hz=self.sample_rate_hz, codec=self.stt_upload_codec, shed=False
+            )
+        extension, content_type = UPLOAD_CODEC_FORMATS[self.stt_upload_codec]
+        upload_name = f"segment-{idx}-{filename.rsplit('.', 1)[0]}.{extension}"
+        attempts = 1 + (max(0, self.stt_segment_retries) if self.stt_failure_policy == "retry" else 0)
+
+        for attempt in range(1, attempts + 1):
+            try:
+                with time_stage("stt", pack=idx, segments=len(pack.segments), bytes=len(audio)):
+                    result = await self._call_stt(
+                        audio,
+                        filename=upload_name,
+                        content_type=content_type,
+                        audio_s=len(pack.pcm) / (2 * self.sample_rate_hz),
+                        priority=priority,
+                        deadline=deadline,
+                    )
+                if not isinstance(result, dict) or "text" not in result:
+                    raise ValueError("STT response is not verbose_json")
+                return split_pack_text(pack, result)
+            except (DeadlineExceededError, StageOverloadedError):
+                raise
+            except Exception as exc:
+                # Only a malformed response may come out differently next time: transport errors and
+                # retryable statuses were already retried by the client, other statuses are deterministic.
+                if attempt < attempts and isinstance(exc, _MALFORMED_STT_ERRORS):
+                    logger.warning(f"STT pack {idx} failed (attempt {attempt}/{attempts}), retrying: {exc}")
+                    continue
+                if self.stt_failure_policy == "skip":
+                    logger.warning(f"STT pack {idx} ({len(pack.segments)} segments) failed, skipping: {exc}")
+                    return None
+                raise
+
+        return None
+
+    async def _call_stt(
+        self,
+        audio: bytes,
+        *,
+        filename: str,
+        content_type: str,
+        audio_s: float,
+        priority: Priority,
+        deadline: float | None,
+    ) -> dict[str, Any]:
+        if self.stt_scheduler is None:
+            return await self.groq.transcribe_audio(audio_bytes=audio, filename=filename, content_type=content_type)
+        return await self.stt_scheduler.run(
+            priority,
+            lambda: self.groq.transcribe_audio(audio_bytes=audio, filename=filename, content_type=content_type),
+            deadline=deadline,
+            units=audio_s,
+        )
+
+    def open_stream(self) -> StreamingVAD:
+        return self.vad.stream(
+            padding_ms=self.stream_min_silence_ms,
+            max_segment_ms=int(self.stream_max_utterance_s * 1000),
+        )
+
+    async def analyze_transcription(
+        self,
+        transcription: TranscriptionResult,
+        *,
+        use_cache: bool = True,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> IntelligenceResult:
+        with time_stage("llm"):
+            return await self.reasoner.analyze(
+                transcript=transcription.clean_transcript,
+                segments=[segment.text for segment in transcription.segments],
+                use_cache=use_cache,
+                priority=priority,
+            )
+
+    async def analyze_transcript(
+        self, *, transcript: str, use_cache: bool = True, priority: Priority = Priority.INTERACTIVE
+    ) -> IntelligenceResult:
         clean = self.post.clean(transcript)
-        return await self.reasoner.analyze(transcript=clean)
+        with time_stage("llm"):
+            return await self.reasoner.analyze(transcript=clean, use_cache=use_cache, priority=priority)
+
+    def analyze_transcript_stream(
+        self, *, transcript: str, use_cache: bool = True, priority: Priority = Priority.INTERACTIVE
+    ) -> AsyncIterator[IntelligencePartial | IntelligenceResult]:
+        return self.reasoner.analyze_stream(
+            transcript=self.post.clean(transcript), use_cache=use_cache, priority=priority
+        )
+
+    async def analyze_batch(
+        self, *, transcripts: Sequence[str], use_cache: bool = True
+    ) -> AsyncIterator[tuple[int, IntelligenceResult | Exception]]:
+        """Analyze ``transcripts`` with at most ``analyze_batch_concurrency`` in flight.
+
+        Yields ``(index, result)`` in completion order; a failed item yields its
+        exception instead of aborting the batch.
+        """
+        pending = iter(enumerate(transcripts))
+        done: asyncio.Queue[tuple[int, IntelligenceResult | Exception]] = asyncio.Queue()
+
+        async def worker() -> None:
+            for idx, transcript in pending:
+                try:
+                    result: IntelligenceResult | Exception = await self.analyze_transcript(
+                        transcript=transcript, use_cache=use_cache, priority=Priority.BATCH
+                    )
+                except Exception as exc:  # noqa: BLE001
+                    result = exc
+                await done.put((idx, result))
+
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(max(1, min(self.analyze_batch_concurrency, len(transcripts))))
+        ]
+        try:
+            for _ in range(len(transcripts)):
+                yield await done.get()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Any
+
 from pydantic import BaseModel, Field
 
 
@@ -25,6 +27,14 @@ class IntelligenceResult(BaseModel):
     topics: list[str] = Field(default_factory=list)
 
 
+class IntelligencePartial(BaseModel):
+    """A field of the intelligence result that finished generating; ``index`` marks one element of a list field."""
+
+    field: str
+    value: Any = None
+    index: int | None = None
+
+
 class AnalyzeRequest(BaseModel):
     transcript: str
 
@@ -33,3 +43,17 @@ class AnalyzeResponse(BaseModel):
     raw_transcript: str | None = None
     clean_transcript: str | None = None
     intelligence: IntelligenceResult
+
+
+class AnalyzeBatchRequest(BaseModel):
+    transcripts: list[str]
+
+
+class AnalyzeBatchItem(BaseModel):
+    index: int
+    result: AnalyzeResponse | None = None
+    error: str | None = None
+
+
+class AnalyzeBatchResponse(BaseModel):
+    results: list[AnalyzeBatchItem]
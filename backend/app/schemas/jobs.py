@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from typing import Literal
+
+from pydantic import BaseModel
+
+from app.schemas.transcription import TranscribeResponse
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+class JobProgress(BaseModel):
+    segments_done: int = 0
+    segments_total: int | None = None
+
+
+class JobResponse(BaseModel):
+    id: str
+    status: JobStatus
+    filename: str
+    created_at: float
+    updated_at: float
+    progress: JobProgress
+    result: TranscribeResponse | None = None
+    error: str | None = None
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    disk_hits: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class LRUCache:
+    """In-memory LRU with a per-entry TTL. Not thread-safe; use from the event loop."""
+
+    def __init__(self, *, max_entries: int, ttl_s: float | None = None) -> None:
+        self._max_entries = max(1, max_entries)
+        self._ttl_s = ttl_s
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Any | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at and expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        expires_at = time.monotonic() + self._ttl_s if self._ttl_s else 0.0
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self._max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class DiskCache:
+    """JSON file per key under ``root``, bounded by total size and TTL.
+
+    Every method blocks on file I/O; ``TieredCache`` calls them from worker threads.
+    """
+
+    def __init__(self, *, root: Path, max_bytes: int, ttl_s: float | None = None) -> None:
+        self._root = root
+        self._max_bytes = max_bytes
+        self._ttl_s = ttl_s
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._total_bytes = sum(size for _, _, size in self._files())
+        self.evictions = 0
+
+    def _path(self, key: str) -> Path:
+        return self._root / key[:2] / f"{key}.json"
+
+    def _files(self) -> list[tuple[float, Path, int]]:
+        files = []
+        for path in self._root.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                # Removed by a concurrent eviction or TTL check.
+                continue
+            files.append((stat.st_mtime, path, stat.st_size))
+        return files
+
+    def get(self, key: str) -> Any | None:
+        path = self._path(key)
+        try:
+            if self._ttl_s and time.time() - path.stat().st_mtime > self._ttl_s:
+                self._remove(path)
+                return None
+            return json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.warning(f"Disk cache read failed for {path.name}: {exc}")
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        payload = json.dumps(value, separators=(",", ":"))
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp.write_text(payload, encoding="utf-8")
+            with self._lock:
+                previous = path.stat().st_size if path.exists() else 0
+                os.replace(tmp, path)
+                self._total_bytes += len(payload) - previous
+                over = self._total_bytes > self._max_bytes
+        except OSError as exc:
+            logger.warning(f"Disk cache write failed for {path.name}: {exc}")
+            return
+        if over:
+            self._evict()
+
+    def _remove(self, path: Path) -> bool:
+        with self._lock:
+            try:
+                size = path.stat().st_size
+                path.unlink()
+            except OSError:
+                return False
+            self._total_bytes -= size
+        return True
+
+    def _evict(self) -> None:
+        target = int(self._max_bytes * 0.9)
+        for _, path, _ in sorted(self._files()):
+            if self._total_bytes <= target:
+                break
+            if self._remove(path):
+                self.evictions += 1
+
+
+class TieredCache:
+    """Memory LRU in front of an optional disk tier. Values must be JSON-serializable.
+
+    The memory tier is used from the event loop; disk reads and writes run in
+    worker threads so they never block it.
+    """
+
+    def __init__(self, *, memory: LRUCache, disk: DiskCache | None = None) -> None:
+        self._memory = memory
+        self._disk = disk
+        self._stats = CacheStats()
+
+    @property
+    def stats(self) -> CacheStats:
+        self._stats.evictions = self._memory.evictions + (self._disk.evictions if self._disk else 0)
+        return self._stats
+
+    async def get(self, key: str) -> Any | None:
+        value = self._memory.get(key)
+        if value is not None:
+            self._stats.hits += 1
+            return value
+
+        if self._disk is not None:
+            value = await asyncio.to_thread(self._disk.get, key)
+            if value is not None:
+                self._stats.hits += 1
+                self._stats.disk_hits += 1
+                self._memory.set(key, value)
+                return value
+
+        self._stats.misses += 1
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        self._memory.set(key, value)
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.set, key, value)
@@ -1,18 +1,54 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import json
-from typing import Any
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable
 
 import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import AsyncRetrying, RetryCallState, retry_if_exception, stop_after_attempt, wait_random_exponential
 
 from app.config.settings import Settings
+from app.observability.metrics import UPSTREAM_RESPONSES, UPSTREAM_SECONDS, metrics_enabled
+from app.services.hedging import HedgePolicy
+from app.services.rate_limit import RateLimiter, UpstreamScheduler, is_retryable, record_throttled_time
 
 
 class GroqClient:
     def __init__(self, *, settings: Settings, http: httpx.AsyncClient) -> None:
         self._settings = settings
         self._http = http
+        self._scheduler = UpstreamScheduler(
+            requests_per_minute=settings.groq_requests_per_minute,
+            burst=settings.groq_request_burst,
+        )
+        self._stt_hedge = (
+            HedgePolicy(
+                percentile=settings.stt_hedge_percentile,
+                min_delay_s=settings.stt_hedge_min_delay_s,
+                max_ratio=settings.stt_hedge_max_ratio,
+                min_samples=settings.stt_hedge_min_samples,
+            )
+            if settings.stt_hedge_enabled
+            else None
+        )
+
+    @property
+    def scheduler(self) -> UpstreamScheduler:
+        return self._scheduler
+
+    @property
+    def stt_hedge(self) -> HedgePolicy | None:
+        return self._stt_hedge
+
+    @property
+    def llm_model(self) -> str:
+        return self._settings.groq_llm_model
+
+    @property
+    def llm_temperature(self) -> float:
+        return self._settings.llm_temperature
 
     @property
     def _headers(self) -> dict[str, str]:
@@ -20,14 +56,29 @@ class GroqClient:
             "Authorization": f"Bearer {self._settings.groq_api_key.get_secret_value()}",
         }
 
-    @retry(wait=wait_exponential(multiplier=0.5, min=0.5, max=8), stop=stop_after_attempt(3))
+    async def warm_up(self, *, connections: int, http2: bool = False) -> int:
+        """Open up to ``connections`` pooled connections (TCP + TLS) ahead of the first real request.
+
+        Uses the cheap ``GET /models`` listing; returns how many requests succeeded.
+        Over HTTP/2 every request shares one connection, so a single request warms it.
+        """
+        url = f"{self._settings.groq_base_url}/models"
+        requests = min(1, connections) if http2 else connections
+        results = await asyncio.gather(
+            *(self._http.get(url, headers=self._headers) for _ in range(max(0, requests))),
+            return_exceptions=True,
+        )
+        return sum(1 for result in results if isinstance(result, httpx.Response))
+
     async def transcribe_audio(
         self,
         *,
-        wav_bytes: bytes,
+        audio_bytes: bytes,
         filename: str = "audio.wav",
+        content_type: str = "audio/wav",
         prompt: str | None = None,
     ) -> dict[str, Any]:
+        """Transcribe one audio file; with hedging enabled an HTTP attempt that outlives the hedge delay is duplicated."""
         url = f"{self._settings.groq_base_url}/audio/transcriptions"
 
         data: dict[str, Any] = {
@@ -38,14 +89,16 @@ class GroqClient:
             data["prompt"] = prompt
 
         files = {
-            "file": (filename, wav_bytes, "audio/wav"),
+            "file": (filename, audio_bytes, content_type),
         }
 
-        resp = await self._http.post(url, headers=self._headers, data=data, files=files)
-        resp.raise_for_status()
+        resp = await self._send(
+            self._settings.groq_stt_model,
+            lambda: self._http.post(url, headers=self._headers, data=data, files=files),
+            hedge=self._stt_hedge,
+        )
         return resp.json()
 
-    @retry(wait=wait_exponential(multiplier=0.5, min=0.5, max=8), stop=stop_after_attempt(3))
     async def chat_json(
         self,
         *,
@@ -56,17 +109,9 @@ class GroqClient:
         max_tokens: int | None = None,
     ) -> dict[str, Any]:
         url = f"{self._settings.groq_base_url}/chat/completions"
-
-        payload: dict[str, Any] = {
-            "model": self._settings.groq_llm_model,
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            "temperature": temperature if temperature is not None else self._settings.llm_temperature,
-            "max_tokens": max_tokens if max_tokens is not None else self._settings.llm_max_tokens,
-            "response_format": {"type": "json_object"},
-        }
+        payload = self._chat_payload(
+            system_prompt=system_prompt, user_prompt=user_prompt, temperature=temperature, max_tokens=max_tokens
+        )
 
         if schema_hint is not None:
             payload["tools"] = [
@@ -81,8 +126,11 @@ class GroqClient:
             ]
             payload["tool_choice"] = {"type": "function", "function": {"name": "emit_json"}}
 
-        resp = await self._http.post(url, headers={**self._headers, "Content-Type": "application/json"}, content=json.dumps(payload))
-        resp.raise_for_status()
+        body = json.dumps(payload)
+        resp = await self._send(
+            self._settings.groq_llm_model,
+            lambda: self._http.post(url, headers={**self._headers, "Content-Type": "application/json"}, content=body),
+        )
         data = resp.json()
 
         choice = data["choices"][0]
@@ -96,3 +144,172 @@ class GroqClient:
         if not content:
             raise RuntimeError("Groq chat completion returned empty content")
         return json.loads(content)
+
+    async def chat_json_stream(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+    ) -> AsyncIterator[str]:
+        """Stream the JSON completion as content deltas.
+
+        Rate limited like the other calls but not retried: once deltas have been
+        handed to the caller a retry would replay them.
+        """
+        url = f"{self._settings.groq_base_url}/chat/completions"
+        payload = self._chat_payload(
+            system_prompt=system_prompt, user_prompt=user_prompt, temperature=temperature, max_tokens=max_tokens
+        )
+        payload["stream"] = True
+
+        model = self._settings.groq_llm_model
+        limiter = self._scheduler.for_model(model)
+        await limiter.acquire()
+        start = time.perf_counter()
+        status = "error"
+        try:
+            async with self._http.stream(
+                "POST", url, headers={**self._headers, "Content-Type": "application/json"}, content=json.dumps(payload)
+            ) as resp:
+                status = str(resp.status_code)
+                limiter.observe(resp.status_code, resp.headers)
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:") :].strip()
+                    if data == "[DONE]":
+                        break
+                    choices = json.loads(data).get("choices") or []
+                    if not choices:
+                        continue
+                    content = (choices[0].get("delta") or {}).get("content")
+                    if content:
+                        yield content
+        finally:
+            if metrics_enabled():
+                UPSTREAM_RESPONSES.labels(model, status).inc()
+                UPSTREAM_SECONDS.labels(model).observe(time.perf_counter() - start)
+
+    async def _send(
+        self,
+        model: str,
+        request: Callable[[], Awaitable[httpx.Response]],
+        *,
+        hedge: HedgePolicy | None = None,
+    ) -> httpx.Response:
+        """Send ``request`` through the model's rate limiter.
+
+        Only transport errors and retryable statuses (429, 5xx, ...) are retried,
+        with jittered exponential backoff; a 429 additionally holds every caller
+        of the model until ``Retry-After`` has passed. With a ``hedge`` policy each
+        attempt may be duplicated once it has admitted through the limiter.
+        """
+        limiter = self._scheduler.for_model(model)
+
+        def count_retry(state: RetryCallState) -> None:
+            limiter.retries += 1
+            record_throttled_time(state.upcoming_sleep)
+
+        async for attempt in AsyncRetrying(
+            retry=retry_if_exception(is_retryable),
+            wait=wait_random_exponential(multiplier=0.5, max=8),
+            stop=stop_after_attempt(max(1, self._settings.groq_max_attempts)),
+            before_sleep=count_retry,
+            reraise=True,
+        ):
+            with attempt:
+                await limiter.acquire()
+                if hedge is None:
+                    resp = await self._attempt(model, limiter, request)
+                else:
+                    resp = await self._hedged_attempt(hedge, model, limiter, request)
+                resp.raise_for_status()
+        return resp
+
+    async def _attempt(
+        self, model: str, limiter: RateLimiter, request: Callable[[], Awaitable[httpx.Response]]
+    ) -> httpx.Response:
+        start = time.perf_counter()
+        try:
+            resp = await request()
+        except httpx.TransportError:
+            if metrics_enabled():
+                UPSTREAM_RESPONSES.labels(model, "error").inc()
+            raise
+        if metrics_enabled():
+            UPSTREAM_SECONDS.labels(model).observe(time.perf_counter() - start)
+            UPSTREAM_RESPONSES.labels(model, str(resp.status_code)).inc()
+        limiter.observe(resp.status_code, resp.headers)
+        return resp
+
+    async def _hedged_attempt(
+        self,
+        hedge: HedgePolicy,
+        model: str,
+        limiter: RateLimiter,
+        request: Callable[[], Awaitable[httpx.Response]],
+    ) -> httpx.Response:
+        """One admitted attempt, duplicated if it outlives the hedge delay.
+
+        The duplicate needs a free limiter slot, so hedging pauses while the
+        model is throttled or callers are queued. Latency is measured from
+        admission, so limiter waits never raise the hedge delay.
+        """
+        hedge.calls += 1
+        start = time.monotonic()
+        primary = asyncio.create_task(self._attempt(model, limiter, request))
+        tasks = {primary}
+        try:
+            delay = hedge.delay_s()
+            if delay is not None:
+                await asyncio.wait(tasks, timeout=delay)
+                if not primary.done():
+                    # Budget first: a limiter slot taken for a hedge that is not sent would be wasted.
+                    fired = hedge.can_fire() and limiter.try_acquire()
+                    hedge.record(fired=fired)
+                    if fired:
+                        tasks.add(asyncio.create_task(self._attempt(model, limiter, request)))
+
+            failed: httpx.Response | BaseException | None = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is None and task.result().is_success:
+                        if task is not primary:
+                            hedge.hedges_won += 1
+                        hedge.observe(time.monotonic() - start)
+                        return task.result()
+                    failed = failed or error or task.result()
+            assert failed is not None
+            if isinstance(failed, BaseException):
+                raise failed
+            return failed
+        finally:
+            for task in tasks | {primary}:
+                if not task.done():
+                    task.cancel()
+                    with contextlib.suppress(BaseException):
+                        await task
+
+    def _chat_payload(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float | None,
+        max_tokens: int | None,
+    ) -> dict[str, Any]:
+        return {
+            "model": self._settings.groq_llm_model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            "temperature": temperature if temperature is not None else self._settings.llm_temperature,
+            "max_tokens": max_tokens if max_tokens is not None else self._settings.llm_max_tokens,
+            "response_format": {"type": "json_object"},
+        }
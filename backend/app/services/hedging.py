@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from collections import deque
+
+
+class HedgePolicy:
+    """Decides when a slow call gets a duplicate ("hedge") and keeps the hedge budget.
+
+    The hedge delay is the ``percentile`` of recent successful latencies (never
+    below ``min_delay_s``); no hedges are sent until ``min_samples`` latencies
+    have been seen. At most ``max_ratio`` of calls may be hedged.
+    """
+
+    def __init__(
+        self,
+        *,
+        percentile: float = 95.0,
+        min_delay_s: float = 0.5,
+        max_ratio: float = 0.1,
+        min_samples: int = 20,
+        window: int = 512,
+    ) -> None:
+        self._percentile = min(max(percentile, 0.0), 100.0)
+        self._min_delay_s = min_delay_s
+        self._max_ratio = max_ratio
+        self._min_samples = max(1, min_samples)
+        self._latencies: deque[float] = deque(maxlen=window)
+
+        self.calls = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self.hedges_suppressed = 0
+
+    def delay_s(self) -> float | None:
+        """Seconds to wait for the primary before hedging, or ``None`` while there is too little history."""
+        if len(self._latencies) < self._min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        rank = min(len(ordered) - 1, int(round(self._percentile / 100.0 * (len(ordered) - 1))))
+        return max(self._min_delay_s, ordered[rank])
+
+    def can_fire(self) -> bool:
+        """Whether the hedge budget has room for one more duplicate; spends nothing."""
+        return self.hedges_fired + 1 <= self._max_ratio * self.calls
+
+    def record(self, *, fired: bool) -> None:
+        """Count one hedge decision: a duplicate sent, or one the budget or the upstream suppressed."""
+        if fired:
+            self.hedges_fired += 1
+        else:
+            self.hedges_suppressed += 1
+
+    def observe(self, latency_s: float) -> None:
+        self._latencies.append(latency_s)
+
+    def stats(self) -> dict[str, float | int | None]:
+        return {
+            "calls": self.calls,
+            "hedges_fired": self.hedges_fired,
+            "hedges_won": self.hedges_won,
+            "hedges_suppressed": self.hedges_suppressed,
+            "delay_s": self.delay_s(),
+        }
@@ -1,10 +1,144 @@
 from __future__ import annotations
 
+import importlib.util
+import logging
+import time
+from typing import AsyncIterator
+
 import httpx
 
 from app.config.settings import Settings
 
+logger = logging.getLogger(__name__)
+
+_SATURATION_LOG_INTERVAL_S = 10.0
+
+# Concurrent streams assumed per HTTP/2 connection (the common SETTINGS_MAX_CONCURRENT_STREAMS).
+_H2_STREAMS_PER_CONNECTION = 100
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    def __init__(self, inner: httpx.AsyncByteStream, transport: InstrumentedTransport) -> None:
+        self._inner = inner
+        self._transport = transport
+        self._closed = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._inner:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._inner.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._transport._release()
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Counts requests holding a pooled connection, from send until the response body is closed.
+
+    More in-flight requests than the pool can carry means callers are queuing
+    inside it; that is counted as saturation and logged. Over HTTP/1.1 that is
+    one request per connection, over HTTP/2 ``_H2_STREAMS_PER_CONNECTION``.
+    """
+
+    def __init__(
+        self, inner: httpx.AsyncBaseTransport, *, max_connections: int | None, http2: bool = False
+    ) -> None:
+        self._inner = inner
+        self._max_connections = max_connections
+        self._capacity = (
+            max_connections * _H2_STREAMS_PER_CONNECTION if http2 and max_connections is not None else max_connections
+        )
+        self._last_saturation_log = 0.0
+        self.http2 = http2
+
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.saturated = 0
+        self.pool_timeouts = 0
+
+    def stats(self) -> dict[str, int | None]:
+        return {
+            "max_connections": self._max_connections,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "requests": self.requests,
+            "saturated": self.saturated,
+            "pool_timeouts": self.pool_timeouts,
+        }
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        if self._capacity is not None and self.in_flight > self._capacity:
+            self.saturated += 1
+            self._log_saturation()
+
+        try:
+            response = await self._inner.handle_async_request(request)
+        except httpx.PoolTimeout:
+            self.pool_timeouts += 1
+            self._release()
+            raise
+        except BaseException:
+            self._release()
+            raise
+
+        assert isinstance(response.stream, httpx.AsyncByteStream)
+        response.stream = _TrackedStream(response.stream, self)
+        return response
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+
+    def _log_saturation(self) -> None:
+        now = time.monotonic()
+        if now - self._last_saturation_log >= _SATURATION_LOG_INTERVAL_S:
+            self._last_saturation_log = now
+            protocol = "HTTP/2" if self.http2 else "HTTP/1.1"
+            logger.warning(
+                f"HTTP pool saturated: {self.in_flight} requests for {self._max_connections} {protocol} connections "
+                f"(saturated={self.saturated}, pool_timeouts={self.pool_timeouts})"
+            )
+
+
+def build_http_transport(settings: Settings) -> InstrumentedTransport:
+    http2 = settings.http2_enabled
+    if http2 and not http2_available():
+        logger.warning("HTTP2_ENABLED is set but the 'h2' package is not installed; using HTTP/1.1")
+        http2 = False
+
+    inner = httpx.AsyncHTTPTransport(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_s,
+        ),
+    )
+    return InstrumentedTransport(inner, max_connections=settings.http_max_connections, http2=http2)
+
 
-def build_async_http_client(settings: Settings) -> httpx.AsyncClient:
-    timeout = httpx.Timeout(settings.http_timeout_s)
-    return httpx.AsyncClient(timeout=timeout)
+def build_async_http_client(
+    settings: Settings, *, transport: httpx.AsyncBaseTransport | None = None
+) -> httpx.AsyncClient:
+    timeout = httpx.Timeout(
+        settings.http_timeout_s,
+        connect=settings.http_connect_timeout_s,
+        read=settings.http_read_timeout_s if settings.http_read_timeout_s is not None else settings.http_timeout_s,
+        write=settings.http_write_timeout_s if settings.http_write_timeout_s is not None else settings.http_timeout_s,
+        pool=settings.http_pool_timeout_s,
+    )
+    return httpx.AsyncClient(timeout=timeout, transport=transport or build_http_transport(settings))
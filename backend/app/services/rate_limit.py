@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import re
+import time
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from typing import Iterator, Mapping
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+_DEFAULT_THROTTLE_S = 1.0
+_SLOW_WAIT_S = 1.0
+_duration_re = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+# Seconds the current call has spent held back by rate limiting (see ``track_throttled_time``).
+_throttled_s: ContextVar[list[float] | None] = ContextVar("throttled_s", default=None)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUSES
+    return isinstance(exc, httpx.TransportError)
+
+
+@contextlib.contextmanager
+def track_throttled_time() -> Iterator[list[float]]:
+    """Sum, in the yielded one-item list, the time calls in this context wait in limiters and retry backoff."""
+    total = [0.0]
+    token = _throttled_s.set(total)
+    try:
+        yield total
+    finally:
+        _throttled_s.reset(token)
+
+
+def record_throttled_time(seconds: float) -> None:
+    total = _throttled_s.get()
+    if total is not None:
+        total[0] += seconds
+
+
+def parse_duration_s(value: str | None) -> float | None:
+    """Parse Groq's reset durations (``"7.66s"``, ``"2m59.56s"``, ``"120ms"``) or plain seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parts = _duration_re.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def parse_retry_after_s(value: str | None) -> float | None:
+    if not value:
+        return None
+    seconds = parse_duration_s(value)
+    if seconds is not None:
+        return seconds
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Token bucket for one upstream model, tightened by the rate-limit headers it sees.
+
+    Callers queue in FIFO order in :meth:`acquire` instead of being rejected.
+    A ``429`` (honouring ``Retry-After``) or an exhausted
+    ``x-ratelimit-remaining-*`` header closes the gate until the advertised reset.
+    """
+
+    def __init__(self, *, name: str, requests_per_minute: float, burst: int) -> None:
+        self._name = name
+        self._rate = max(requests_per_minute, 1e-6) / 60.0
+        self._capacity = float(max(1, burst))
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+        self.queue_depth = 0
+        self.acquired = 0
+        self.wait_s_total = 0.0
+        self.wait_s_max = 0.0
+        self.throttled = 0
+        self.retries = 0
+
+    async def acquire(self) -> float:
+        """Wait for a request slot; returns the time spent waiting."""
+        start = time.monotonic()
+        self.queue_depth += 1
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    delay = self._blocked_until - now
+                    if delay <= 0:
+                        if self._tokens >= 1.0:
+                            self._tokens -= 1.0
+                            break
+                        delay = (1.0 - self._tokens) / self._rate
+                    await asyncio.sleep(delay)
+        finally:
+            self.queue_depth -= 1
+
+        waited = time.monotonic() - start
+        record_throttled_time(waited)
+        self.acquired += 1
+        self.wait_s_total += waited
+        self.wait_s_max = max(self.wait_s_max, waited)
+        if waited >= _SLOW_WAIT_S:
+            logger.info(f"Upstream {self._name} request queued {waited:.2f}s (queue_depth={self.queue_depth})")
+        return waited
+
+    def try_acquire(self) -> bool:
+        """Take a request slot only if one is free right now and nobody is queued for it."""
+        now = time.monotonic()
+        self._refill(now)
+        if self.queue_depth or self._lock.locked() or self._blocked_until > now or self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        self.acquired += 1
+        return True
+
+    def observe(self, status_code: int, headers: Mapping[str, str]) -> None:
+        now = time.monotonic()
+        if status_code == 429:
+            self.throttled += 1
+            retry_after = parse_retry_after_s(headers.get("retry-after"))
+            self._block(now + (retry_after if retry_after is not None else _DEFAULT_THROTTLE_S))
+
+        for kind in ("requests", "tokens"):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining is None:
+                continue
+            try:
+                left = float(remaining)
+            except ValueError:
+                continue
+            if kind == "requests":
+                self._refill(now)
+                self._tokens = min(self._tokens, left)
+            if left <= 0:
+                reset = parse_duration_s(headers.get(f"x-ratelimit-reset-{kind}"))
+                self._block(now + (reset if reset is not None else _DEFAULT_THROTTLE_S))
+
+    def stats(self) -> dict[str, float | int]:
+        return {
+            "queue_depth": self.queue_depth,
+            "acquired": self.acquired,
+            "wait_s_total": round(self.wait_s_total, 6),
+            "wait_s_max": round(self.wait_s_max, 6),
+            "throttled": self.throttled,
+            "retries": self.retries,
+        }
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def _block(self, until: float) -> None:
+        self._blocked_until = max(self._blocked_until, until)
+
+
+class UpstreamScheduler:
+    """One :class:`RateLimiter` per upstream model, created on first use."""
+
+    def __init__(self, *, requests_per_minute: float, burst: int) -> None:
+        self._requests_per_minute = requests_per_minute
+        self._burst = burst
+        self._limiters: dict[str, RateLimiter] = {}
+
+    def for_model(self, model: str) -> RateLimiter:
+        limiter = self._limiters.get(model)
+        if limiter is None:
+            limiter = RateLimiter(name=model, requests_per_minute=self._requests_per_minute, burst=self._burst)
+            self._limiters[model] = limiter
+        return limiter
+
+    def stats(self) -> dict[str, dict[str, float | int]]:
+        return {model: limiter.stats() for model, limiter in self._limiters.items()}
@@ -1,63 +1,267 @@
 from __future__ import annotations
 
 import io
-import wave
+import struct
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterator, Literal
+
 import numpy as np
 import soundfile as sf
 
+PCM16Buffer = bytes | bytearray | memoryview
+
+UploadCodec = Literal["wav", "flac", "ogg_opus"]
+
+# File extension and content type of an encoded STT upload.
+UPLOAD_CODEC_FORMATS: dict[str, tuple[str, str]] = {
+    "wav": ("wav", "audio/wav"),
+    "flac": ("flac", "audio/flac"),
+    "ogg_opus": ("ogg", "audio/ogg"),
+}
+
 
 class AudioDecodingError(Exception):
     pass
 
 
-def decode_to_pcm16_mono_16k(audio_bytes: bytes) -> bytes:
-    bio = io.BytesIO(audio_bytes)
-    try:
-        info = sf.info(bio)
-    except Exception as exc:  # noqa: BLE001
-        raise AudioDecodingError("Only WAV PCM16 mono 16kHz files are supported") from exc
+def as_byte_view(pcm16: PCM16Buffer) -> memoryview:
+    view = memoryview(pcm16)
+    if view.format == "B" and view.ndim == 1:
+        return view
+    return view.cast("B")
+
+
+_STRICT_WAV_ERROR = "Only WAV PCM16 mono 16kHz files are supported"
+
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+_KSDATAFORMAT_SUFFIX = b"\x00\x00\x00\x00\x10\x00\x80\x00\x00\xaa\x00\x38\x9b\x71"
+
+
+@dataclass(frozen=True)
+class WavLayout:
+    format_tag: int
+    channels: int
+    sample_rate_hz: int
+    bits_per_sample: int
+    data_offset: int
+    data_size: int | None
+
+
+def parse_wav_header(data: bytes | bytearray | memoryview) -> WavLayout | None:
+    """Walk RIFF chunks up to the start of ``data``.
+
+    Returns ``None`` while more bytes are needed. ``data_size`` is ``None`` when
+    the header does not carry a usable length (streamed WAVs write 0 or 0xFFFFFFFF).
+    """
+    if len(data) < 12:
+        return None
+    if bytes(data[0:4]) != b"RIFF" or bytes(data[8:12]) != b"WAVE":
+        raise AudioDecodingError(_STRICT_WAV_ERROR)
+
+    fmt: tuple[int, int, int, int] | None = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id = bytes(data[pos : pos + 4])
+        (chunk_size,) = struct.unpack_from("<I", data, pos + 4)
+        body = pos + 8
+
+        if chunk_id == b"data":
+            if fmt is None:
+                raise AudioDecodingError(_STRICT_WAV_ERROR)
+            size = chunk_size if 0 < chunk_size < 0xFFFFFFFF else None
+            return WavLayout(*fmt, data_offset=body, data_size=size)
+
+        if chunk_id == b"fmt ":
+            if body + 16 > len(data):
+                return None
+            format_tag, channels, sample_rate, _, _, bits = struct.unpack_from("<HHIIHH", data, body)
+            if format_tag == _WAVE_FORMAT_EXTENSIBLE and chunk_size >= 40:
+                if body + 40 > len(data):
+                    return None
+                # The real format code leads the sub-format GUID; the rest is the fixed KSDATAFORMAT suffix.
+                sub_format = bytes(data[body + 24 : body + 40])
+                if sub_format[2:] == _KSDATAFORMAT_SUFFIX:
+                    (format_tag,) = struct.unpack_from("<H", sub_format)
+            fmt = (format_tag, channels, sample_rate, bits)
+
+        pos = body + chunk_size + (chunk_size & 1)
+    return None
+
+
+def _is_strict_layout(layout: WavLayout) -> bool:
+    return (
+        layout.format_tag == 1
+        and layout.bits_per_sample == 16
+        and layout.sample_rate_hz == 16_000
+        and layout.channels in (1, 2)
+    )
+
+
+def _check_strict_layout(layout: WavLayout) -> None:
+    if not _is_strict_layout(layout):
+        raise AudioDecodingError(_STRICT_WAV_ERROR)
+
 
-    if (info.format or "").upper() != "WAV":
-        raise AudioDecodingError("Only WAV PCM16 mono 16kHz files are supported")
+def _downmix_stereo(samples: np.ndarray) -> np.ndarray:
+    """Interleaved stereo int16 -> mono int16, ``floor((l + r) / 2)`` without widening.
 
-    if info.subtype != "PCM_16":
-        raise AudioDecodingError("Only WAV PCM16 mono 16kHz files are supported")
+    ``(l >> 1) + (r >> 1)`` cannot overflow int16; the ``l & r & 1`` term restores
+    the carry lost when both low bits are set.
+    """
+    left = samples[0::2]
+    right = samples[1::2]
+    mono = np.right_shift(left, 1)
+    scratch = np.right_shift(right, 1)
+    mono += scratch
+    np.bitwise_and(left, right, out=scratch)
+    scratch &= 1
+    mono += scratch
+    return mono
 
-    if info.samplerate != 16_000:
-        raise AudioDecodingError("Only WAV PCM16 mono 16kHz files are supported")
 
-    if info.channels not in (1, 2):
-        raise AudioDecodingError("Only WAV PCM16 mono 16kHz files are supported")
+class WavPCM16Stream:
+    """Incremental strict WAV decoder: feed container bytes, get mono PCM16 back."""
 
-    bio.seek(0)
+    def __init__(self) -> None:
+        self._header = bytearray()
+        self._layout: WavLayout | None = None
+        self._remaining: int | None = None
+        self._carry = bytearray()
+
+    def feed(self, data: bytes | memoryview) -> memoryview:
+        if self._layout is None:
+            self._header.extend(data)
+            layout = parse_wav_header(self._header)
+            if layout is None:
+                return memoryview(b"")
+            _check_strict_layout(layout)
+            self._layout = layout
+            self._remaining = layout.data_size
+            data = bytes(self._header[layout.data_offset :])
+            self._header.clear()
+
+        if self._remaining is not None:
+            data = memoryview(data)[: self._remaining]
+            self._remaining -= len(data)
+
+        block = 2 * self._layout.channels
+        if self._carry:
+            self._carry.extend(data)
+            data = bytes(self._carry)
+            self._carry.clear()
+        usable = len(data) - (len(data) % block)
+        if usable < len(data):
+            self._carry.extend(memoryview(data)[usable:])
+        if not usable:
+            return memoryview(b"")
+
+        samples = np.frombuffer(data, dtype="<i2", count=usable // 2)
+        if self._layout.channels == 2:
+            samples = _downmix_stereo(samples)
+        return as_byte_view(samples)
+
+    def close(self) -> None:
+        if self._layout is None:
+            raise AudioDecodingError(_STRICT_WAV_ERROR)
+
+
+def decode_to_pcm16_mono_16k(audio_bytes: bytes) -> memoryview:
+    """Decode a strict WAV upload to mono PCM16 (see :func:`decode_strict_wav`)."""
+    return decode_strict_wav(audio_bytes)[0]
+
+
+def decode_strict_wav(audio_bytes: bytes) -> tuple[memoryview, Literal["riff", "libsndfile"]]:
+    """Decode a strict WAV upload to mono PCM16 and report which path decoded it.
+
+    Canonical PCM16 16 kHz files are parsed straight from the RIFF header and
+    returned as a view over ``audio_bytes`` (mono) or a single downmixed array
+    (stereo). Anything the header walk cannot vouch for goes through libsndfile.
+    """
+    try:
+        layout = parse_wav_header(audio_bytes)
+    except AudioDecodingError:
+        layout = None
+
+    if layout is None or not _is_strict_layout(layout):
+        return decode_wav_with_libsndfile(audio_bytes), "libsndfile"
+
+    block = 2 * layout.channels
+    available = len(audio_bytes) - layout.data_offset
+    size = min(layout.data_size, available) if layout.data_size is not None else available
+    samples = np.frombuffer(audio_bytes, dtype="<i2", count=(size - size % block) // 2, offset=layout.data_offset)
+    if layout.channels == 2:
+        samples = _downmix_stereo(samples)
+    return as_byte_view(samples), "riff"
+
+
+def decode_wav_with_libsndfile(audio_bytes: bytes) -> memoryview:
+    """Decode a strict WAV upload through libsndfile, the fallback of :func:`decode_strict_wav`."""
     try:
-        data, sr = sf.read(bio, dtype="int16", always_2d=True)
+        with sf.SoundFile(io.BytesIO(audio_bytes)) as f:
+            if (f.format or "").upper() != "WAV" or f.subtype != "PCM_16":
+                raise AudioDecodingError(_STRICT_WAV_ERROR)
+            if f.samplerate != 16_000 or f.channels not in (1, 2):
+                raise AudioDecodingError(_STRICT_WAV_ERROR)
+            data = f.read(dtype="int16", always_2d=True)
+    except AudioDecodingError:
+        raise
     except Exception as exc:  # noqa: BLE001
-        raise AudioDecodingError("Only WAV PCM16 mono 16kHz files are supported") from exc
+        raise AudioDecodingError(_STRICT_WAV_ERROR) from exc
+
+    if data.shape[1] == 2:
+        return as_byte_view(_downmix_stereo(data.reshape(-1)))
+    return as_byte_view(np.ascontiguousarray(data[:, 0]))
+
+
+@lru_cache(maxsize=8)
+def _wav_fmt_chunk(sample_rate_hz: int) -> bytes:
+    return struct.pack("<4sIHHIIHH", b"fmt ", 16, 1, 1, sample_rate_hz, sample_rate_hz * 2, 2, 16)
+
+
+def wav_header(num_bytes: int, *, sample_rate_hz: int = 16_000) -> bytes:
+    """44-byte RIFF header for ``num_bytes`` of PCM16 mono audio."""
+    return b"".join(
+        (
+            b"RIFF",
+            struct.pack("<I", 36 + num_bytes),
+            b"WAVE",
+            _wav_fmt_chunk(sample_rate_hz),
+            b"data",
+            struct.pack("<I", num_bytes),
+        )
+    )
+
+
+def pcm16_to_wav_bytes(pcm16: PCM16Buffer, *, sample_rate_hz: int = 16_000) -> bytes:
+    view = as_byte_view(pcm16)
+    return b"".join((wav_header(len(view), sample_rate_hz=sample_rate_hz), view))
 
-    if sr != 16_000:
-        raise AudioDecodingError("Only WAV PCM16 mono 16kHz files are supported")
 
-    pcm = np.asarray(data, dtype=np.int16)
-    if pcm.shape[1] == 2:
-        mono_i32 = (pcm[:, 0].astype(np.int32) + pcm[:, 1].astype(np.int32)) // 2
-        pcm = mono_i32.astype(np.int16)[:, None]
+def upload_codec_available(codec: UploadCodec) -> bool:
+    if codec == "ogg_opus":
+        return "OPUS" in sf.available_subtypes("OGG")
+    return True
 
-    mono_pcm16 = np.ascontiguousarray(pcm[:, 0], dtype=np.int16)
-    return mono_pcm16.tobytes()
 
+def encode_pcm16(pcm16: PCM16Buffer, *, sample_rate_hz: int = 16_000, codec: UploadCodec = "wav") -> bytes:
+    """Encode mono PCM16 for an STT upload; ``ogg_opus`` uses libsndfile's default bitrate."""
+    if codec == "wav":
+        return pcm16_to_wav_bytes(pcm16, sample_rate_hz=sample_rate_hz)
 
-def pcm16_to_wav_bytes(pcm16: bytes, *, sample_rate_hz: int = 16_000) -> bytes:
+    view = as_byte_view(pcm16)
+    samples = np.frombuffer(view[: len(view) - len(view) % 2], dtype=np.int16)
     buf = io.BytesIO()
-    with wave.open(buf, "wb") as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(sample_rate_hz)
-        wf.writeframes(pcm16)
+    if codec == "flac":
+        sf.write(buf, samples, sample_rate_hz, subtype="PCM_16", format="FLAC")
+    else:
+        sf.write(buf, samples, sample_rate_hz, subtype="OPUS", format="OGG")
     return buf.getvalue()
 
 
-def frame_generator(pcm16: bytes, *, sample_rate_hz: int, frame_ms: int) -> list[bytes]:
+def frame_generator(pcm16: PCM16Buffer, *, sample_rate_hz: int, frame_ms: int) -> Iterator[memoryview]:
     bytes_per_sample = 2
     frame_len = int(sample_rate_hz * (frame_ms / 1000.0) * bytes_per_sample)
-    return [pcm16[i : i + frame_len] for i in range(0, len(pcm16) - (len(pcm16) % frame_len), frame_len)]
+    view = as_byte_view(pcm16)
+    for i in range(0, len(view) - (len(view) % frame_len), frame_len):
+        yield view[i : i + frame_len]
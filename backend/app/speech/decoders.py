@@ -1,53 +1,182 @@
 from __future__ import annotations
 
-import io
-from dataclasses import dataclass
-from typing import Literal, Protocol
+import asyncio
+import logging
+import subprocess
+import tempfile
+from dataclasses import dataclass, field
+from typing import IO, AsyncIterator, Literal, Protocol
 
-from app.speech.audio import AudioDecodingError, decode_to_pcm16_mono_16k
+from app.speech.audio import AudioDecodingError, PCM16Buffer, WavPCM16Stream, decode_strict_wav
+from app.speech.ffmpeg import FFmpegWarmPool, decode_argv, ffmpeg_path, run_decoder, spawn
+
+logger = logging.getLogger(__name__)
+
+_DECODE_ERROR = "Failed to decode audio. The file may be corrupted, unsupported, or ffmpeg may be missing."
+
+# Container bytes parsed (WAV) or spooled to disk (seekable formats) per worker-thread hop.
+_STREAM_BATCH_BYTES = 256 * 1024
+
+# MP4-family demuxers need to seek to the moov atom, which may sit at the end of the file.
+_SEEKABLE_FORMATS = frozenset({"m4a", "mp4", "m4b", "mov", "3gp", "3g2"})
+
+
+# How an upload was decoded: RIFF header fast path, libsndfile, ffmpeg over a pipe, or ffmpeg over a spooled temp file.
+DecodePath = Literal["riff", "libsndfile", "ffmpeg_pipe", "ffmpeg_file"]
+
+
+@dataclass(frozen=True)
+class DecodedAudio:
+    pcm16: PCM16Buffer
+    path: DecodePath
 
 
 class AudioDecoder(Protocol):
-    def decode(self, *, audio_bytes: bytes, filename: str | None = None) -> bytes: ...
+    def decode(self, *, audio_bytes: bytes, filename: str | None = None) -> DecodedAudio: ...
+
+    def stream_path(self, filename: str | None = None) -> DecodePath: ...
+
+    def decode_stream(
+        self, *, chunks: AsyncIterator[bytes], filename: str | None = None
+    ) -> AsyncIterator[PCM16Buffer]: ...
+
+    async def aclose(self) -> None: ...
 
 
 @dataclass(frozen=True)
 class WavStrictDecoder:
-    def decode(self, *, audio_bytes: bytes, filename: str | None = None) -> bytes:
-        return decode_to_pcm16_mono_16k(audio_bytes)
+    def decode(self, *, audio_bytes: bytes, filename: str | None = None) -> DecodedAudio:
+        pcm16, path = decode_strict_wav(audio_bytes)
+        return DecodedAudio(pcm16, path)
+
+    def stream_path(self, filename: str | None = None) -> DecodePath:
+        return "riff"
+
+    async def decode_stream(
+        self, *, chunks: AsyncIterator[bytes], filename: str | None = None
+    ) -> AsyncIterator[PCM16Buffer]:
+        # Header parsing and stereo downmix run in a worker thread, a batch of chunks at a time.
+        reader = WavPCM16Stream()
+        batch = bytearray()
+        async for chunk in chunks:
+            batch.extend(chunk)
+            if len(batch) >= _STREAM_BATCH_BYTES:
+                pcm = await asyncio.to_thread(reader.feed, bytes(batch))
+                batch.clear()
+                if pcm:
+                    yield pcm
+        if batch:
+            pcm = await asyncio.to_thread(reader.feed, bytes(batch))
+            if pcm:
+                yield pcm
+        reader.close()
+
+    async def aclose(self) -> None:
+        return None
 
 
 @dataclass(frozen=True)
 class UniversalDecoder:
-    sample_rate_hz: int = 16_000
+    """ffmpeg-backed decoder that asks ffmpeg for ``s16le`` mono at ``sample_rate_hz`` directly.
 
-    def decode(self, *, audio_bytes: bytes, filename: str | None = None) -> bytes:
-        try:
-            from pydub import AudioSegment
-        except Exception as exc:  # noqa: BLE001
-            raise AudioDecodingError("Universal decoding requested but pydub is not installed") from exc
+    Input is piped through stdin and PCM is read back from stdout as it is
+    produced. Containers that need a seekable input (MP4 family) are spooled to a
+    temp file first. Streaming decodes take their process from a warm pool.
+    """
 
+    sample_rate_hz: int = 16_000
+    warm_processes: int = 2
+    _pool: FFmpegWarmPool | None = field(default=None, init=False, compare=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self._pool is None and ffmpeg_path() is not None:
+            argv = decode_argv(source="pipe:0", sample_rate_hz=self.sample_rate_hz)
+            object.__setattr__(self, "_pool", FFmpegWarmPool(argv=argv, size=self.warm_processes))
+
+    def decode(self, *, audio_bytes: bytes, filename: str | None = None) -> DecodedAudio:
+        self._require_ffmpeg()
+        if self._needs_seekable_input(filename):
+            return DecodedAudio(self._decode_via_file(audio_bytes, filename), "ffmpeg_file")
+
+        proc = subprocess.run(
+            decode_argv(source="pipe:0", sample_rate_hz=self.sample_rate_hz),
+            input=audio_bytes,
+            capture_output=True,
+        )
+        if proc.returncode != 0:
+            # Some containers only decode from a seekable input regardless of extension.
+            return DecodedAudio(self._decode_via_file(audio_bytes, filename), "ffmpeg_file")
+        return DecodedAudio(proc.stdout, "ffmpeg_pipe")
+
+    def stream_path(self, filename: str | None = None) -> DecodePath:
+        return "ffmpeg_file" if self._needs_seekable_input(filename) else "ffmpeg_pipe"
+
+    async def decode_stream(
+        self, *, chunks: AsyncIterator[bytes], filename: str | None = None
+    ) -> AsyncIterator[PCM16Buffer]:
+        self._require_ffmpeg()
         try:
-            segment = AudioSegment.from_file(
-                io.BytesIO(audio_bytes),
-                format=self._format_from_filename(filename),
-            )
-        except Exception as exc:  # noqa: BLE001
-            raise AudioDecodingError(
-                "Failed to decode audio. The file may be corrupted, unsupported, or ffmpeg may be missing."
-            ) from exc
-
-        segment = segment.set_channels(1).set_frame_rate(self.sample_rate_hz).set_sample_width(2)
-        return segment.raw_data
+            if self._needs_seekable_input(filename):
+                with tempfile.NamedTemporaryFile(suffix=self._suffix(filename)) as tmp:
+                    batch = bytearray()
+                    async for chunk in chunks:
+                        batch.extend(chunk)
+                        if len(batch) >= _STREAM_BATCH_BYTES:
+                            await asyncio.to_thread(tmp.write, bytes(batch))
+                            batch.clear()
+                    await asyncio.to_thread(self._finish_spool, tmp, bytes(batch))
+                    proc = await spawn(decode_argv(source=tmp.name, sample_rate_hz=self.sample_rate_hz))
+                    async for pcm in run_decoder(proc):
+                        yield pcm
+                return
+
+            assert self._pool is not None
+            proc = await self._pool.acquire()
+            async for pcm in run_decoder(proc, chunks=chunks):
+                yield pcm
+        except RuntimeError as exc:
+            logger.warning(f"ffmpeg decode failed for {filename or 'upload'}: {exc}")
+            raise AudioDecodingError(_DECODE_ERROR) from exc
+
+    async def aclose(self) -> None:
+        if self._pool is not None:
+            await self._pool.aclose()
 
     @staticmethod
     def ffmpeg_available() -> bool:
-        try:
-            from pydub.utils import which
-        except Exception:
-            return False
+        return ffmpeg_path() is not None
+
+    def _decode_via_file(self, audio_bytes: bytes, filename: str | None) -> bytes:
+        with tempfile.NamedTemporaryFile(suffix=self._suffix(filename)) as tmp:
+            tmp.write(audio_bytes)
+            tmp.flush()
+            proc = subprocess.run(
+                decode_argv(source=tmp.name, sample_rate_hz=self.sample_rate_hz),
+                capture_output=True,
+            )
+        if proc.returncode != 0:
+            message = proc.stderr.decode("utf-8", errors="replace").strip()
+            logger.warning(f"ffmpeg decode failed for {filename or 'upload'}: {message}")
+            raise AudioDecodingError(_DECODE_ERROR)
+        return proc.stdout
+
+    @staticmethod
+    def _finish_spool(tmp: IO[bytes], tail: bytes) -> None:
+        tmp.write(tail)
+        tmp.flush()
+
+    def _require_ffmpeg(self) -> None:
+        if not self.ffmpeg_available():
+            raise AudioDecodingError(_DECODE_ERROR)
+
+    @classmethod
+    def _needs_seekable_input(cls, filename: str | None) -> bool:
+        return cls._format_from_filename(filename) in _SEEKABLE_FORMATS
 
-        return bool(which("ffmpeg") or which("ffmpeg.exe"))
+    @classmethod
+    def _suffix(cls, filename: str | None) -> str:
+        fmt = cls._format_from_filename(filename)
+        return f".{fmt}" if fmt else ""
 
     @staticmethod
     def _format_from_filename(filename: str | None) -> str | None:
@@ -61,16 +190,16 @@ class UniversalDecoder:
 DecoderMode = Literal["auto", "strict", "universal"]
 
 
-def build_decoder(*, mode: DecoderMode, sample_rate_hz: int = 16_000) -> AudioDecoder:
+def build_decoder(*, mode: DecoderMode, sample_rate_hz: int = 16_000, warm_processes: int = 2) -> AudioDecoder:
     if mode == "strict":
         return WavStrictDecoder()
 
     if mode == "universal":
         if not UniversalDecoder.ffmpeg_available():
             raise AudioDecodingError("Universal decoding mode requires ffmpeg to be installed and on PATH")
-        return UniversalDecoder(sample_rate_hz=sample_rate_hz)
+        return UniversalDecoder(sample_rate_hz=sample_rate_hz, warm_processes=warm_processes)
 
     if UniversalDecoder.ffmpeg_available():
-        return UniversalDecoder(sample_rate_hz=sample_rate_hz)
+        return UniversalDecoder(sample_rate_hz=sample_rate_hz, warm_processes=warm_processes)
 
     return WavStrictDecoder()
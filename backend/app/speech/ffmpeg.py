@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import shutil
+from functools import lru_cache
+from typing import Any, AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+READ_BLOCK_BYTES = 64 * 1024
+
+
+@lru_cache(maxsize=1)
+def ffmpeg_path() -> str | None:
+    return shutil.which("ffmpeg") or shutil.which("ffmpeg.exe")
+
+
+def pcm16_output_args(sample_rate_hz: int) -> list[str]:
+    return ["-vn", "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(sample_rate_hz), "pipe:1"]
+
+
+def decode_argv(
+    *,
+    source: str,
+    sample_rate_hz: int,
+    input_args: list[str] | None = None,
+    output_args: list[str] | None = None,
+) -> list[str]:
+    binary = ffmpeg_path()
+    if binary is None:
+        raise FileNotFoundError("ffmpeg is not installed or not on PATH")
+    extra = ["-nostdin"] if source != "pipe:0" else []
+    return [
+        binary,
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        *extra,
+        *(input_args or []),
+        "-i",
+        source,
+        *(output_args or []),
+        *pcm16_output_args(sample_rate_hz),
+    ]
+
+
+async def spawn(argv: list[str]) -> asyncio.subprocess.Process:
+    return await asyncio.create_subprocess_exec(
+        *argv,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
+
+async def terminate(proc: asyncio.subprocess.Process) -> None:
+    if proc.returncode is None:
+        with contextlib.suppress(ProcessLookupError):
+            proc.kill()
+    with contextlib.suppress(Exception):
+        await proc.wait()
+
+
+class FFmpegWarmPool:
+    """Keeps ``size`` ffmpeg processes spawned and blocked on stdin.
+
+    Every stdin-fed decode uses the same argv, so a process can be started
+    ahead of time and handed out on demand, taking the fork/exec and codec
+    registry start-up off the request path. The pool belongs to the event loop
+    that first used it; pickling drops the live processes and keeps the config.
+    """
+
+    def __init__(self, *, argv: list[str], size: int) -> None:
+        self._argv = argv
+        self._size = max(0, size)
+        self._idle: list[asyncio.subprocess.Process] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._refill: asyncio.Task[None] | None = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {"argv": self._argv, "size": self._size}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(argv=state["argv"], size=state["size"])
+
+    async def acquire(self) -> asyncio.subprocess.Process:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._abandon()
+            self._loop = loop
+
+        while self._idle:
+            proc = self._idle.pop()
+            if proc.returncode is None:
+                self._schedule_refill()
+                return proc
+
+        self._schedule_refill()
+        return await spawn(self._argv)
+
+    async def aclose(self) -> None:
+        if self._refill is not None:
+            self._refill.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await self._refill
+            self._refill = None
+        idle, self._idle = self._idle, []
+        for proc in idle:
+            await terminate(proc)
+
+    def _abandon(self) -> None:
+        """Kill the processes spawned on a previous event loop; they cannot be awaited from this one."""
+        idle, self._idle = self._idle, []
+        self._refill = None
+        for proc in idle:
+            if proc.returncode is None:
+                with contextlib.suppress(ProcessLookupError):
+                    proc.kill()
+
+    def _schedule_refill(self) -> None:
+        if self._size and (self._refill is None or self._refill.done()):
+            self._refill = asyncio.create_task(self._fill())
+
+    async def _fill(self) -> None:
+        try:
+            while len(self._idle) < self._size:
+                self._idle.append(await spawn(self._argv))
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(f"ffmpeg warm pool refill failed: {exc}")
+
+
+async def run_decoder(
+    proc: asyncio.subprocess.Process, *, chunks: AsyncIterator[bytes] | None = None
+) -> AsyncIterator[bytes]:
+    """Pump ``chunks`` into ``proc`` stdin while yielding its stdout.
+
+    Raises ``RuntimeError`` with ffmpeg's stderr when it exits non-zero. Errors
+    raised by ``chunks`` itself propagate once stdout is drained.
+    """
+
+    async def feed() -> None:
+        assert proc.stdin is not None
+        try:
+            if chunks is not None:
+                async for chunk in chunks:
+                    proc.stdin.write(chunk)
+                    await proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with contextlib.suppress(Exception):
+                proc.stdin.close()
+
+    assert proc.stdout is not None and proc.stderr is not None
+    feeder = asyncio.create_task(feed())
+    stderr = asyncio.create_task(proc.stderr.read())
+    try:
+        while True:
+            data = await proc.stdout.read(READ_BLOCK_BYTES)
+            if not data:
+                break
+            yield data
+
+        returncode = await proc.wait()
+        await feeder
+        if returncode != 0:
+            message = (await stderr).decode("utf-8", errors="replace").strip()
+            raise RuntimeError(message.splitlines()[-1] if message else f"ffmpeg exited with {returncode}")
+    finally:
+        feeder.cancel()
+        stderr.cancel()
+        await terminate(proc)
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Sequence
+
+from app.speech.audio import PCM16Buffer
+
+# Overlap (s) that ties an STT segment to a packed segment; smaller ones are timestamp jitter.
+_MIN_OVERLAP_S = 0.1
+
+
+@dataclass(frozen=True)
+class PackedSegment:
+    """One VAD segment inside a pack.
+
+    ``index`` is the segment's position in the request; ``start_s``/``end_s``
+    locate it in the source audio (``None`` when the caller did not know its
+    offset) and ``pack_start_s``/``pack_end_s`` inside the packed upload.
+    """
+
+    index: int
+    start_s: float | None
+    end_s: float | None
+    pack_start_s: float
+    pack_end_s: float
+
+
+@dataclass(frozen=True)
+class SegmentPack:
+    pcm: PCM16Buffer
+    segments: tuple[PackedSegment, ...]
+
+
+class SegmentPacker:
+    """Coalesces consecutive VAD segments into STT uploads of at most ``max_pack_s``.
+
+    Segments are joined with ``gap_ms`` of digital silence so the STT model sees
+    a pause between them (and tends to end its own segments there). A segment
+    longer than ``max_pack_s`` is sent alone; ``max_pack_s <= 0`` disables
+    packing. ``add`` returns the packs that can no longer grow, ``flush`` the rest.
+    """
+
+    def __init__(self, *, sample_rate_hz: int, max_pack_s: float, gap_ms: int) -> None:
+        self._bytes_per_s = sample_rate_hz * 2
+        self._max_bytes = int(max_pack_s * sample_rate_hz) * 2
+        self._gap = bytes(int(gap_ms * sample_rate_hz / 1000) * 2)
+        self._parts: list[tuple[PCM16Buffer, int | None]] = []
+        self._size = 0
+        self._next_index = 0
+
+    def add(self, pcm16: PCM16Buffer, *, offset: int | None = None) -> list[SegmentPack]:
+        """Add the next segment; ``offset`` is its byte position in the source audio, if known."""
+        size = len(pcm16)
+        packs: list[SegmentPack] = []
+        if self._parts and self._size + len(self._gap) + size > self._max_bytes:
+            packs.extend(self.flush())
+        self._size += (len(self._gap) if self._parts else 0) + size
+        self._parts.append((pcm16, offset))
+        if self._size >= self._max_bytes:
+            packs.extend(self.flush())
+        return packs
+
+    def flush(self) -> list[SegmentPack]:
+        if not self._parts:
+            return []
+
+        chunks: list[PCM16Buffer] = []
+        segments: list[PackedSegment] = []
+        position = 0
+        for pcm16, offset in self._parts:
+            if chunks:
+                chunks.append(self._gap)
+                position += len(self._gap)
+            chunks.append(pcm16)
+            segments.append(
+                PackedSegment(
+                    index=self._next_index,
+                    start_s=offset / self._bytes_per_s if offset is not None else None,
+                    end_s=(offset + len(pcm16)) / self._bytes_per_s if offset is not None else None,
+                    pack_start_s=position / self._bytes_per_s,
+                    pack_end_s=(position + len(pcm16)) / self._bytes_per_s,
+                )
+            )
+            position += len(pcm16)
+            self._next_index += 1
+
+        self._parts.clear()
+        self._size = 0
+        pcm = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+        return [SegmentPack(pcm=pcm, segments=tuple(segments))]
+
+
+def split_pack_text(pack: SegmentPack, result: dict[str, Any]) -> list[str | None]:
+    """Split a ``verbose_json`` transcription of ``pack`` back into one text per packed segment.
+
+    Each STT segment belongs to the packed segments it overlaps. One that spans
+    several cannot be divided, so those packed segments are merged: the first
+    gets the text and the others ``None``. Without STT segment timings the whole
+    pack is merged into its first segment.
+    """
+    text = (result.get("text") or "").strip()
+    count = len(pack.segments)
+    if count == 1:
+        return [text]
+
+    stt_segments: Sequence[dict[str, Any]] = result.get("segments") or []
+    if not stt_segments:
+        return [text] + [None] * (count - 1)
+
+    # joined[i]: packed segment i is merged into segment i - 1.
+    joined = [False] * count
+    spans: list[tuple[float, int, str]] = []
+    for stt in stt_segments:
+        piece = (stt.get("text") or "").strip()
+        if not piece:
+            continue
+        start, end = float(stt.get("start") or 0.0), float(stt.get("end") or 0.0)
+        hits = [
+            i
+            for i, segment in enumerate(pack.segments)
+            if min(end, segment.pack_end_s) - max(start, segment.pack_start_s) > _MIN_OVERLAP_S
+        ]
+        if not hits:
+            # In a gap: the packed segment whose edge is nearest.
+            middle = (start + end) / 2
+            hits = [
+                min(
+                    range(count),
+                    key=lambda i: max(pack.segments[i].pack_start_s - middle, middle - pack.segments[i].pack_end_s),
+                )
+            ]
+        for i in range(hits[0] + 1, hits[-1] + 1):
+            joined[i] = True
+        spans.append((start, hits[0], piece))
+
+    heads = list(range(count))
+    for i in range(1, count):
+        if joined[i]:
+            heads[i] = heads[i - 1]
+    parts: list[list[str]] = [[] for _ in pack.segments]
+    for _, first, piece in sorted(spans, key=lambda span: span[0]):
+        parts[heads[first]].append(piece)
+    return [None if joined[i] else " ".join(parts[i]) for i in range(count)]
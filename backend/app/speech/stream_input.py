@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from functools import lru_cache
+from typing import Any, Callable, Literal, Protocol
+
+from app.speech.audio import AudioDecodingError
+from app.speech.ffmpeg import READ_BLOCK_BYTES, decode_argv, ffmpeg_path, spawn, terminate
+
+logger = logging.getLogger(__name__)
+
+InputFormat = Literal["pcm16", "opus", "ogg_opus", "webm_opus"]
+
+# Longest Opus packet, in ms; the decode buffer is sized to hold one at the output rate.
+_OPUS_MAX_PACKET_MS = 120
+
+# ffmpeg demuxer for each container format.
+_CONTAINER_DEMUXERS = {"ogg_opus": "ogg", "webm_opus": "webm"}
+
+PCMSink = Callable[[bytes], None]
+
+
+class StreamInputDecoder(Protocol):
+    """Turns the binary messages of one WebSocket session into PCM16 mono, handed to ``on_pcm``.
+
+    ``drain`` returns once everything fed so far has reached ``on_pcm``; for
+    container formats it also ends the current stream, so audio sent after a
+    drain must start a new one (with headers).
+    """
+
+    async def feed(self, data: bytes) -> None: ...
+
+    async def drain(self) -> None: ...
+
+    async def aclose(self) -> None: ...
+
+
+@lru_cache(maxsize=1)
+def _opuslib() -> Any | None:
+    try:
+        import opuslib  # noqa: PLC0415
+    except Exception:  # noqa: BLE001 - also raised when libopus itself is missing
+        return None
+    return opuslib
+
+
+def available_input_formats() -> list[InputFormat]:
+    formats: list[InputFormat] = ["pcm16"]
+    if _opuslib() is not None:
+        formats.append("opus")
+    if ffmpeg_path() is not None:
+        formats.extend(["ogg_opus", "webm_opus"])
+    return formats
+
+
+class PCM16Input:
+    def __init__(self, *, on_pcm: PCMSink) -> None:
+        self._on_pcm = on_pcm
+
+    async def feed(self, data: bytes) -> None:
+        self._on_pcm(data)
+
+    async def drain(self) -> None:
+        return None
+
+    async def aclose(self) -> None:
+        return None
+
+
+class OpusFrameInput:
+    """Raw Opus packets, one per binary message, decoded in-process with ``opuslib``.
+
+    Decoding a 20 ms packet takes microseconds, so it runs inline; a packet that
+    fails to decode is dropped like a lost packet instead of ending the session.
+    """
+
+    def __init__(self, *, on_pcm: PCMSink, sample_rate_hz: int) -> None:
+        opuslib = _opuslib()
+        if opuslib is None:
+            raise AudioDecodingError("Opus input requires opuslib and libopus")
+        self._on_pcm = on_pcm
+        self._decoder = opuslib.Decoder(sample_rate_hz, 1)
+        self._max_frame = sample_rate_hz * _OPUS_MAX_PACKET_MS // 1000
+        self._errors = 0
+
+    async def feed(self, data: bytes) -> None:
+        try:
+            pcm = self._decoder.decode(data, self._max_frame)
+        except Exception as exc:  # noqa: BLE001
+            self._errors += 1
+            if self._errors == 1:
+                logger.warning(f"Dropping undecodable Opus packet: {exc}")
+            return
+        if pcm:
+            self._on_pcm(pcm)
+
+    async def drain(self) -> None:
+        return None
+
+    async def aclose(self) -> None:
+        return None
+
+
+class FFmpegContainerInput:
+    """Ogg or WebM Opus streams (what browsers' ``MediaRecorder`` produces), piped through ffmpeg.
+
+    The process is spawned on the first message of each stream and asked to
+    write PCM as soon as it is decoded; a reader task forwards it to ``on_pcm``.
+    """
+
+    def __init__(self, *, on_pcm: PCMSink, sample_rate_hz: int, input_format: str) -> None:
+        if ffmpeg_path() is None:
+            raise AudioDecodingError(f"{input_format} input requires ffmpeg")
+        self._on_pcm = on_pcm
+        self._argv = decode_argv(
+            source="pipe:0",
+            sample_rate_hz=sample_rate_hz,
+            input_args=["-fflags", "nobuffer", "-f", _CONTAINER_DEMUXERS[input_format]],
+            output_args=["-flush_packets", "1"],
+        )
+        self._proc: asyncio.subprocess.Process | None = None
+        self._reader: asyncio.Task[None] | None = None
+        self._stderr: asyncio.Task[bytes] | None = None
+
+    async def feed(self, data: bytes) -> None:
+        if self._reader is not None and self._reader.done():
+            # ffmpeg exited on its own: the stream ended or could not be decoded.
+            await self._finish()
+        if self._proc is None:
+            self._proc = await spawn(self._argv)
+            self._reader = asyncio.create_task(self._read(self._proc))
+            self._stderr = asyncio.create_task(self._proc.stderr.read())
+        try:
+            self._proc.stdin.write(data)
+            await self._proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            await self._finish()
+
+    async def drain(self) -> None:
+        if self._proc is None:
+            return
+        with contextlib.suppress(Exception):
+            self._proc.stdin.close()
+        await self._finish()
+
+    async def aclose(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+        if self._stderr is not None:
+            self._stderr.cancel()
+        if self._proc is not None:
+            await terminate(self._proc)
+        self._proc = self._reader = self._stderr = None
+
+    async def _read(self, proc: asyncio.subprocess.Process) -> None:
+        while data := await proc.stdout.read(READ_BLOCK_BYTES):
+            self._on_pcm(data)
+
+    async def _finish(self) -> None:
+        """Wait for the current process to exit, raising ``AudioDecodingError`` if it failed."""
+        proc, reader, stderr = self._proc, self._reader, self._stderr
+        self._proc = self._reader = self._stderr = None
+        try:
+            await reader
+            returncode = await proc.wait()
+            if returncode != 0:
+                message = (await stderr).decode("utf-8", errors="replace").strip()
+                logger.warning(f"ffmpeg stream decode failed: {message or returncode}")
+                raise AudioDecodingError("Failed to decode the audio stream")
+        finally:
+            stderr.cancel()
+            await terminate(proc)
+
+
+def open_input_decoder(input_format: InputFormat, *, on_pcm: PCMSink, sample_rate_hz: int) -> StreamInputDecoder:
+    if input_format == "pcm16":
+        return PCM16Input(on_pcm=on_pcm)
+    if input_format == "opus":
+        return OpusFrameInput(on_pcm=on_pcm, sample_rate_hz=sample_rate_hz)
+    return FFmpegContainerInput(on_pcm=on_pcm, sample_rate_hz=sample_rate_hz, input_format=input_format)
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, replace
 
 import webrtcvad
 
-from app.speech.audio import frame_generator
+from app.speech.audio import PCM16Buffer, as_byte_view
 
 
 @dataclass(frozen=True)
@@ -14,51 +15,174 @@ class VADConfig:
     frame_ms: int
     padding_ms: int
 
+    @property
+    def frame_bytes(self) -> int:
+        return int(self.sample_rate_hz * (self.frame_ms / 1000.0) * 2)
+
+    @property
+    def num_padding_frames(self) -> int:
+        return max(1, int(self.padding_ms / self.frame_ms))
+
+
+class StreamingVAD:
+    """Incremental VAD session.
+
+    Accepts PCM16 chunks of any size, keeps the partial trailing frame and the
+    triggered/ring state between calls, and returns speech segments as soon as
+    they close. Each session owns its own ``webrtcvad.Vad`` instance.
+
+    Segment boundaries are tracked as byte offsets from the start of the
+    session. ``feed``/``flush`` retain only the audio still needed to cut the
+    next segment; ``scan`` segments one complete buffer and returns offset
+    ranges into it without copying any audio.
+
+    ``max_segment_ms`` force-closes a segment that keeps going without a pause;
+    the session stays triggered so the next segment continues the same speech.
+    """
+
+    def __init__(self, *, config: VADConfig, max_segment_ms: int | None = None) -> None:
+        self._cfg = config
+        self._vad = webrtcvad.Vad(config.aggressiveness)
+        self._frame_bytes = config.frame_bytes
+        self._max_segment_bytes = (
+            max(1, int(max_segment_ms / config.frame_ms)) * self._frame_bytes if max_segment_ms else None
+        )
+        self._ring: deque[tuple[int, bool]] = deque(maxlen=config.num_padding_frames)
+        self._ring_voiced = 0
+        self._segment_start: int | None = None
+        self._offset = 0
+        self._buffer = bytearray()
+        self._buffer_start = 0
+
+    @property
+    def triggered(self) -> bool:
+        return self._segment_start is not None
+
+    @property
+    def buffered_bytes(self) -> int:
+        return len(self._buffer)
+
+    def feed(self, chunk: PCM16Buffer) -> list[bytes]:
+        return [segment for _, segment in self.feed_with_offsets(chunk)]
+
+    def flush(self) -> list[bytes]:
+        return [segment for _, segment in self.flush_with_offsets()]
+
+    def feed_with_offsets(self, chunk: PCM16Buffer) -> list[tuple[int, bytes]]:
+        """Like ``feed``, but each segment comes with its byte offset since the last reset."""
+        self._buffer.extend(chunk)
+
+        ranges: list[tuple[int, int]] = []
+        with memoryview(self._buffer) as view:
+            end = self._buffer_start + len(view)
+            while self._offset + self._frame_bytes <= end:
+                rel = self._offset - self._buffer_start
+                closed = self._process_frame(view[rel : rel + self._frame_bytes])
+                if closed is not None:
+                    ranges.append(closed)
+            segments = [(a, bytes(view[a - self._buffer_start : b - self._buffer_start])) for a, b in ranges]
+
+        self._trim()
+        return segments
+
+    def flush_with_offsets(self) -> list[tuple[int, bytes]]:
+        segments: list[tuple[int, bytes]] = []
+        if self._segment_start is not None and self._offset > self._segment_start:
+            rel = self._segment_start - self._buffer_start
+            segments.append((self._segment_start, bytes(self._buffer[rel : self._offset - self._buffer_start])))
+        self.reset()
+        return segments
+
+    def scan(self, pcm16: PCM16Buffer) -> list[tuple[int, int]]:
+        """Segment one complete buffer and return ``(start, end)`` byte ranges into it."""
+        self.reset()
+        view = as_byte_view(pcm16)
+        usable = len(view) - (len(view) % self._frame_bytes)
+
+        ranges: list[tuple[int, int]] = []
+        while self._offset < usable:
+            closed = self._process_frame(view[self._offset : self._offset + self._frame_bytes])
+            if closed is not None:
+                ranges.append(closed)
+
+        if self._segment_start is not None and self._offset > self._segment_start:
+            ranges.append((self._segment_start, self._offset))
+        self.reset()
+        return ranges
+
+    def reset(self) -> None:
+        self._clear_ring()
+        self._segment_start = None
+        self._offset = 0
+        self._buffer.clear()
+        self._buffer_start = 0
+
+    def _trim(self) -> None:
+        if self._segment_start is not None:
+            keep_from = self._segment_start
+        elif self._ring:
+            keep_from = self._ring[0][0]
+        else:
+            keep_from = self._offset
+
+        drop = keep_from - self._buffer_start
+        if drop > 0:
+            del self._buffer[:drop]
+            self._buffer_start = keep_from
+
+    def _push_ring(self, start: int, is_speech: bool) -> None:
+        if len(self._ring) == self._ring.maxlen and self._ring[0][1]:
+            self._ring_voiced -= 1
+        self._ring.append((start, is_speech))
+        if is_speech:
+            self._ring_voiced += 1
+
+    def _clear_ring(self) -> None:
+        self._ring.clear()
+        self._ring_voiced = 0
+
+    def _process_frame(self, frame: memoryview) -> tuple[int, int] | None:
+        start = self._offset
+        self._offset += self._frame_bytes
+        is_speech = self._vad.is_speech(frame, self._cfg.sample_rate_hz)
+
+        self._push_ring(start, is_speech)
+
+        if self._segment_start is None:
+            if self._ring_voiced > 0.9 * len(self._ring):
+                self._segment_start = self._ring[0][0]
+                self._clear_ring()
+            return None
+
+        num_unvoiced = len(self._ring) - self._ring_voiced
+        if num_unvoiced > 0.9 * len(self._ring):
+            closed = (self._segment_start, self._offset)
+            self._segment_start = None
+            self._clear_ring()
+            return closed
+
+        if self._max_segment_bytes is not None and self._offset - self._segment_start >= self._max_segment_bytes:
+            closed = (self._segment_start, self._offset)
+            self._segment_start = self._offset
+            return closed
+        return None
+
 
 class VoiceActivityDetector:
     def __init__(self, *, config: VADConfig) -> None:
         self._cfg = config
-        self._vad = webrtcvad.Vad(self._cfg.aggressiveness)
-
-    def segment(self, pcm16: bytes) -> list[bytes]:
-        frames = frame_generator(pcm16, sample_rate_hz=self._cfg.sample_rate_hz, frame_ms=self._cfg.frame_ms)
-        if not frames:
-            return []
-
-        num_padding_frames = max(1, int(self._cfg.padding_ms / self._cfg.frame_ms))
-
-        segments: list[bytes] = []
-        ring: list[tuple[bytes, bool]] = []
-        triggered = False
-        voiced: list[bytes] = []
-
-        for frame in frames:
-            is_speech = self._vad.is_speech(frame, self._cfg.sample_rate_hz)
-
-            if not triggered:
-                ring.append((frame, is_speech))
-                if len(ring) > num_padding_frames:
-                    ring.pop(0)
-
-                num_voiced = sum(1 for _, speech in ring if speech)
-                if num_voiced > 0.9 * len(ring):
-                    triggered = True
-                    voiced.extend(f for f, _ in ring)
-                    ring.clear()
-            else:
-                voiced.append(frame)
-                ring.append((frame, is_speech))
-                if len(ring) > num_padding_frames:
-                    ring.pop(0)
-
-                num_unvoiced = sum(1 for _, speech in ring if not speech)
-                if num_unvoiced > 0.9 * len(ring):
-                    segments.append(b"".join(voiced))
-                    voiced = []
-                    ring.clear()
-                    triggered = False
-
-        if voiced:
-            segments.append(b"".join(voiced))
 
-        return segments
+    @property
+    def config(self) -> VADConfig:
+        return self._cfg
+
+    def stream(self, *, padding_ms: int | None = None, max_segment_ms: int | None = None) -> StreamingVAD:
+        config = self._cfg if padding_ms is None else replace(self._cfg, padding_ms=padding_ms)
+        return StreamingVAD(config=config, max_segment_ms=max_segment_ms)
+
+    def segment_ranges(self, pcm16: PCM16Buffer) -> list[tuple[int, int]]:
+        return self.stream().scan(pcm16)
+
+    def segment(self, pcm16: PCM16Buffer) -> list[memoryview]:
+        view = as_byte_view(pcm16)
+        return [view[start:end] for start, end in self.segment_ranges(view)]
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.config.settings import Settings
+from app.services.groq import GroqClient
+from app.services.hedging import HedgePolicy
+
+
+def test_delay_waits_for_history():
+    hedge = HedgePolicy(percentile=50.0, min_delay_s=0.2, min_samples=3)
+    hedge.observe(1.0)
+    hedge.observe(2.0)
+    assert hedge.delay_s() is None
+    hedge.observe(3.0)
+    assert hedge.delay_s() == 2.0
+    assert HedgePolicy(min_delay_s=5.0, min_samples=1).delay_s() is None
+
+
+def test_budget_caps_hedge_ratio():
+    hedge = HedgePolicy(max_ratio=0.1)
+    hedge.calls = 9
+    assert not hedge.can_fire()
+    hedge.calls = 10
+    assert hedge.can_fire()
+    hedge.record(fired=True)
+    assert not hedge.can_fire()
+    hedge.record(fired=False)
+    assert (hedge.hedges_fired, hedge.hedges_suppressed) == (1, 1)
+
+
+def _client(*, max_ratio: float) -> GroqClient:
+    async def slow(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"text": "hello"})
+
+    settings = Settings(
+        _env_file=None,
+        groq_api_key="test",
+        groq_base_url="https://api.example/v1",
+        # Effectively no refill during the test, so the bucket shows every token taken.
+        groq_requests_per_minute=0.001,
+        groq_request_burst=5,
+        stt_hedge_enabled=True,
+        stt_hedge_min_delay_s=0.01,
+        stt_hedge_max_ratio=max_ratio,
+        stt_hedge_min_samples=1,
+    )
+    client = GroqClient(settings=settings, http=httpx.AsyncClient(transport=httpx.MockTransport(slow)))
+    client.stt_hedge.observe(0.01)
+    return client
+
+
+@pytest.mark.parametrize("max_ratio, fired", [(0.1, False), (1.0, True)])
+def test_hedge_spends_limiter_token_only_when_sent(max_ratio, fired):
+    client = _client(max_ratio=max_ratio)
+    result = asyncio.run(client.transcribe_audio(audio_bytes=b"RIFF"))
+
+    assert result == {"text": "hello"}
+    limiter = client.scheduler.for_model(client._settings.groq_stt_model)
+    assert limiter.acquired == (2 if fired else 1)
+    assert limiter._tokens == pytest.approx(3.0 if fired else 4.0, abs=0.01)
+    assert client.stt_hedge.stats()["hedges_fired"] == int(fired)
+    assert client.stt_hedge.stats()["hedges_suppressed"] == int(not fired)
+
+
+def test_no_hedge_while_limiter_is_throttled():
+    client = _client(max_ratio=1.0)
+    limiter = client.scheduler.for_model(client._settings.groq_stt_model)
+    # One token left: the primary takes it and the hedge finds the bucket empty.
+    limiter._tokens = 1.0
+    asyncio.run(client.transcribe_audio(audio_bytes=b"RIFF"))
+
+    assert limiter.acquired == 1
+    assert client.stt_hedge.hedges_suppressed == 1
+
+
+def _racing_client(handler) -> GroqClient:
+    settings = Settings(
+        _env_file=None,
+        groq_api_key="test",
+        groq_base_url="https://api.example/v1",
+        groq_max_attempts=1,
+        stt_hedge_enabled=True,
+        stt_hedge_min_delay_s=0.02,
+        stt_hedge_max_ratio=1.0,
+        stt_hedge_min_samples=1,
+    )
+    client = GroqClient(settings=settings, http=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    client.stt_hedge.observe(0.02)
+    return client
+
+
+def test_hedge_wins_against_a_stalled_primary():
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(5)
+        return httpx.Response(200, json={"text": f"attempt {calls}"})
+
+    client = _racing_client(handler)
+
+    async def main() -> dict:
+        return await asyncio.wait_for(client.transcribe_audio(audio_bytes=b"RIFF"), timeout=1)
+
+    assert asyncio.run(main()) == {"text": "attempt 2"}
+    assert client.stt_hedge.hedges_won == 1
+
+
+def test_failed_hedge_does_not_beat_a_successful_primary():
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(0.1)
+            return httpx.Response(200, json={"text": "primary"})
+        return httpx.Response(500)
+
+    client = _racing_client(handler)
+    assert asyncio.run(client.transcribe_audio(audio_bytes=b"RIFF")) == {"text": "primary"}
+    assert client.stt_hedge.hedges_fired == 1
+    assert client.stt_hedge.hedges_won == 0
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from app.jobs import runner
+from app.jobs.store import JobStore
+
+
+@pytest.fixture
+def stores(tmp_path):
+    # Two connections to one directory stand in for two server processes.
+    a, b = JobStore(tmp_path), JobStore(tmp_path)
+    yield a, b
+    a.close()
+    b.close()
+
+
+def _job(store: JobStore, owner: str) -> str:
+    job_id = store.new_id()
+    store.create(job_id=job_id, filename="a.wav", use_cache=True, owner=owner)
+    return job_id
+
+
+def test_claim_is_exclusive(stores):
+    a, b = stores
+    job_id = _job(a, "a")
+    assert b.claim(job_id, owner="b")
+    assert not a.claim(job_id, owner="a")
+    assert a.get(job_id).status == "running"
+
+
+def test_live_owner_keeps_its_jobs(stores):
+    a, b = stores
+    a.heartbeat("a")
+    b.heartbeat("b")
+    queued, running = _job(a, "a"), _job(a, "a")
+    assert a.claim(running, owner="a")
+    assert b.adopt_orphans(owner="b", stale_after_s=60.0) == []
+    assert a.get(queued).status == "queued"
+    assert a.get(running).status == "running"
+
+
+def test_stale_owner_jobs_are_adopted(stores):
+    a, b = stores
+    a.heartbeat("a")
+    b.heartbeat("b")
+    queued, running = _job(a, "a"), _job(a, "a")
+    assert a.claim(running, owner="a")
+    a._execute("UPDATE workers SET heartbeat_at = ? WHERE owner = 'a'", (time.time() - 120.0,))
+
+    assert set(b.adopt_orphans(owner="b", stale_after_s=60.0)) == {queued, running}
+    assert b.get(running).status == "queued"
+    assert b.claim(running, owner="b")
+    # The dead runner's heartbeat row is dropped with it.
+    assert b.adopt_orphans(owner="b", stale_after_s=60.0) == []
+
+
+def test_released_jobs_are_adopted_at_once(stores):
+    a, b = stores
+    a.heartbeat("a")
+    b.heartbeat("b")
+    job_id = _job(a, "a")
+    assert a.claim(job_id, owner="a")
+    a.release("a")
+    assert b.adopt_orphans(owner="b", stale_after_s=60.0) == [job_id]
+
+
+def test_finished_jobs_are_not_adopted(stores):
+    a, b = stores
+    job_id = _job(a, "a")
+    a.succeed(job_id, "{}")
+    assert b.adopt_orphans(owner="b", stale_after_s=60.0) == []
+    assert not b.claim(job_id, owner="b")
+
+
+def test_upload_is_read_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(runner, "_SPOOL_BATCH_BYTES", 4)
+    path = tmp_path / "upload"
+    path.write_bytes(b"0123456789")
+
+    async def read() -> list[bytes]:
+        return [chunk async for chunk in runner._read_chunks(path)]
+
+    assert asyncio.run(read()) == [b"0123", b"4567", b"89"]
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from app.llm.json_stream import IncrementalJSONObjectParser, JSONFieldEvent
+
+DOC = {
+    "summary": 'She said "ship it", then {left} \\ paused, café',
+    "sentiment": None,
+    "score": -1.5e2,
+    "urgent": True,
+    "action_items": [{"owner": "ana", "task": "draft [v2], send"}, {"owner": "bo", "task": "review"}],
+    "matrix": [[1, 2], [], [3, [4]]],
+    "meta": {"lang": "en", "tags": ["a", "b"]},
+}
+
+
+def _events(chunks: list[str]) -> list[JSONFieldEvent]:
+    parser = IncrementalJSONObjectParser()
+    return [event for chunk in chunks for event in parser.feed(chunk)]
+
+
+def _expected(doc: dict) -> list[JSONFieldEvent]:
+    events = []
+    for key, value in doc.items():
+        if isinstance(value, list):
+            events += [JSONFieldEvent(key=key, value=item, index=i) for i, item in enumerate(value)]
+        events.append(JSONFieldEvent(key=key, value=value))
+    return events
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_any_split_yields_the_same_events(indent):
+    text = json.dumps(DOC, indent=indent)
+    whole = _events([text])
+    assert whole == _expected(DOC)
+    # One character at a time splits every escape, key and number.
+    assert _events(list(text)) == whole
+    for size in (2, 3, 7):
+        assert _events([text[i : i + size] for i in range(0, len(text), size)]) == whole
+
+
+def test_escape_split_across_chunks():
+    assert _events(['{"a": "x\\', '"y\\\\', '", "b": 1}']) == [
+        JSONFieldEvent(key="a", value='x"y\\'),
+        JSONFieldEvent(key="b", value=1),
+    ]
+
+
+def test_escaped_key():
+    assert _events(['{"a\\"b": 1}']) == [JSONFieldEvent(key='a"b', value=1)]
+
+
+def test_array_items_reported_before_the_array_closes():
+    parser = IncrementalJSONObjectParser()
+    assert parser.feed('{"summary": "hi", "items": [{"t": 1}') == [JSONFieldEvent(key="summary", value="hi")]
+    assert parser.feed(", ") == [JSONFieldEvent(key="items", value={"t": 1}, index=0)]
+    assert parser.feed('[2, 3]]') == [
+        JSONFieldEvent(key="items", value=[2, 3], index=1),
+        JSONFieldEvent(key="items", value=[{"t": 1}, [2, 3]]),
+    ]
+    assert parser.feed("}") == []
+
+
+def test_scalar_field_closes_at_end_of_object():
+    parser = IncrementalJSONObjectParser()
+    assert parser.feed('{"n": 12') == []
+    assert parser.feed("}") == [JSONFieldEvent(key="n", value=12)]
+    assert parser.text == '{"n": 12}'
+
+
+def test_malformed_fragment_is_dropped():
+    assert _events(['{"a": tru, "b": [1, nul, 2], "c": 3}']) == [
+        JSONFieldEvent(key="b", value=1, index=0),
+        JSONFieldEvent(key="b", value=2, index=1),
+        JSONFieldEvent(key="c", value=3),
+    ]
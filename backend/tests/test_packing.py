@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import pytest
+
+from app.speech.packing import SegmentPacker, split_pack_text
+
+RATE = 16_000
+
+
+def _pcm(seconds: float) -> bytes:
+    return bytes(int(seconds * RATE) * 2)
+
+
+@pytest.fixture
+def pack():
+    # Three 2 s utterances joined by 0.5 s gaps: 0-2, 2.5-4.5, 5-7 inside the upload.
+    packer = SegmentPacker(sample_rate_hz=RATE, max_pack_s=30.0, gap_ms=500)
+    for offset_s in (0.0, 10.0, 20.0):
+        assert packer.add(_pcm(2.0), offset=int(offset_s * RATE) * 2) == []
+    (packed,) = packer.flush()
+    return packed
+
+
+def test_packer_layout(pack):
+    assert [(s.pack_start_s, s.pack_end_s) for s in pack.segments] == [(0.0, 2.0), (2.5, 4.5), (5.0, 7.0)]
+    assert [(s.start_s, s.end_s) for s in pack.segments] == [(0.0, 2.0), (10.0, 12.0), (20.0, 22.0)]
+    assert len(pack.pcm) == len(_pcm(7.0))
+
+
+def test_one_stt_segment_per_utterance(pack):
+    result = {
+        "text": "one two three",
+        "segments": [
+            {"start": 0.0, "end": 2.1, "text": " one"},
+            {"start": 2.4, "end": 4.5, "text": " two"},
+            {"start": 4.9, "end": 7.0, "text": " three"},
+        ],
+    }
+    assert split_pack_text(pack, result) == ["one", "two", "three"]
+
+
+def test_several_stt_segments_in_one_utterance(pack):
+    result = {
+        "text": "a b c",
+        "segments": [
+            {"start": 0.0, "end": 1.0, "text": "a"},
+            {"start": 1.0, "end": 2.0, "text": "b"},
+            {"start": 5.0, "end": 7.0, "text": "c"},
+        ],
+    }
+    assert split_pack_text(pack, result) == ["a b", "", "c"]
+
+
+def test_stt_segment_spanning_utterances_merges_them(pack):
+    result = {
+        "text": "one two three",
+        "segments": [
+            {"start": 0.0, "end": 4.4, "text": "one two"},
+            {"start": 5.0, "end": 7.0, "text": "three"},
+        ],
+    }
+    assert split_pack_text(pack, result) == ["one two", None, "three"]
+
+
+def test_chained_spans_merge_transitively(pack):
+    result = {
+        "text": "x y",
+        "segments": [
+            {"start": 3.0, "end": 6.0, "text": "y"},
+            {"start": 0.0, "end": 3.0, "text": "x"},
+        ],
+    }
+    assert split_pack_text(pack, result) == ["x y", None, None]
+
+
+def test_timestamp_jitter_does_not_merge(pack):
+    # Ends 50 ms into the next utterance: below the overlap threshold.
+    result = {
+        "text": "one two",
+        "segments": [
+            {"start": 0.0, "end": 2.55, "text": "one"},
+            {"start": 2.55, "end": 4.5, "text": "two"},
+        ],
+    }
+    assert split_pack_text(pack, result) == ["one", "two", ""]
+
+
+def test_stt_segment_in_a_gap_goes_to_the_nearest_utterance(pack):
+    result = {"text": "uh", "segments": [{"start": 4.8, "end": 4.95, "text": "uh"}]}
+    assert split_pack_text(pack, result) == ["", "", "uh"]
+
+
+def test_without_stt_segments_the_pack_is_one_segment(pack):
+    assert split_pack_text(pack, {"text": " all of it "}) == ["all of it", None, None]
+
+
+def test_single_segment_pack_keeps_its_text():
+    packer = SegmentPacker(sample_rate_hz=RATE, max_pack_s=30.0, gap_ms=500)
+    packer.add(_pcm(1.0))
+    (single,) = packer.flush()
+    assert split_pack_text(single, {"text": "hello ", "segments": []}) == ["hello"]
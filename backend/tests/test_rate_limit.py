@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from email.utils import formatdate
+
+import pytest
+
+from app.services.rate_limit import RateLimiter, UpstreamScheduler, parse_duration_s, parse_retry_after_s
+
+
+@pytest.mark.parametrize(
+    "value, seconds",
+    [("7.66s", 7.66), ("2m59.56s", 179.56), ("120ms", 0.12), ("1h2m", 3720.0), ("3", 3.0), ("-1", 0.0)],
+)
+def test_parse_duration(value, seconds):
+    assert parse_duration_s(value) == pytest.approx(seconds)
+
+
+@pytest.mark.parametrize("value", [None, "", "soon"])
+def test_parse_duration_unparseable(value):
+    assert parse_duration_s(value) is None
+
+
+def test_parse_retry_after():
+    assert parse_retry_after_s("2") == 2.0
+    assert parse_retry_after_s(formatdate(time.time() + 30, usegmt=True)) == pytest.approx(30, abs=1.5)
+    assert parse_retry_after_s(formatdate(time.time() - 30, usegmt=True)) == 0.0
+    assert parse_retry_after_s("later") is None
+
+
+def _waits(limiter: RateLimiter, n: int) -> list[float]:
+    async def main() -> list[float]:
+        return [await limiter.acquire() for _ in range(n)]
+
+    return asyncio.run(main())
+
+
+def test_burst_then_refill_rate():
+    # 600/min is one token per 0.1 s.
+    waits = _waits(RateLimiter(name="m", requests_per_minute=600, burst=2), 3)
+    assert waits[:2] == pytest.approx([0.0, 0.0], abs=0.01)
+    assert waits[2] == pytest.approx(0.1, abs=0.03)
+
+
+def test_429_honours_retry_after():
+    limiter = RateLimiter(name="m", requests_per_minute=6_000, burst=5)
+    limiter.observe(429, {"retry-after": "0.2"})
+    assert limiter.throttled == 1
+    assert not limiter.try_acquire()
+    assert _waits(limiter, 1)[0] == pytest.approx(0.2, abs=0.05)
+
+
+def test_429_without_retry_after_uses_default():
+    limiter = RateLimiter(name="m", requests_per_minute=6_000, burst=5)
+    limiter.observe(429, {})
+    assert limiter._blocked_until - time.monotonic() == pytest.approx(1.0, abs=0.05)
+
+
+@pytest.mark.parametrize("kind", ["requests", "tokens"])
+def test_exhausted_remaining_blocks_until_reset(kind):
+    limiter = RateLimiter(name="m", requests_per_minute=6_000, burst=5)
+    limiter.observe(200, {f"x-ratelimit-remaining-{kind}": "0", f"x-ratelimit-reset-{kind}": "150ms"})
+    assert limiter.throttled == 0
+    assert _waits(limiter, 1)[0] == pytest.approx(0.15, abs=0.05)
+
+
+def test_remaining_requests_caps_tokens():
+    limiter = RateLimiter(name="m", requests_per_minute=60, burst=10)
+    limiter.observe(200, {"x-ratelimit-remaining-requests": "2", "x-ratelimit-remaining-tokens": "junk"})
+    assert limiter.try_acquire()
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+
+
+def test_waiters_are_served_in_order():
+    async def main() -> list[int]:
+        limiter = RateLimiter(name="m", requests_per_minute=1_200, burst=1)
+        order: list[int] = []
+
+        async def call(i: int) -> None:
+            await limiter.acquire()
+            order.append(i)
+
+        await asyncio.gather(*(call(i) for i in range(5)))
+        assert limiter.stats()["acquired"] == 5
+        assert limiter.stats()["queue_depth"] == 0
+        return order
+
+    assert asyncio.run(main()) == [0, 1, 2, 3, 4]
+
+
+def test_try_acquire_yields_to_queued_callers():
+    async def main() -> bool:
+        limiter = RateLimiter(name="m", requests_per_minute=600, burst=1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        # A token may refill while the waiter sleeps; it is still the waiter's.
+        limiter._tokens = 1.0
+        taken = limiter.try_acquire()
+        await waiter
+        return taken
+
+    assert asyncio.run(main()) is False
+
+
+def test_scheduler_keeps_one_limiter_per_model():
+    scheduler = UpstreamScheduler(requests_per_minute=60, burst=1)
+    stt, llm = scheduler.for_model("whisper"), scheduler.for_model("llama")
+    assert scheduler.for_model("whisper") is stt
+    assert stt.try_acquire()
+    assert llm.try_acquire()
+    assert set(scheduler.stats()) == {"whisper", "llama"}
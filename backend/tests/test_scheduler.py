@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.config.settings import Settings
+from app.pipeline.executor import StageOverloadedError
+from app.pipeline.scheduler import DeadlineExceededError, Priority, WorkScheduler
+from app.services.groq import GroqClient
+from app.services.rate_limit import RateLimiter, track_throttled_time
+
+
+def test_limiter_wait_is_not_counted_as_latency():
+    async def main() -> int:
+        scheduler = WorkScheduler(name="stt", min_concurrency=1, max_concurrency=8, latency_target_s=0.05)
+        # One token per 0.1 s and none left: every call waits ~0.1 s in the limiter, then returns at once.
+        limiter = RateLimiter(name="m", requests_per_minute=600, burst=1)
+        await limiter.acquire()
+        for _ in range(3):
+            await scheduler.run(Priority.INTERACTIVE, limiter.acquire)
+        return scheduler.limit
+
+    assert asyncio.run(main()) == 8
+
+
+def test_slow_upstream_shrinks_limit():
+    async def main() -> int:
+        scheduler = WorkScheduler(name="stt", min_concurrency=1, max_concurrency=8, latency_target_s=0.05)
+        await scheduler.run(Priority.INTERACTIVE, lambda: asyncio.sleep(0.1))
+        return scheduler.limit
+
+    assert asyncio.run(main()) == 6
+
+
+def test_retry_backoff_is_counted_as_throttled():
+    responses = iter([httpx.Response(503), httpx.Response(200, json={"text": "hello"})])
+    settings = Settings(_env_file=None, groq_api_key="test", groq_base_url="https://api.example/v1", groq_max_attempts=2)
+    client = GroqClient(
+        settings=settings, http=httpx.AsyncClient(transport=httpx.MockTransport(lambda _: next(responses)))
+    )
+
+    async def main() -> float:
+        with track_throttled_time() as throttled_s:
+            await client.transcribe_audio(audio_bytes=b"RIFF")
+        return throttled_s[0]
+
+    assert asyncio.run(main()) > 0.0
+    assert client.scheduler.for_model(settings.groq_stt_model).retries == 1
+
+
+def _fixed(**kwargs) -> WorkScheduler:
+    return WorkScheduler(name="stt", min_concurrency=1, max_concurrency=1, latency_target_s=60.0, **kwargs)
+
+
+async def _hold(scheduler: WorkScheduler) -> tuple[asyncio.Event, asyncio.Task[None]]:
+    """Occupy the only slot until the returned event is set."""
+    release = asyncio.Event()
+    task = asyncio.create_task(scheduler.run(Priority.INTERACTIVE, release.wait))
+    await asyncio.sleep(0)
+    return release, task
+
+
+def test_waiters_run_by_priority_then_fifo():
+    async def main() -> list[str]:
+        scheduler = _fixed()
+        release, holder = await _hold(scheduler)
+        order: list[str] = []
+
+        async def call(priority: Priority, name: str) -> None:
+            async def work() -> None:
+                order.append(name)
+
+            await scheduler.run(priority, work)
+
+        calls = [
+            (Priority.BATCH, "batch"),
+            (Priority.PARTIAL, "partial"),
+            (Priority.INTERACTIVE, "interactive-1"),
+            (Priority.FINAL, "final"),
+            (Priority.INTERACTIVE, "interactive-2"),
+        ]
+        tasks = [asyncio.create_task(call(priority, name)) for priority, name in calls]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(holder, *tasks)
+        return order
+
+    assert asyncio.run(main()) == ["final", "interactive-1", "interactive-2", "partial", "batch"]
+
+
+def test_full_class_is_rejected_and_partial_supersedes_oldest():
+    async def main() -> None:
+        scheduler = _fixed(max_queued=1)
+        release, holder = await _hold(scheduler)
+        noop = lambda: asyncio.sleep(0)  # noqa: E731
+
+        batch = asyncio.create_task(scheduler.run(Priority.BATCH, noop))
+        old_partial = asyncio.create_task(scheduler.run(Priority.PARTIAL, noop))
+        await asyncio.sleep(0)
+        with pytest.raises(StageOverloadedError):
+            await scheduler.run(Priority.BATCH, noop)
+        new_partial = asyncio.create_task(scheduler.run(Priority.PARTIAL, noop))
+        await asyncio.sleep(0)
+        with pytest.raises(DeadlineExceededError):
+            await old_partial
+
+        release.set()
+        await asyncio.gather(holder, batch, new_partial)
+        stats = scheduler.stats()
+        assert stats["rejected"]["batch"] == 1
+        assert stats["dropped"]["partial"] == 1
+        assert stats["completed"] == {"final": 0, "interactive": 1, "partial": 1, "batch": 1}
+
+    asyncio.run(main())
+
+
+def test_expired_deadlines_are_dropped_not_run():
+    async def main() -> None:
+        scheduler = _fixed()
+        ran: list[str] = []
+
+        async def work() -> None:
+            ran.append("work")
+
+        with pytest.raises(DeadlineExceededError):
+            await scheduler.run(Priority.PARTIAL, work, deadline=time.monotonic() - 1)
+
+        release, holder = await _hold(scheduler)
+        queued = asyncio.create_task(scheduler.run(Priority.PARTIAL, work, deadline=time.monotonic() + 0.05))
+        await asyncio.sleep(0.1)
+        release.set()
+        await holder
+        with pytest.raises(DeadlineExceededError):
+            await queued
+        assert ran == []
+        assert scheduler.stats()["dropped"]["partial"] == 2
+        assert scheduler.stats()["in_flight"] == 0
+
+    asyncio.run(main())
+
+
+def test_cancelled_waiter_does_not_leak_its_slot():
+    async def main() -> None:
+        scheduler = _fixed()
+        release, holder = await _hold(scheduler)
+        waiter = asyncio.create_task(scheduler.run(Priority.BATCH, lambda: asyncio.sleep(0)))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        release.set()
+        await holder
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert scheduler.stats()["in_flight"] == 0
+        await asyncio.wait_for(scheduler.run(Priority.BATCH, lambda: asyncio.sleep(0)), timeout=1)
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("error, shrinks", [(TimeoutError(), True), (ValueError("bad request"), False)])
+def test_only_congestion_failures_shrink_the_limit(error, shrinks):
+    async def main() -> int:
+        scheduler = WorkScheduler(name="stt", min_concurrency=1, max_concurrency=10, latency_target_s=1.0)
+
+        async def fail() -> None:
+            raise error
+
+        with pytest.raises(type(error)):
+            await scheduler.run(Priority.INTERACTIVE, fail)
+        return scheduler.limit
+
+    assert asyncio.run(main()) == (8 if shrinks else 10)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.pipeline.executor import CPUStage
+from app.pipeline.voice_intelligence import VoiceIntelligencePipeline
+
+RATE = 16_000
+
+
+class FakeGroq:
+    """Returns (or raises) the queued responses in order."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    async def transcribe_audio(self, **_):
+        self.calls += 1
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def _transcribe(groq: FakeGroq, *, policy: str = "retry"):
+    pipeline = VoiceIntelligencePipeline(
+        groq=groq,
+        decoder=None,
+        vad=None,
+        post=None,
+        reasoner=None,
+        sample_rate_hz=RATE,
+        cpu=CPUStage(max_workers=1),
+        stt_failure_policy=policy,
+        stt_segment_retries=2,
+    )
+    packer = pipeline._packer()
+    packs = packer.add(bytes(RATE * 2), offset=0) + packer.flush()
+    try:
+        return asyncio.run(pipeline._transcribe_packs(packs=packs, filename="a.wav"))
+    finally:
+        pipeline.cpu.shutdown()
+
+
+def _status_error(code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://api.example/audio/transcriptions")
+    return httpx.HTTPStatusError(f"HTTP {code}", request=request, response=httpx.Response(code, request=request))
+
+
+@pytest.mark.parametrize("malformed", [ValueError("Expecting value"), ["not", "an", "object"], {"segments": []}])
+def test_malformed_response_is_retried(malformed):
+    groq = FakeGroq(malformed, {"text": "hello"})
+    (segment,) = _transcribe(groq)
+    assert segment.text == "hello"
+    assert groq.calls == 2
+
+
+@pytest.mark.parametrize("code", [400, 401, 413, 422, 503])
+def test_http_status_error_is_not_retried(code):
+    groq = FakeGroq(_status_error(code), {"text": "hello"})
+    with pytest.raises(httpx.HTTPStatusError):
+        _transcribe(groq)
+    assert groq.calls == 1
+
+
+def test_retries_are_bounded():
+    groq = FakeGroq(*[ValueError("Expecting value")] * 3, {"text": "hello"})
+    with pytest.raises(ValueError):
+        _transcribe(groq)
+    assert groq.calls == 3
+
+
+def test_skip_policy_does_not_retry():
+    groq = FakeGroq(ValueError("Expecting value"), {"text": "hello"})
+    assert _transcribe(groq, policy="skip") == [None]
+    assert groq.calls == 1
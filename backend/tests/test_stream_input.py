@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.speech.audio import encode_pcm16, upload_codec_available
+from app.speech.ffmpeg import ffmpeg_path
+from app.speech.stream_input import _opuslib, open_input_decoder
+
+RATE = 16_000
+FRAME = RATE // 50  # 20 ms
+
+needs_opuslib = pytest.mark.skipif(_opuslib() is None, reason="opuslib or libopus not installed")
+
+
+def _tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (np.sin(2 * np.pi * 440 * t) * 8_000).astype(np.int16)
+
+
+def _similarity(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Best normalised correlation over codec delays up to 20 ms."""
+    a = expected.astype(np.float64)
+    b = actual.astype(np.float64)
+    best = 0.0
+    for lag in range(FRAME):
+        n = min(len(a), len(b) - lag) - FRAME
+        x, y = a[FRAME : FRAME + n], b[FRAME + lag : FRAME + lag + n]
+        best = max(best, float(np.dot(x, y) / (np.linalg.norm(x) * np.linalg.norm(y) + 1e-9)))
+    return best
+
+
+def _decode(input_format: str, messages: list[bytes]) -> np.ndarray:
+    out: list[bytes] = []
+
+    async def run() -> None:
+        decoder = open_input_decoder(input_format, on_pcm=out.append, sample_rate_hz=RATE)
+        try:
+            for message in messages:
+                await decoder.feed(message)
+            await decoder.drain()
+        finally:
+            await decoder.aclose()
+
+    asyncio.run(run())
+    return np.frombuffer(b"".join(out), dtype=np.int16)
+
+
+def test_pcm16_passes_through():
+    tone = _tone(0.1)
+    assert np.array_equal(_decode("pcm16", [tone[:800].tobytes(), tone[800:].tobytes()]), tone)
+
+
+@needs_opuslib
+def test_opus_packets_round_trip():
+    opuslib = _opuslib()
+    tone = _tone(1.0)
+    encoder = opuslib.Encoder(RATE, 1, opuslib.APPLICATION_VOIP)
+    packets = [encoder.encode(tone[i : i + FRAME].tobytes(), FRAME) for i in range(0, len(tone), FRAME)]
+
+    pcm = _decode("opus", packets)
+    assert len(pcm) == len(tone)
+    assert _similarity(tone, pcm) > 0.9
+
+
+@needs_opuslib
+def test_undecodable_opus_packet_is_dropped():
+    opuslib = _opuslib()
+    tone = _tone(0.1)
+    encoder = opuslib.Encoder(RATE, 1, opuslib.APPLICATION_VOIP)
+    packets = [encoder.encode(tone[i : i + FRAME].tobytes(), FRAME) for i in range(0, len(tone), FRAME)]
+
+    pcm = _decode("opus", packets[:2] + [b"\xff" * 3] + packets[2:])
+    assert len(pcm) == len(tone)
+
+
+@pytest.mark.skipif(
+    ffmpeg_path() is None or not upload_codec_available("ogg_opus"), reason="needs ffmpeg and libsndfile Opus"
+)
+def test_ogg_opus_stream_round_trip():
+    tone = _tone(1.0)
+    ogg = encode_pcm16(tone.tobytes(), sample_rate_hz=RATE, codec="ogg_opus")
+    # MediaRecorder-style chunks that split Ogg pages at arbitrary offsets.
+    messages = [ogg[i : i + 700] for i in range(0, len(ogg), 700)]
+
+    pcm = _decode("ogg_opus", messages)
+    assert abs(len(pcm) - len(tone)) <= FRAME
+    assert _similarity(tone, pcm) > 0.9
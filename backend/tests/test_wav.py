@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import io
+import struct
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from app.speech.audio import (
+    AudioDecodingError,
+    WavPCM16Stream,
+    decode_strict_wav,
+    parse_wav_header,
+)
+
+_PCM_GUID = struct.pack("<H", 1) + b"\x00\x00\x00\x00\x10\x00\x80\x00\x00\xaa\x00\x38\x9b\x71"
+
+
+def _wav(
+    samples: np.ndarray,
+    *,
+    channels: int = 1,
+    rate: int = 16_000,
+    extensible: bool = False,
+    extra: bytes = b"",
+    data_size: int | None = None,
+) -> bytes:
+    data = samples.astype("<i2").tobytes()
+    block = 2 * channels
+    if extensible:
+        fmt = struct.pack("<HHIIHHHHI", 0xFFFE, channels, rate, rate * block, block, 16, 22, 16, 0) + _PCM_GUID
+    else:
+        fmt = struct.pack("<HHIIHH", 1, channels, rate, rate * block, block, 16)
+    body = (
+        b"WAVE"
+        + b"fmt "
+        + struct.pack("<I", len(fmt))
+        + fmt
+        + extra
+        + b"data"
+        + struct.pack("<I", len(data) if data_size is None else data_size)
+        + data
+    )
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def _tone(n: int = 1_600) -> np.ndarray:
+    return (np.sin(np.arange(n) / 7.0) * 20_000).astype(np.int16)
+
+
+def test_canonical_mono_is_a_view():
+    samples = _tone()
+    wav = _wav(samples)
+    layout = parse_wav_header(wav)
+    assert (layout.format_tag, layout.channels, layout.data_offset, layout.data_size) == (1, 1, 44, len(samples) * 2)
+
+    pcm, path = decode_strict_wav(wav)
+    assert path == "riff"
+    assert pcm.obj.base is wav  # zero-copy over the upload
+    assert bytes(pcm) == samples.tobytes()
+
+
+def test_matches_libsndfile_writer():
+    samples = _tone()
+    buf = io.BytesIO()
+    sf.write(buf, samples, 16_000, subtype="PCM_16", format="WAV")
+    pcm, path = decode_strict_wav(buf.getvalue())
+    assert path == "riff"
+    assert bytes(pcm) == samples.tobytes()
+
+
+def test_wave_format_extensible_pcm():
+    samples = _tone()
+    layout = parse_wav_header(_wav(samples, extensible=True))
+    assert layout.format_tag == 1
+    assert layout.data_offset == 12 + 8 + 40 + 8
+    pcm, path = decode_strict_wav(_wav(samples, extensible=True))
+    assert path == "riff"
+    assert bytes(pcm) == samples.tobytes()
+
+
+def test_odd_chunk_is_padded():
+    samples = _tone()
+    # A 3-byte LIST chunk is followed by one pad byte before the next chunk.
+    wav = _wav(samples, extra=b"LIST" + struct.pack("<I", 3) + b"abc" + b"\x00")
+    assert parse_wav_header(wav).data_offset == 44 + 12
+    assert bytes(decode_strict_wav(wav)[0]) == samples.tobytes()
+
+
+@pytest.mark.parametrize("data_size", [0, 0xFFFFFFFF])
+def test_streamed_data_size_reads_to_the_end(data_size):
+    samples = _tone()
+    wav = _wav(samples, data_size=data_size)
+    assert parse_wav_header(wav).data_size is None
+    pcm, path = decode_strict_wav(wav)
+    assert path == "riff"
+    assert bytes(pcm) == samples.tobytes()
+
+
+def test_declared_data_size_ignores_trailing_chunks():
+    samples = _tone()
+    wav = _wav(samples) + b"LIST" + struct.pack("<I", 4) + b"tail"
+    assert bytes(decode_strict_wav(wav)[0]) == samples.tobytes()
+
+
+def test_header_needs_more_bytes():
+    wav = _wav(_tone(), extensible=True, extra=b"junk" + struct.pack("<I", 5) + b"12345\x00")
+    offset = parse_wav_header(wav).data_offset
+    for end in range(offset):
+        assert parse_wav_header(wav[:end]) is None
+
+
+def test_not_riff_or_data_before_fmt_is_rejected():
+    with pytest.raises(AudioDecodingError):
+        parse_wav_header(b"RIFX" + bytes(8))
+    with pytest.raises(AudioDecodingError):
+        parse_wav_header(b"RIFF" + bytes(4) + b"WAVE" + b"data" + bytes(4))
+
+
+def test_stereo_downmix_is_floor_of_mean():
+    left = np.array([32767, -32768, 32767, -32768, 1, -1, 3, -3], dtype=np.int16)
+    right = np.array([32767, -32768, -32768, 32767, 1, -2, 4, -4], dtype=np.int16)
+    interleaved = np.column_stack([left, right]).reshape(-1)
+    pcm, path = decode_strict_wav(_wav(interleaved, channels=2))
+    assert path == "riff"
+    expected = (left.astype(np.int32) + right.astype(np.int32)) // 2
+    assert np.frombuffer(pcm, dtype=np.int16).tolist() == expected.tolist()
+
+
+def test_other_layouts_fall_back_to_libsndfile():
+    buf = io.BytesIO()
+    sf.write(buf, _tone(), 16_000, subtype="PCM_24", format="WAV")
+    with pytest.raises(AudioDecodingError):
+        decode_strict_wav(buf.getvalue())
+    with pytest.raises(AudioDecodingError):
+        decode_strict_wav(_wav(_tone(), rate=8_000))
+
+
+@pytest.mark.parametrize("channels", [1, 2])
+def test_stream_matches_whole_file_decode(channels):
+    samples = _tone(3_001 * channels)
+    wav = _wav(samples, channels=channels, extra=b"LIST" + struct.pack("<I", 1) + b"x\x00")
+    stream = WavPCM16Stream()
+    # Uneven splits land inside the header and inside sample frames.
+    out = b"".join(bytes(stream.feed(wav[i : i + 37])) for i in range(0, len(wav), 37))
+    stream.close()
+    assert out == bytes(decode_strict_wav(wav)[0])
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import argparse
+import collections
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from app.speech.audio import (  # noqa: E402
+    decode_to_pcm16_mono_16k,
+    decode_wav_with_libsndfile,
+    encode_pcm16,
+    frame_generator,
+    pcm16_to_wav_bytes,
+    upload_codec_available,
+)
+from app.speech.decoders import UniversalDecoder  # noqa: E402
+from app.speech.postprocess import TranscriptPostProcessor  # noqa: E402
+from app.speech.vad import VADConfig, VoiceActivityDetector  # noqa: E402
+
+_SAMPLE_RATE_HZ = 16_000
+_DURATIONS_S = {"1s": 1, "10s": 10, "1min": 60, "10min": 600, "1h": 3600}
+_STAGES = (
+    "decode_wav",
+    "decode_wav_stereo",
+    "decode_wav_legacy",
+    "decode_wav_legacy_stereo",
+    "decode_wav_libsndfile",
+    "universal_decode",
+    "frame_generator",
+    "vad_segment",
+    "pcm16_to_wav",
+    "encode_flac",
+    "encode_ogg_opus",
+    "postprocess_clean",
+)
+# Opus encodes at ~50x real time, so the 1 h case alone would take minutes; opt in with --stages.
+_DEFAULT_STAGES = tuple(stage for stage in _STAGES if stage != "encode_ogg_opus")
+# Slowdowns smaller than this are timer noise on sub-millisecond cases, not regressions.
+_NOISE_FLOOR_S = 0.0002
+_WORDS = "so the quarterly numbers look fine but we should revisit the hiring plan before friday".split()
+
+
+@dataclass(frozen=True)
+class Fixture:
+    name: str
+    duration_s: float
+    pcm: bytes
+    wav: bytes
+    stereo_wav: bytes
+    flac: bytes
+    transcript: str
+
+
+@dataclass(frozen=True)
+class Measurement:
+    time_s: float
+    peak_bytes: int
+    # Size of the stage's output relative to the PCM input, for stages that produce bytes.
+    size_ratio: float | None
+
+
+def _synthetic_pcm(seconds: int) -> bytes:
+    """Voiced bursts (harmonics plus noise) separated by pauses; a 22 s block is tiled to length."""
+    rng = np.random.default_rng(seconds)
+    t = np.arange(22 * _SAMPLE_RATE_HZ) / _SAMPLE_RATE_HZ
+    voice = sum(np.sin(2 * np.pi * 140 * k * t) / k for k in range(1, 6)) + 0.3 * rng.standard_normal(t.size)
+    block = (voice / np.max(np.abs(voice)) * 12_000 * ((t % 2.2) < 1.5)).astype(np.int16)
+    return np.resize(block, seconds * _SAMPLE_RATE_HZ).tobytes()
+
+
+def _transcript(duration_s: float) -> str:
+    # ~2.5 words per second with the irregular spacing STT output tends to have.
+    n_words = max(1, int(duration_s * 2.5))
+    return "  ".join(" ".join(_WORDS[(i + j) % len(_WORDS)] for j in range(7)) for i in range(0, n_words, 7)) + " \n"
+
+
+def _fixture(name: str, pcm: bytes) -> Fixture:
+    samples = np.frombuffer(pcm, dtype=np.int16)
+    wav, stereo_wav, flac = io.BytesIO(), io.BytesIO(), io.BytesIO()
+    sf.write(wav, samples, _SAMPLE_RATE_HZ, subtype="PCM_16", format="WAV")
+    # The right channel lags by 10 ms so the downmix has real work to do.
+    stereo = np.column_stack([samples, np.roll(samples, _SAMPLE_RATE_HZ // 100)])
+    sf.write(stereo_wav, stereo, _SAMPLE_RATE_HZ, subtype="PCM_16", format="WAV")
+    sf.write(flac, samples, _SAMPLE_RATE_HZ, subtype="PCM_16", format="FLAC")
+    duration_s = len(pcm) / (_SAMPLE_RATE_HZ * 2)
+    return Fixture(
+        name, duration_s, pcm, wav.getvalue(), stereo_wav.getvalue(), flac.getvalue(), _transcript(duration_s)
+    )
+
+
+def _legacy_decode_wav(audio_bytes: bytes) -> bytes:
+    """The strict WAV decoder before the RIFF fast path: sf.info + sf.read + int32 downmix + tobytes()."""
+    bio = io.BytesIO(audio_bytes)
+    sf.info(bio)
+    bio.seek(0)
+    data, _ = sf.read(bio, dtype="int16", always_2d=True)
+    pcm = np.asarray(data, dtype=np.int16)
+    if pcm.shape[1] == 2:
+        pcm = ((pcm[:, 0].astype(np.int32) + pcm[:, 1].astype(np.int32)) // 2).astype(np.int16)[:, None]
+    return np.ascontiguousarray(pcm[:, 0]).tobytes()
+
+
+def _stages(vad: VoiceActivityDetector, post: TranscriptPostProcessor) -> dict[str, Callable[[Fixture], object]]:
+    universal = UniversalDecoder(warm_processes=0)
+    frame_ms = vad.config.frame_ms
+    return {
+        "decode_wav": lambda f: decode_to_pcm16_mono_16k(f.wav),
+        "decode_wav_stereo": lambda f: decode_to_pcm16_mono_16k(f.stereo_wav),
+        # The decoder the RIFF header walk replaced, as the before/after reference.
+        "decode_wav_legacy": lambda f: _legacy_decode_wav(f.wav),
+        "decode_wav_legacy_stereo": lambda f: _legacy_decode_wav(f.stereo_wav),
+        # The fallback for WAV files the header walk cannot vouch for.
+        "decode_wav_libsndfile": lambda f: decode_wav_with_libsndfile(f.wav),
+        "universal_decode": lambda f: universal.decode(audio_bytes=f.flac, filename="bench.flac"),
+        "frame_generator": lambda f: collections.deque(
+            frame_generator(f.pcm, sample_rate_hz=_SAMPLE_RATE_HZ, frame_ms=frame_ms), maxlen=0
+        ),
+        "vad_segment": lambda f: vad.segment(f.pcm),
+        "pcm16_to_wav": lambda f: pcm16_to_wav_bytes(f.pcm),
+        "encode_flac": lambda f: encode_pcm16(f.pcm, sample_rate_hz=_SAMPLE_RATE_HZ, codec="flac"),
+        "encode_ogg_opus": lambda f: encode_pcm16(f.pcm, sample_rate_hz=_SAMPLE_RATE_HZ, codec="ogg_opus"),
+        "postprocess_clean": lambda f: post.clean(f.transcript),
+    }
+
+
+def _measure(fn: Callable[[Fixture], object], fixture: Fixture, *, repeat: int) -> Measurement:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = fn(fixture)
+        best = min(best, time.perf_counter() - start)
+    size_ratio = len(output) / len(fixture.pcm) if isinstance(output, bytes) else None
+    del output
+
+    # A separate traced run: tracemalloc slows the stage down, so it is not timed.
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        fn(fixture)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Measurement(best, max(0, peak - before), size_ratio)
+
+
+def _fmt_bytes(n: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if n < 1024:
+            return f"{n:.0f}{unit}"
+        n /= 1024
+    return f"{n:.1f}GiB"
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        description="Time and peak traced memory of the speech hot paths, with optional baseline save/compare."
+    )
+    parser.add_argument("--durations", nargs="*", choices=list(_DURATIONS_S), default=list(_DURATIONS_S))
+    parser.add_argument("--audio", nargs="*", default=[], help="Recorded fixtures (any format the WAV/FLAC decoders read)")
+    parser.add_argument("--stages", nargs="+", choices=_STAGES, default=list(_DEFAULT_STAGES))
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case; best time is reported")
+    parser.add_argument("--save", type=Path, default=None, help="Write results as a JSON baseline")
+    parser.add_argument("--compare", type=Path, default=None, help="Compare against a saved baseline")
+    parser.add_argument(
+        "--threshold", type=float, default=0.10, help="Relative slowdown or memory growth counted as a regression"
+    )
+    args = parser.parse_args(argv[1:])
+
+    fixtures = [_fixture(label, _synthetic_pcm(_DURATIONS_S[label])) for label in args.durations]
+    for path in map(Path, args.audio):
+        samples, rate = sf.read(path, dtype="int16", always_2d=True)
+        if rate != _SAMPLE_RATE_HZ:
+            print(f"skipping {path}: sample rate {rate} Hz, need {_SAMPLE_RATE_HZ} Hz", file=sys.stderr)
+            continue
+        fixtures.append(_fixture(path.name, np.ascontiguousarray(samples[:, 0]).tobytes()))
+
+    stage_names = list(args.stages)
+    if "universal_decode" in stage_names and not UniversalDecoder.ffmpeg_available():
+        print("skipping universal_decode: ffmpeg not found", file=sys.stderr)
+        stage_names.remove("universal_decode")
+    if "encode_ogg_opus" in stage_names and not upload_codec_available("ogg_opus"):
+        print("skipping encode_ogg_opus: libsndfile has no Opus support", file=sys.stderr)
+        stage_names.remove("encode_ogg_opus")
+
+    vad = VoiceActivityDetector(
+        config=VADConfig(aggressiveness=2, sample_rate_hz=_SAMPLE_RATE_HZ, frame_ms=30, padding_ms=300)
+    )
+    stages = _stages(vad, TranscriptPostProcessor())
+    baseline = json.loads(args.compare.read_text())["results"] if args.compare else {}
+
+    results: dict[str, dict[str, float | int]] = {}
+    regressions: list[str] = []
+    print(f"{'case':<30}{'best_ms':>12}{'x_realtime':>12}{'peak_mem':>12}{'out/in':>8}{'vs_base':>18}")
+    for fixture in fixtures:
+        repeat = args.repeat if fixture.duration_s < 600 else min(args.repeat, 2)
+        for stage in stage_names:
+            case = f"{fixture.name}/{stage}"
+            m = _measure(stages[stage], fixture, repeat=repeat)
+            results[case] = {"time_s": m.time_s, "peak_bytes": m.peak_bytes}
+            if m.size_ratio is not None:
+                results[case]["size_ratio"] = m.size_ratio
+
+            versus = ""
+            if case in baseline:
+                time_ratio = m.time_s / baseline[case]["time_s"]
+                mem_ratio = (m.peak_bytes + 1) / (baseline[case]["peak_bytes"] + 1)
+                versus = f"{time_ratio - 1:+.0%} t {mem_ratio - 1:+.0%} m"
+                slower = time_ratio > 1 + args.threshold and m.time_s - baseline[case]["time_s"] > _NOISE_FLOOR_S
+                if slower or mem_ratio > 1 + args.threshold:
+                    regressions.append(case)
+            size = f"{m.size_ratio:.2f}" if m.size_ratio is not None else ""
+            print(
+                f"{case:<30}{m.time_s * 1000:>12.3f}{fixture.duration_s / m.time_s:>12.0f}"
+                f"{_fmt_bytes(m.peak_bytes):>12}{size:>8}{versus:>18}"
+            )
+
+    if args.save:
+        args.save.write_text(
+            json.dumps(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "numpy": np.__version__,
+                    "results": results,
+                },
+                indent=2,
+            )
+        )
+        print(f"baseline written to {args.save}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import json
+import random
+import sys
+import time
+from dataclasses import dataclass
+
+import soundfile as sf
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.datastructures import UploadFile
+
+_WAV_HEADER_BYTES = 44
+_BYTES_PER_SECOND = 16_000 * 2
+_WORDS = "alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo lima mike".split()
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    """Log-normal latency around ``median_ms`` (``sigma=0`` is fixed), plus rare stalls."""
+
+    median_ms: float
+    sigma: float
+    stall_rate: float
+    stall_ms: float
+
+    def sample_s(self, rng: random.Random) -> float:
+        if self.stall_rate and rng.random() < self.stall_rate:
+            return self.stall_ms / 1000.0
+        if self.sigma <= 0:
+            return self.median_ms / 1000.0
+        return rng.lognormvariate(0.0, self.sigma) * self.median_ms / 1000.0
+
+
+class RateLimitWindow:
+    """Fixed one-minute request window per model, reported with Groq-style headers."""
+
+    def __init__(self, requests_per_minute: int) -> None:
+        self._limit = requests_per_minute
+        self._windows: dict[str, tuple[float, int]] = {}
+
+    def check(self, model: str) -> tuple[bool, dict[str, str]]:
+        if self._limit <= 0:
+            return True, {}
+        now = time.monotonic()
+        start, used = self._windows.get(model, (now, 0))
+        if now - start >= 60.0:
+            start, used = now, 0
+        reset_s = max(0.0, 60.0 - (now - start))
+        allowed = used < self._limit
+        if allowed:
+            used += 1
+        self._windows[model] = (start, used)
+        headers = {
+            "x-ratelimit-limit-requests": str(self._limit),
+            "x-ratelimit-remaining-requests": str(max(0, self._limit - used)),
+            "x-ratelimit-reset-requests": f"{reset_s:.2f}s",
+        }
+        if not allowed:
+            headers["retry-after"] = str(max(1, int(reset_s + 0.999)))
+        return allowed, headers
+
+
+def _intelligence(seed: str) -> dict:
+    words = seed.split()[:12] or ["silence"]
+    return {
+        "summary": f"Discussion about {' '.join(words[:6])}.",
+        "intent": "status_update",
+        "action_items": [{"description": f"Follow up on {words[0]}", "owner": None, "due_date": None, "priority": "medium"}],
+        "entities": [{"type": "topic", "value": words[-1], "confidence": 0.8}],
+        "sentiment": "neutral",
+        "topics": sorted(set(words[:3])),
+    }
+
+
+def create_app(
+    *,
+    stt: LatencyModel,
+    llm: LatencyModel,
+    error_rate: float,
+    requests_per_minute: int,
+    seed: int | None,
+    upload_kbps: float = 0.0,
+) -> FastAPI:
+    app = FastAPI(title="fake-groq")
+    rng = random.Random(seed)
+    limits = RateLimitWindow(requests_per_minute)
+    stats = {"transcriptions": 0, "chat_completions": 0, "rate_limited": 0, "errors": 0, "upload_bytes": 0}
+    # Uploads share one simulated uplink: each waits for the ones ahead of it to finish transferring.
+    link_free_at = 0.0
+
+    async def transfer(n_bytes: int) -> None:
+        nonlocal link_free_at
+        if upload_kbps <= 0:
+            return
+        now = time.monotonic()
+        link_free_at = max(now, link_free_at) + n_bytes * 8 / (upload_kbps * 1000)
+        await asyncio.sleep(link_free_at - now)
+
+    def fault(model: str) -> tuple[Response | None, dict[str, str]]:
+        allowed, headers = limits.check(model)
+        if not allowed:
+            stats["rate_limited"] += 1
+            return JSONResponse({"error": {"message": "Rate limit reached", "type": "requests"}}, 429, headers), headers
+        if error_rate and rng.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse({"error": {"message": "Injected upstream error"}}, 500, headers), headers
+        return None, headers
+
+    @app.get("/openai/v1/models")
+    async def models() -> dict:
+        return {"object": "list", "data": [{"id": "whisper-large-v3"}, {"id": "llama-3.3-70b-versatile"}]}
+
+    @app.get("/stats")
+    async def get_stats() -> dict:
+        return stats
+
+    @app.post("/openai/v1/audio/transcriptions")
+    async def transcriptions(request: Request) -> Response:
+        form = await request.form()
+        model = str(form.get("model") or "stt")
+        upload = form.get("file")
+        data = await upload.read() if isinstance(upload, UploadFile) else b""
+        size = len(data)
+        stats["upload_bytes"] += size
+        await transfer(size)
+
+        response, headers = fault(model)
+        if response is not None:
+            return response
+        stats["transcriptions"] += 1
+        await asyncio.sleep(stt.sample_s(rng))
+
+        try:
+            duration_s = sf.info(io.BytesIO(data)).duration
+        except RuntimeError:
+            duration_s = max(0, size - _WAV_HEADER_BYTES) / _BYTES_PER_SECOND
+        words = [_WORDS[(size + i) % len(_WORDS)] for i in range(max(1, int(duration_s * 2.5)))]
+        per_word_s = duration_s / len(words)
+        segments = [
+            {
+                "id": i,
+                "start": round(w * per_word_s, 3),
+                "end": round(min(len(words), w + 12) * per_word_s, 3),
+                "text": " " + " ".join(words[w : w + 12]),
+            }
+            for i, w in enumerate(range(0, len(words), 12))
+        ]
+        return JSONResponse(
+            {"text": " ".join(words), "duration": round(duration_s, 3), "segments": segments},
+            headers=headers,
+        )
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request) -> Response:
+        payload = await request.json()
+        model = str(payload.get("model") or "llm")
+        response, headers = fault(model)
+        if response is not None:
+            return response
+        stats["chat_completions"] += 1
+
+        user = next((m["content"] for m in payload.get("messages", []) if m.get("role") == "user"), "")
+        content = json.dumps(_intelligence(user.rsplit("\n", 1)[-1]))
+        latency_s = llm.sample_s(rng)
+
+        if not payload.get("stream"):
+            await asyncio.sleep(latency_s)
+            return JSONResponse(
+                {
+                    "id": "fake",
+                    "object": "chat.completion",
+                    "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                },
+                headers=headers,
+            )
+
+        pieces = [content[i : i + 8] for i in range(0, len(content), 8)]
+
+        async def events():
+            for piece in pieces:
+                await asyncio.sleep(latency_s / len(pieces))
+                chunk = {"id": "fake", "object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {"content": piece}}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+    return app
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for Groq's OpenAI-compatible API. "
+        "Point the backend at it with GROQ_BASE_URL=http://HOST:PORT/openai/v1."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--stt-latency-ms", type=float, default=300.0, help="Median STT latency")
+    parser.add_argument("--llm-latency-ms", type=float, default=900.0, help="Median LLM latency (whole completion)")
+    parser.add_argument("--sigma", type=float, default=0.4, help="Log-normal spread of latencies; 0 for fixed")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="Fraction of calls that stall")
+    parser.add_argument("--stall-ms", type=float, default=5_000.0, help="Latency of a stalled call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls answered with HTTP 500")
+    parser.add_argument("--rpm", type=int, default=0, help="Requests per minute per model before 429s; 0 disables")
+    parser.add_argument(
+        "--upload-kbps", type=float, default=0.0, help="Simulated shared uplink for STT uploads in kbit/s; 0 disables"
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv[1:])
+
+    app = create_app(
+        stt=LatencyModel(args.stt_latency_ms, args.sigma, args.stall_rate, args.stall_ms),
+        llm=LatencyModel(args.llm_latency_ms, args.sigma, args.stall_rate, args.stall_ms),
+        error_rate=args.error_rate,
+        requests_per_minute=args.rpm,
+        seed=args.seed,
+        upload_kbps=args.upload_kbps,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
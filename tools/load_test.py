@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import collections
+import io
+import json
+import math
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+import numpy as np
+import soundfile as sf
+import websockets
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from app.speech.audio import decode_to_pcm16_mono_16k  # noqa: E402
+
+_SAMPLE_RATE_HZ = 16_000
+_FRAME_MS = 20
+_TRANSCRIPT = (
+    "Thanks everyone for joining. Maria will send the revised budget to finance by Friday, "
+    "and the launch review moves to next Tuesday at ten."
+)
+
+
+@dataclass
+class EndpointStats:
+    latencies_s: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    def add(self, latency_s: float) -> None:
+        self.latencies_s.append(latency_s)
+
+    def percentile(self, q: float) -> float | None:
+        if not self.latencies_s:
+            return None
+        ordered = sorted(self.latencies_s)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))]
+
+    def report(self, wall_s: float) -> dict[str, float | int | None]:
+        return {
+            "count": len(self.latencies_s),
+            "errors": self.errors,
+            "p50_s": self.percentile(50),
+            "p95_s": self.percentile(95),
+            "p99_s": self.percentile(99),
+            "throughput_rps": len(self.latencies_s) / wall_s if wall_s > 0 else None,
+        }
+
+
+def _stage_seconds(server_timing: str) -> dict[str, float]:
+    """Parse ``Server-Timing`` (``name;dur=ms;desc="..."``, comma separated) into seconds per stage."""
+    stages: dict[str, float] = {}
+    for metric in server_timing.split(","):
+        name, *params = (part.strip() for part in metric.split(";"))
+        for param in params:
+            if param.startswith("dur="):
+                stages[name] = float(param[len("dur=") :]) / 1000
+    return stages
+
+
+def _synthetic_speech(seconds: float) -> bytes:
+    """Voiced-sounding bursts (harmonics plus noise) separated by pauses, so VAD closes utterances."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * _SAMPLE_RATE_HZ)) / _SAMPLE_RATE_HZ
+    voice = sum(np.sin(2 * np.pi * 140 * k * t) / k for k in range(1, 6))
+    voice = voice + 0.3 * rng.standard_normal(t.size)
+    envelope = ((t % 2.2) < 1.5).astype(np.float64)
+    return (voice / np.max(np.abs(voice)) * 12_000 * envelope).astype(np.int16).tobytes()
+
+
+def _to_wav(pcm: bytes) -> bytes:
+    buf = io.BytesIO()
+    sf.write(buf, np.frombuffer(pcm, dtype=np.int16), _SAMPLE_RATE_HZ, subtype="PCM_16", format="WAV")
+    return buf.getvalue()
+
+
+def _to_ogg_opus(pcm: bytes) -> bytes:
+    buf = io.BytesIO()
+    sf.write(buf, np.frombuffer(pcm, dtype=np.int16), _SAMPLE_RATE_HZ, subtype="OPUS", format="OGG")
+    return buf.getvalue()
+
+
+async def _ws_session(
+    url: str, payload: bytes, duration_s: float, stats: collections.defaultdict[str, EndpointStats]
+) -> None:
+    """Stream ``payload`` (PCM or an encoded stream) in equal pieces per ``_FRAME_MS`` of audio, in real time."""
+    n_frames = max(1, int(duration_s * 1000 / _FRAME_MS))
+    piece_bytes = -(-len(payload) // n_frames)
+    try:
+        async with websockets.connect(url, max_size=None) as ws:
+            ready = json.loads(await ws.recv())
+            if ready.get("event") != "ready":
+                raise RuntimeError(f"unexpected first event: {ready}")
+
+            final = asyncio.get_running_loop().create_future()
+            first_partial: list[float] = []
+
+            async def receive() -> None:
+                async for message in ws:
+                    event = json.loads(message)
+                    if event.get("event") == "partial_transcript" and not first_partial:
+                        first_partial.append(time.perf_counter())
+                    elif event.get("event") == "final":
+                        final.set_result(event)
+                        return
+
+            receiver = asyncio.create_task(receive())
+            started = time.perf_counter()
+            for i, offset in enumerate(range(0, len(payload), piece_bytes), start=1):
+                await ws.send(payload[offset : offset + piece_bytes])
+                # Pace against the wall clock so send jitter does not accumulate.
+                lag = started + i * _FRAME_MS / 1000 - time.perf_counter()
+                if lag > 0:
+                    await asyncio.sleep(lag)
+
+            flushed = time.perf_counter()
+            await ws.send(json.dumps({"event": "flush"}))
+            event = await asyncio.wait_for(final, timeout=120)
+            stats["ws flush->final"].add(time.perf_counter() - flushed)
+            if first_partial:
+                stats["ws first partial"].add(first_partial[0] - started)
+            if event.get("intelligence") is None:
+                stats["ws flush->final"].errors += 1
+            stages: dict[str, float] = collections.defaultdict(float)
+            for span in (event.get("timing") or {}).get("spans", []):
+                stages[span["name"]] += span["duration_ms"] / 1000
+            for name, seconds in stages.items():
+                stats[f"ws flush->final {name}"].add(seconds)
+            receiver.cancel()
+    except Exception as e:
+        print(f"WS session failed: {e}", file=sys.stderr)
+        stats["ws flush->final"].errors += 1
+
+
+async def _timed_post(
+    client: httpx.AsyncClient,
+    stats: collections.defaultdict[str, EndpointStats],
+    name: str,
+    semaphore: asyncio.Semaphore,
+    url: str,
+    **kwargs: object,
+) -> None:
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            response = await client.post(url, **kwargs)
+        except httpx.HTTPError as e:
+            print(f"POST {url} failed: {e}", file=sys.stderr)
+            stats[name].errors += 1
+            return
+        if response.status_code != 200:
+            stats[name].errors += 1
+            return
+        stats[name].add(time.perf_counter() - start)
+        # Per-stage rows sort right below their endpoint's row.
+        for stage, seconds in _stage_seconds(response.headers.get("server-timing", "")).items():
+            if stage != "total":
+                stats[f"{name} {stage}"].add(seconds)
+
+
+async def run(args: argparse.Namespace) -> dict[str, dict[str, float | int | None]]:
+    if args.wav:
+        pcm = decode_to_pcm16_mono_16k(Path(args.wav).read_bytes())
+    else:
+        pcm = _synthetic_speech(args.seconds)
+    wav = _to_wav(pcm)
+
+    ws_payload = _to_ogg_opus(pcm) if args.ws_format == "ogg_opus" else pcm
+    duration_s = len(pcm) / (_SAMPLE_RATE_HZ * 2)
+
+    base = args.base_url.rstrip("/")
+    ws_url = base.replace("http", "ws", 1) + f"/stream/transcribe?timing=1&format={args.ws_format}"
+    stats: collections.defaultdict[str, EndpointStats] = collections.defaultdict(EndpointStats)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(timeout=300, limits=limits) as client:
+        tasks = [_ws_session(ws_url, ws_payload, duration_s, stats) for _ in range(args.ws_sessions)]
+        tasks += [
+            _timed_post(
+                client, stats, "POST /transcribe", semaphore, f"{base}/transcribe",
+                files={"file": ("load.wav", wav, "audio/wav")}, headers={"Cache-Control": "no-cache"},
+            )
+            for _ in range(args.uploads)
+        ]
+        tasks += [
+            _timed_post(
+                client, stats, "POST /analyze", semaphore, f"{base}/analyze",
+                json={"transcript": f"{_TRANSCRIPT} (request {i})"}, headers={"Cache-Control": "no-cache"},
+            )
+            for i in range(args.analyze)
+        ]
+        start = time.perf_counter()
+        await asyncio.gather(*tasks)
+        wall_s = time.perf_counter() - start
+
+    return {name: stats[name].report(wall_s) for name in sorted(stats)}
+
+
+def _fmt(value: float | int | None) -> str:
+    if value is None:
+        return "-"
+    return f"{value:.3f}" if isinstance(value, float) else str(value)
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        description="Drive a running backend with concurrent WebSocket sessions and upload/analyze bursts."
+    )
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--ws-sessions", type=int, default=4, help="Concurrent real-time WS sessions")
+    parser.add_argument(
+        "--ws-format", choices=["pcm16", "ogg_opus"], default="pcm16", help="Audio format the WS sessions send"
+    )
+    parser.add_argument("--uploads", type=int, default=8, help="POST /transcribe requests to fire")
+    parser.add_argument("--analyze", type=int, default=8, help="POST /analyze requests to fire")
+    parser.add_argument("--concurrency", type=int, default=8, help="Max in-flight REST requests")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Length of the synthetic audio")
+    parser.add_argument("--wav", default=None, help="Use this audio file instead of synthetic speech")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv[1:])
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"{'endpoint':<32} {'count':>6} {'errors':>6} {'p50_s':>8} {'p95_s':>8} {'p99_s':>8} {'req/s':>8}")
+    for name, row in report.items():
+        print(
+            f"{name:<32} {row['count']:>6} {row['errors']:>6} {_fmt(row['p50_s']):>8} "
+            f"{_fmt(row['p95_s']):>8} {_fmt(row['p99_s']):>8} {_fmt(row['throughput_rps']):>8}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))